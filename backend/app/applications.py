@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from datetime import datetime
 from bson import ObjectId
-from .auth import get_current_user
+from .auth import get_current_principal
 from .db import applications_col, jobs_col
+from .hydration import fetch_jobs_by_ids
 
 router = APIRouter(prefix="/applications", tags=["applications"])
 
 @router.post("/")
-async def create_application(jobId: str, current_user: dict = Depends(get_current_user)):
+async def create_application(jobId: str, current_user: dict = Depends(get_current_principal)):
     # Check if job exists
     job = await jobs_col.find_one({"job_id": jobId})
     if not job:
@@ -40,14 +41,23 @@ async def create_application(jobId: str, current_user: dict = Depends(get_curren
     }
 
 @router.get("/")
-async def get_user_applications(current_user: dict = Depends(get_current_user)):
+async def get_user_applications(
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: dict = Depends(get_current_principal)
+):
     applications = await applications_col.find({
         "user_id": current_user["id"]
-    }).to_list(length=100)
+    }).to_list(length=limit)
+    
+    # One query for all referenced jobs, only the fields shown in the list
+    jobs_by_id = await fetch_jobs_by_ids(
+        (app["job_id"] for app in applications),
+        projection={"title": 1, "role": 1, "company_name": 1, "location": 1}
+    )
     
     result = []
     for app in applications:
-        job = await jobs_col.find_one({"job_id": app["job_id"]})
+        job = jobs_by_id.get(app["job_id"])
         result.append({
             "id": str(app["_id"]),
             "jobId": app["job_id"],
@@ -1,237 +1,226 @@
-from fastapi import APIRouter, Depends, HTTPException
-from .auth import get_current_user
-from .db import apply_later_col, jobs_col, users_col
+from fastapi import APIRouter, Depends, HTTPException, Query
+from .auth import get_current_principal
+from .cache import TTLCache
+from .config import settings
+from .db import apply_later_col
+from .hydration import fetch_jobs_by_ids, fill_card_json
+from .responses import RawJSONResponse, dumps, json_array
+from .serializers import CARD_JSON_PROJECTION, splice_card
+from .logs import get_logger
+from .models import JobIdList
 from datetime import datetime
 from bson import ObjectId
-from typing import List, Dict, Any
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from typing import List, Dict, Any, FrozenSet, Iterable, Set
+import hashlib
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/apply", tags=["apply"])
 
 # -------------------------------
-# Helper function to serialize MongoDB documents
+# Per-user saved job id sets
+# -------------------------------
+# Loaded with one query and kept briefly; add/remove update this worker's
+# copy, other workers pick the change up when their entry expires.
+saved_ids_cache = TTLCache(
+    "saved_ids",
+    max_entries=settings.SAVED_IDS_CACHE_SIZE,
+    ttl_seconds=settings.SAVED_IDS_CACHE_TTL_SECONDS,
+)
+
+
+async def saved_job_ids(user_id: str) -> FrozenSet[str]:
+    ids = saved_ids_cache.get(user_id)
+    if ids is None:
+        cursor = apply_later_col.find({"user_id": user_id}, {"job_id": 1, "_id": 0})
+        ids = frozenset([item["job_id"] async for item in cursor])
+        saved_ids_cache.set(user_id, ids)
+    return ids
+
+
+def _update_saved_ids(user_id: str, added: Iterable[str] = (), removed: Iterable[str] = ()):
+    ids = saved_ids_cache.get(user_id)
+    if ids is not None:
+        saved_ids_cache.set(user_id, (ids | frozenset(added)) - frozenset(removed))
+
+
+def saved_ids_tag(ids: FrozenSet[str]) -> str:
+    """Short digest of a saved set, for ETags of responses annotated with it."""
+    return hashlib.blake2b("\n".join(sorted(ids)).encode("utf-8"), digest_size=8).hexdigest()
+
+
+async def saved_status(user_id: str, job_ids: Iterable[str]) -> Dict[str, bool]:
+    """
+    is-saved for each id as the client knows it.
+
+    Saved items hold the job's job_id (or its _id string when it has
+    none), which is what list responses give clients, so most ids are
+    answered from the set alone. Unknown ids that look like an ObjectId
+    are resolved with one batched query in case they name a job by _id.
+    """
+    ids = await saved_job_ids(user_id)
+    status = {job_id: job_id in ids for job_id in dict.fromkeys(job_ids)}
+    unresolved = [job_id for job_id, saved in status.items() if not saved and ObjectId.is_valid(job_id)]
+    if ids and unresolved:
+        for job_id, job in (await fetch_jobs_by_ids(unresolved, projection={"job_id": 1})).items():
+            status[job_id] = (job.get("job_id") or str(job["_id"])) in ids
+    return status
+
+# -------------------------------
+# Writes: apply_later is the only store of saved jobs
 # -------------------------------
-def serialize_doc(doc: Any) -> Any:
-    """Convert ObjectId to string recursively in dict or list."""
-    if isinstance(doc, list):
-        return [serialize_doc(d) for d in doc]
-    if isinstance(doc, dict):
-        new_doc = {}
-        for k, v in doc.items():
-            if isinstance(v, ObjectId):
-                new_doc[k] = str(v)
-            elif isinstance(v, dict) or isinstance(v, list):
-                new_doc[k] = serialize_doc(v)
-            else:
-                new_doc[k] = v
-        return new_doc
-    return doc
-
-def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
-    """Convert MongoDB job document to JSON-serializable dict."""
+async def resolve_job_ids(job_ids: Iterable[str]) -> Dict[str, str]:
+    """Client id -> stored id (job_id, or the _id string for jobs without one), in one query."""
+    found = await fetch_jobs_by_ids(job_ids, projection={"job_id": 1})
+    return {job_id: job.get("job_id") or str(job["_id"]) for job_id, job in found.items()}
+
+
+async def save_jobs(user: Dict[str, Any], job_ids: List[str]) -> Set[str]:
+    """
+    Save stored job ids with one bulk upsert and return the newly saved ones.
+
+    $setOnInsert against the unique (user_id, job_id) index makes this
+    idempotent: saving an already saved job matches it and changes
+    nothing, so no existence check is needed first.
+    """
+    if not job_ids:
+        return set()
+    fields = {"saved_at": datetime.utcnow(), "status": "pending", "user_email": user["email"]}
+    ops = [
+        UpdateOne({"user_id": user["id"], "job_id": job_id}, {"$setOnInsert": fields}, upsert=True)
+        for job_id in job_ids
+    ]
     try:
-        job_copy = dict(job)
-        
-        if "_id" in job_copy:
-            job_copy["id"] = str(job_copy["_id"])
-            job_copy["_id"] = str(job_copy["_id"])
-        
-        job_copy.setdefault("title", "No Title")
-        job_copy.setdefault("company_name", "Unknown Company")
-        job_copy.setdefault("location", "Remote")
-        job_copy.setdefault("description", "")
-        job_copy.setdefault("remote", False)
-        job_copy.setdefault("url", "")
-        job_copy.setdefault("date_posted", "")
-        job_copy.setdefault("raw", {})
-        
-        return job_copy
-    except Exception as e:
-        print(f"Error serializing job: {e}")
-        return {
-            "id": str(job.get("_id", "")),
-            "title": "Error loading job",
-            "company_name": "Unknown",
-            "location": "Remote",
-            "description": "Error loading job details",
-            "remote": False,
-            "url": "",
-            "date_posted": "",
-            "raw": {}
-        }
+        upserted = (await apply_later_col.bulk_write(ops, ordered=False)).upserted_ids
+    except BulkWriteError as e:
+        # Concurrent upserts of one pair race on the unique index; the other request saved it
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+        upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+    added = {job_ids[index] for index in upserted}
+    _update_saved_ids(user["id"], added=added)
+    return added
+
 
 # -------------------------------
 # Add a job to "Apply Later"
 # -------------------------------
 @router.post("/add/{job_id}")
-async def add_apply_later(job_id: str, user=Depends(get_current_user)):
-    print(f"Adding job {job_id} to Apply Later for user {user['email']}")
-    
-    # Try to find job by job_id first, then by _id
-    job = await jobs_col.find_one({"job_id": job_id})
-    if not job:
-        try:
-            job = await jobs_col.find_one({"_id": ObjectId(job_id)})
-        except:
-            job = None
-    
-    if not job:
+async def add_apply_later(job_id: str, user=Depends(get_current_principal)):
+    actual_job_id = (await resolve_job_ids([job_id])).get(job_id)
+    if not actual_job_id:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Use the correct job_id (either from job_id field or _id)
-    actual_job_id = job.get("job_id") or str(job["_id"])
-    
-    # Check if already saved in apply_later collection
-    existing = await apply_later_col.find_one({
-        "user_id": user["id"], 
-        "job_id": actual_job_id
-    })
-    if existing:
-        print(f"Job {actual_job_id} already saved for user {user['email']}")
-        return {"status": "exists"}
 
-    # Also check in user's saved_jobs array (if using that approach)
-    user_doc = await users_col.find_one({"_id": ObjectId(user["id"])})
-    if user_doc:
-        saved_jobs = user_doc.get("saved_jobs", [])
-        if actual_job_id in saved_jobs:
-            print(f"Job {actual_job_id} already in user's saved_jobs")
-            return {"status": "exists"}
-
-    # Insert into apply_later collection
-    doc = {
-        "user_id": user["id"],
-        "job_id": actual_job_id,
-        "saved_at": datetime.utcnow(),
-        "status": "pending",
-        "user_email": user["email"]
-    }
-    result = await apply_later_col.insert_one(doc)
-    print(f"Job {actual_job_id} saved to apply_later collection for user {user['email']}")
-
-    # Also add to user's saved_jobs array for redundancy
-    await users_col.update_one(
-        {"_id": ObjectId(user["id"])},
-        {"$addToSet": {"saved_jobs": actual_job_id}},
-        upsert=True
-    )
-    
+    if not await save_jobs(user, [actual_job_id]):
+        logger.debug("Job %s already saved for user %s", actual_job_id, user["email"])
+        return {"status": "exists"}
+    logger.debug("Job %s saved to apply_later for user %s", actual_job_id, user["email"])
     return {"status": "saved", "message": "Job added to Apply Later"}
 
+
+@router.post("/batch")
+async def add_apply_later_batch(body: JobIdList, user=Depends(get_current_principal)):
+    """Save many jobs at once; ids come back grouped as saved, exists or not_found."""
+    resolved = await resolve_job_ids(body.job_ids)
+    added = await save_jobs(user, list(dict.fromkeys(resolved.values())))
+
+    result: Dict[str, List[str]] = {"saved": [], "exists": [], "not_found": []}
+    for job_id in dict.fromkeys(body.job_ids):
+        actual_job_id = resolved.get(job_id)
+        if actual_job_id is None:
+            result["not_found"].append(job_id)
+        else:
+            result["saved" if actual_job_id in added else "exists"].append(job_id)
+    return result
+
 # -------------------------------
 # List all "Apply Later" jobs for the current user
 # -------------------------------
-@router.get("/list")
-async def list_apply_later(user=Depends(get_current_user)):
-    print(f"Fetching Apply Later jobs for user {user['email']}")
+@router.get("/list", response_class=RawJSONResponse)
+async def list_apply_later(limit: int = Query(100, ge=1, le=1000), user=Depends(get_current_principal)):
     
     # Fetch saved apply_later items
-    items = await apply_later_col.find({"user_id": user["id"]}).to_list(100)
-    print(f"Found {len(items)} apply_later items for user {user['email']}")
+    items = await apply_later_col.find({"user_id": user["id"]}).to_list(limit)
+    logger.debug("Found %d apply_later items for user %s", len(items), user["email"])
     
     if not items:
-        return {"jobs": [], "count": 0}
+        return RawJSONResponse(dumps({"jobs": [], "count": 0}))
     
-    job_ids = [item["job_id"] for item in items]
-    print(f"Looking for jobs with IDs: {job_ids}")
+    # Resolve every saved job (by job_id or _id) with a single query
+    jobs_by_id = await fetch_jobs_by_ids((item["job_id"] for item in items), projection=CARD_JSON_PROJECTION)
+    await fill_card_json(list(jobs_by_id.values()))
 
-    # Fetch the actual job details using both job_id and _id
     jobs = []
-    for job_id in job_ids:
-        # Try to find by job_id first
-        job = await jobs_col.find_one({"job_id": job_id})
+    for item in items:
+        job = jobs_by_id.get(item["job_id"])
         if not job:
-            try:
-                # Try to find by _id
-                job = await jobs_col.find_one({"_id": ObjectId(job_id)})
-            except:
-                job = None
-        
-        if job:
-            serialized_job = serialize_job(job)
+            logger.warning("Saved job %s not found in jobs collection", item["job_id"])
+            continue
+        jobs.append(splice_card(job["card_json"], {
+            "_id": str(job["_id"]),
+            "id": str(job["_id"]),
             # Mark as saved
-            serialized_job["isSaved"] = True
-            # Add saved_at timestamp
-            saved_item = next((item for item in items if item["job_id"] == job_id), None)
-            if saved_item:
-                serialized_job["saved_at"] = saved_item["saved_at"].isoformat() if saved_item.get("saved_at") else None
-            jobs.append(serialized_job)
-        else:
-            print(f"Job with ID {job_id} not found in jobs collection")
+            "isSaved": True,
+            "saved_at": item["saved_at"].isoformat() if item.get("saved_at") else None,
+        }))
 
-    print(f"Returning {len(jobs)} jobs for Apply Later")
-    return {
-        "jobs": serialize_doc(jobs),
-        "count": len(jobs)
-    }
+    logger.debug("Returning %d jobs for Apply Later", len(jobs))
+    return RawJSONResponse(b'{"jobs":' + json_array(jobs) + b',"count":' + str(len(jobs)).encode() + b"}")
 
 # -------------------------------
 # Remove a job from "Apply Later"
 # -------------------------------
 @router.delete("/remove/{job_id}")
-async def remove_apply_later(job_id: str, user=Depends(get_current_user)):
-    print(f"Removing job {job_id} from Apply Later for user {user['email']}")
-    
-    # Try to find the actual job to get the correct ID
-    job = await jobs_col.find_one({"job_id": job_id})
-    if not job:
-        try:
-            job = await jobs_col.find_one({"_id": ObjectId(job_id)})
-        except:
-            job = None
-    
-    # Determine the actual job ID to remove
+async def remove_apply_later(job_id: str, user=Depends(get_current_principal)):
     actual_job_id = job_id
-    if job:
-        actual_job_id = job.get("job_id") or str(job["_id"])
-
-    # Remove from apply_later collection
-    result = await apply_later_col.delete_one({
-        "user_id": user["id"], 
-        "job_id": actual_job_id
-    })
-    
-    # Also remove from user's saved_jobs array
-    await users_col.update_one(
-        {"_id": ObjectId(user["id"])},
-        {"$pull": {"saved_jobs": actual_job_id}}
-    )
-
+    # delete_many: a pair saved twice before the unique index existed goes in one remove
+    result = await apply_later_col.delete_many({"user_id": user["id"], "job_id": job_id})
+    if result.deleted_count == 0 and ObjectId.is_valid(job_id):
+        # Named by _id (older clients): retry with the id the save was stored under
+        actual_job_id = (await resolve_job_ids([job_id])).get(job_id, job_id)
+        if actual_job_id != job_id:
+            result = await apply_later_col.delete_many({"user_id": user["id"], "job_id": actual_job_id})
+
+    _update_saved_ids(user["id"], removed=[actual_job_id])
     if result.deleted_count == 0:
-        print(f"Job {actual_job_id} not found in apply_later for user {user['email']}")
+        logger.debug("Job %s not found in apply_later for user %s", actual_job_id, user["email"])
         return {"status": "not_found"}
     
-    print(f"Job {actual_job_id} removed from Apply Later for user {user['email']}")
+    logger.debug("Job %s removed from Apply Later for user %s", actual_job_id, user["email"])
     return {"status": "removed", "message": "Job removed from Apply Later"}
 
+
+@router.delete("/batch")
+async def remove_apply_later_batch(body: JobIdList, user=Depends(get_current_principal)):
+    """Remove many jobs at once with a single delete_many."""
+    job_ids = set(body.job_ids)
+    legacy = [job_id for job_id in job_ids if ObjectId.is_valid(job_id)]
+    if legacy:
+        job_ids.update((await resolve_job_ids(legacy)).values())
+    result = await apply_later_col.delete_many({"user_id": user["id"], "job_id": {"$in": list(job_ids)}})
+    _update_saved_ids(user["id"], removed=job_ids)
+    return {"status": "removed", "removed": result.deleted_count}
+
 # -------------------------------
 # Get Apply Later count for stats
 # -------------------------------
 @router.get("/count")
-async def get_apply_later_count(user=Depends(get_current_user)):
+async def get_apply_later_count(user=Depends(get_current_principal)):
     count = await apply_later_col.count_documents({"user_id": user["id"]})
     return {"count": count}
 
 # -------------------------------
-# Check if a job is saved
+# Check if jobs are saved
 # -------------------------------
+@router.post("/check")
+async def check_saved_statuses(body: JobIdList, user=Depends(get_current_principal)):
+    """Saved state of many jobs at once: {"saved": {job_id: bool}}."""
+    return {"saved": await saved_status(user["id"], body.job_ids)}
+
+
 @router.get("/check/{job_id}")
-async def check_saved_status(job_id: str, user=Depends(get_current_user)):
-    # Try to find the actual job to get the correct ID
-    job = await jobs_col.find_one({"job_id": job_id})
-    if not job:
-        try:
-            job = await jobs_col.find_one({"_id": ObjectId(job_id)})
-        except:
-            job = None
-    
-    actual_job_id = job_id
-    if job:
-        actual_job_id = job.get("job_id") or str(job["_id"])
-
-    # Check in apply_later collection
-    saved = await apply_later_col.find_one({
-        "user_id": user["id"], 
-        "job_id": actual_job_id
-    })
-    
-    return {"is_saved": bool(saved)}
\ No newline at end of file
+async def check_saved_status(job_id: str, user=Depends(get_current_principal)):
+    status = await saved_status(user["id"], [job_id])
+    return {"is_saved": status[job_id]}
@@ -5,36 +5,58 @@ from typing import List
 from datetime import timedelta
 from bson import ObjectId
 
-from .models import UserCreate, UserOut, Token
+from .models import UserCreate, UserOut, UserOutWithToken, Token
 from .db import users_col
-from .utils import hash_password, verify_password, create_access_token, decode_token
+from .cache import TTLCache
+from .config import settings
+from .matching import recommendation_cache, skill_index
+from .logs import get_logger
+from .utils import (
+    hash_password_async, verify_and_update_password_async, PasswordWorkSaturated,
+    create_access_token, decode_token_claims
+)
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+# For public endpoints with optional per-user extras: None when no token is sent
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
+
+def password_pool_busy():
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts in progress, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+# Authenticated users by id; short TTL so other workers see profile edits quickly
+principal_cache = TTLCache(
+    "principals",
+    max_entries=settings.AUTH_USER_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
 
 # ----------------------
 # Register User
 # ----------------------
 @router.post("/register", response_model=UserOut)
 async def register(user: UserCreate):
-    # ---- PRINT RAW INPUT ----
-    print("Raw input from client:", user.dict())
+    logger.debug("Register request for %s", user.email)
 
     email_normalized = user.email.lower()
     existing = await users_col.find_one({"email": email_normalized})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = hash_password(user.password)
-
-    # ---- PRINT SKILLS BEFORE CLEANING ----
-    print("Skills before cleaning:", user.skills)
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except PasswordWorkSaturated:
+        raise password_pool_busy()
 
     # Clean and validate skills
     skills = [skill.strip() for skill in user.skills if skill.strip()]
-
-    # ---- PRINT SKILLS AFTER CLEANING ----
-    print("Skills after cleaning:", skills)
+    logger.debug("Skills before cleaning: %s, after: %s", user.skills, skills)
 
     if not skills:
         raise HTTPException(status_code=400, detail="Skills cannot be empty")
@@ -48,9 +70,10 @@ async def register(user: UserCreate):
     })
 
     user_doc = await users_col.find_one({"_id": res.inserted_id})
+    if skill_index.ready:
+        skill_index.set_user(str(res.inserted_id), skills)
 
-    # ---- PRINT FINAL DB DOCUMENT ----
-    print("Inserted document:", user_doc)
+    logger.info("Registered user %s", user_doc["email"])
 
     return {
         "id": str(user_doc["_id"]),
@@ -59,6 +82,19 @@ async def register(user: UserCreate):
         "skills": user_doc.get("skills")
     }
 
+def issue_token(user: dict) -> str:
+    """Access token for a user document; "sv" carries its skills_version."""
+    return create_access_token(
+        str(user["_id"]),
+        expires_delta=timedelta(hours=1),
+        claims={
+            "email": user["email"],
+            "name": user.get("name"),
+            "sv": user.get("skills_version", 0),
+        }
+    )
+
+
 # ----------------------
 # Login User & Get Token
 # ----------------------
@@ -66,25 +102,31 @@ async def register(user: UserCreate):
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
-    #  ADDED DEBUG LINES - This will show what the backend receives
-    print(f"DEBUG: Received login request")
-    print(f"DEBUG - Username received: {form_data.username}")
-    print(f"DEBUG - Password received: {form_data.password}")
-    
     email_normalized = form_data.username.lower()
     user = await users_col.find_one({"email": email_normalized})
 
-    print(f" DEBUG - User found in database: {user is not None}")
+    logger.debug("Login for %s, user found: %s", email_normalized, user is not None)
 
-    if not user or not verify_password(form_data.password, user["password"]):
-        print(f" DEBUG - Login failed: User not found or password incorrect")
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await verify_and_update_password_async(form_data.password, user["password"])
+        except PasswordWorkSaturated:
+            raise password_pool_busy()
+
+    if not valid:
+        logger.info("Login failed for %s", email_normalized)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
 
-    token = create_access_token(str(user["_id"]), expires_delta=timedelta(hours=1))
-    print(f" DEBUG - Login successful, token generated for user: {user['email']}")
+    # Stored hash uses deprecated settings; replace it with the fresh one
+    if new_hash:
+        await users_col.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+
+    token = issue_token(user)
+    logger.debug("Login successful for %s", user["email"])
     return {"access_token": token, "token_type": "bearer"}
 
 
@@ -92,20 +134,59 @@ async def login_for_access_token(
 # Get Current User
 # ----------------------
 async def get_current_user(token: str = Depends(oauth2_scheme)):
-    user_id = decode_token(token)
+    claims = decode_token_claims(token)
+    user_id = claims.get("sub") if claims else None
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = await users_col.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+    # A token minted after a skills change (higher "sv") bypasses older cache entries
+    token_version = claims.get("sv", 0)
+    principal = principal_cache.get(user_id)
+    if principal is None or principal["skills_version"] < token_version:
+        user = await users_col.find_one({"_id": ObjectId(user_id)})
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+
+        principal = {
+            "id": str(user["_id"]),
+            "email": user["email"],
+            "name": user.get("name"),
+            "skills": user.get("skills"),
+            "skills_version": user.get("skills_version", 0)
+        }
+        principal_cache.set(user_id, principal)
+
+    # A token minted before the latest skills change is refused; update_skills
+    # hands the caller a fresh one. Other workers notice once their cached
+    # principal expires (AUTH_USER_CACHE_TTL_SECONDS).
+    if principal["skills_version"] > token_version:
+        raise HTTPException(status_code=401, detail="Token is out of date, please sign in again",
+                            headers={"WWW-Authenticate": "Bearer"})
+    return dict(principal)
 
-    return {
-        "id": str(user["_id"]),
-        "email": user["email"],
-        "name": user.get("name"),
-        "skills": user.get("skills")
-    }
+
+# ----------------------
+# Get Current Principal (identity only)
+# ----------------------
+async def get_current_principal(token: str = Depends(oauth2_scheme)):
+    """
+    Identity (id, email, name) for endpoints that don't need the profile.
+
+    With AUTH_TRUST_TOKEN_CLAIMS enabled the signed token claims are used
+    as-is, so no database or cache lookup happens; a deleted user, or a
+    token from before a skills change, keeps access until it expires.
+    Otherwise this is get_current_user.
+    """
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        claims = decode_token_claims(token)
+        if claims and claims.get("sub") and claims.get("email"):
+            return {
+                "id": claims["sub"],
+                "email": claims["email"],
+                "name": claims.get("name"),
+                "skills_version": claims.get("sv", 0)
+            }
+    return await get_current_user(token)
 
 
 # ----------------------
@@ -118,7 +199,7 @@ async def read_me(current_user: dict = Depends(get_current_user)):
 # ----------------------
 # Update User Skills
 # ----------------------
-@router.put("/skills", response_model=UserOut)
+@router.put("/skills", response_model=UserOutWithToken)
 async def update_skills(
     skills: List[constr(strip_whitespace=True, min_length=1)] = Body(...),
     current_user: dict = Depends(get_current_user)
@@ -131,19 +212,30 @@ async def update_skills(
     # Update the skills in the database
     update_result = await users_col.update_one(
         {"_id": ObjectId(current_user["id"])},
-        {"$set": {"skills": clean_skills}}
+        {"$set": {"skills": clean_skills}, "$inc": {"skills_version": 1}}
     )
 
+    # Cached principal, recommendations and the skill index all depend on skills
+    principal_cache.invalidate(current_user["id"])
+    recommendation_cache.invalidate(current_user["id"])
+    if skill_index.ready:
+        skill_index.set_user(current_user["id"], clean_skills)
+
     if update_result.modified_count == 0:
         # Optional: return an info if nothing was updated
-        print("No changes made to skills (skills may be the same as before).")
+        logger.debug("No changes made to skills for %s", current_user["email"])
 
     # Fetch updated user document
     user = await users_col.find_one({"_id": ObjectId(current_user["id"])})
 
+    # The caller's token still carries the old "sv", which would keep
+    # accepting principals cached before the change on other workers;
+    # hand back a token minted with the new skills_version
     return {
         "id": str(user["_id"]),
         "email": user["email"],
         "name": user.get("name"),
-        "skills": user.get("skills")
+        "skills": user.get("skills"),
+        "access_token": issue_token(user),
+        "token_type": "bearer"
     }
\ No newline at end of file
@@ -8,12 +8,67 @@ load_dotenv(dotenv_path=env_path)
 
 class Settings:
     MONGODB_URI: str = os.getenv("MONGODB_URI")
+    MONGODB_TLS: bool = os.getenv("MONGODB_TLS", "true").lower() in ("1", "true", "yes")
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    INDEX_DIAGNOSTICS: bool = os.getenv("INDEX_DIAGNOSTICS", "false").lower() in ("1", "true", "yes")
     JWT_SECRET: str = os.getenv("JWT_SECRET")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
+    PASSWORD_WORKERS: int = int(os.getenv("PASSWORD_WORKERS", "4"))
+    PASSWORD_QUEUE_LIMIT: int = int(os.getenv("PASSWORD_QUEUE_LIMIT", "32"))
+    AUTH_USER_CACHE_SIZE: int = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+    AUTH_USER_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+    AUTH_TRUST_TOKEN_CLAIMS: bool = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() in ("1", "true", "yes")
     FINDWORK_API_KEY: str = os.getenv("FINDWORK_API_KEY")
     FINDWORK_API_URL: str = os.getenv("FINDWORK_API_URL", "https://findwork.dev/api/jobs/")
+    FINDWORK_MAX_PAGES: int = int(os.getenv("FINDWORK_MAX_PAGES", "10"))
+    FINDWORK_CONCURRENCY: int = int(os.getenv("FINDWORK_CONCURRENCY", "4"))
+    FINDWORK_RATE_PER_SECOND: float = float(os.getenv("FINDWORK_RATE_PER_SECOND", "5"))
+    FINDWORK_MAX_RETRIES: int = int(os.getenv("FINDWORK_MAX_RETRIES", "4"))
+    FINDWORK_BACKOFF_BASE_SECONDS: float = float(os.getenv("FINDWORK_BACKOFF_BASE_SECONDS", "0.5"))
+    FINDWORK_BACKOFF_MAX_SECONDS: float = float(os.getenv("FINDWORK_BACKOFF_MAX_SECONDS", "30"))
+    FINDWORK_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("FINDWORK_CONNECT_TIMEOUT_SECONDS", "5"))
+    FINDWORK_READ_TIMEOUT_SECONDS: float = float(os.getenv("FINDWORK_READ_TIMEOUT_SECONDS", "20"))
+    FINDWORK_BREAKER_THRESHOLD: int = int(os.getenv("FINDWORK_BREAKER_THRESHOLD", "5"))
+    FINDWORK_BREAKER_RESET_SECONDS: float = float(os.getenv("FINDWORK_BREAKER_RESET_SECONDS", "60"))
+    FINDWORK_HTTP2: bool = os.getenv("FINDWORK_HTTP2", "true").lower() in ("1", "true", "yes")
+    INGEST_BULK_SIZE: int = int(os.getenv("INGEST_BULK_SIZE", "500"))
+    INGEST_FINDWORK: bool = os.getenv("INGEST_FINDWORK", "true").lower() in ("1", "true", "yes")
+    # Comma-separated, each entry "url" or "name=url" (files: "path" or "name=path")
+    INGEST_FEED_URLS: str = os.getenv("INGEST_FEED_URLS", "")
+    INGEST_FILE_PATHS: str = os.getenv("INGEST_FILE_PATHS", "")
+    INGEST_FEED_RATE_PER_SECOND: float = float(os.getenv("INGEST_FEED_RATE_PER_SECOND", "2"))
+    SAVED_IDS_CACHE_SIZE: int = int(os.getenv("SAVED_IDS_CACHE_SIZE", "10000"))
+    SAVED_IDS_CACHE_TTL_SECONDS: int = int(os.getenv("SAVED_IDS_CACHE_TTL_SECONDS", "30"))
+    RECOMMEND_TOP_K: int = int(os.getenv("RECOMMEND_TOP_K", "6"))
+    RECOMMEND_N_FEATURES: int = int(os.getenv("RECOMMEND_N_FEATURES", str(2 ** 18)))
+    RECOMMEND_REFRESH_SECONDS: int = int(os.getenv("RECOMMEND_REFRESH_SECONDS", "300"))
+    RECOMMEND_CACHE_SIZE: int = int(os.getenv("RECOMMEND_CACHE_SIZE", "10000"))
+    RECOMMEND_CACHE_TTL_SECONDS: int = int(os.getenv("RECOMMEND_CACHE_TTL_SECONDS", "900"))
+    DASHBOARD_DEADLINE_DAYS: int = int(os.getenv("DASHBOARD_DEADLINE_DAYS", "7"))
+    DASHBOARD_DEADLINE_LIMIT: int = int(os.getenv("DASHBOARD_DEADLINE_LIMIT", "5"))
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    JOBS_CACHE_MAX_AGE_SECONDS: int = int(os.getenv("JOBS_CACHE_MAX_AGE_SECONDS", "300"))
+    CATALOG_VERSION_TTL_SECONDS: int = int(os.getenv("CATALOG_VERSION_TTL_SECONDS", "5"))
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    HEALTH_PROBE_INTERVAL_SECONDS: int = int(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "10"))
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "2"))
+    SCHEDULER_LEASE_SECONDS: int = int(os.getenv("SCHEDULER_LEASE_SECONDS", "120"))
     FCM_SERVER_KEY: str = os.getenv("FCM_SERVER_KEY")
+    NOTIFY_CONCURRENCY: int = int(os.getenv("NOTIFY_CONCURRENCY", "20"))
+    NOTIFY_BATCH_SIZE: int = int(os.getenv("NOTIFY_BATCH_SIZE", "500"))
+    NOTIFY_NEW_JOB_MATCHES: bool = os.getenv("NOTIFY_NEW_JOB_MATCHES", "true").lower() in ("1", "true", "yes")
+    # Skills a new job must match before it is notified (capped at the user's own skill count)
+    NOTIFY_MIN_MATCHED_SKILLS: int = int(os.getenv("NOTIFY_MIN_MATCHED_SKILLS", "2"))
+    NOTIFY_MATCH_MAX_JOBS: int = int(os.getenv("NOTIFY_MATCH_MAX_JOBS", "20"))
+    NOTIFY_RETENTION_DAYS: int = int(os.getenv("NOTIFY_RETENTION_DAYS", "30"))
+    NOTIFY_STREAM_POLL_SECONDS: float = float(os.getenv("NOTIFY_STREAM_POLL_SECONDS", "15"))
+    NOTIFY_STREAM_BATCH_SIZE: int = int(os.getenv("NOTIFY_STREAM_BATCH_SIZE", "100"))
+    NOTIFY_STREAM_TICKET_SECONDS: int = int(os.getenv("NOTIFY_STREAM_TICKET_SECONDS", "60"))
+    SKILL_INDEX_REFRESH_SECONDS: int = int(os.getenv("SKILL_INDEX_REFRESH_SECONDS", "900"))
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./app/static/uploads")
     CRON_FETCH_INTERVAL_MINUTES: int = int(os.getenv("CRON_FETCH_INTERVAL_MINUTES", "60"))
 
@@ -0,0 +1,149 @@
+"""
+Dashboard summary.
+
+One response with everything the dashboard opens with: saved count,
+application counts by status, upcoming deadlines among saved jobs and
+the user's recommendations. The per-user numbers and the recommended
+jobs come from a single $facet aggregation rooted at the user's
+document; the ranking itself is read from recommendation_cache, so a
+warm dashboard costs one round trip to Mongo.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from fastapi import APIRouter, Depends
+
+from .auth import get_current_user
+from .config import settings
+from .db import applications_col, apply_later_col, jobs_col, users_col
+from .http_cache import PRIVATE_CACHE_CONTROL
+from .logs import get_logger
+from .matching import job_matrix, recommend_for_user
+from .recommend import annotate_ranked, mark_popular, newest_jobs
+from .responses import FastJSONResponse
+from .scheduler import deadline_window
+from .serializers import PROFILES, serialize_job
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+# Saved items and jobs are joined on job_id, which ingestion writes on every job
+_JOB_CARD = {field: 1 for field in PROFILES["card"]}
+
+
+def _job_lookup(local_field: str, pipeline: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Join jobs by job_id into `job`, running `pipeline` on the matches
+    inside the lookup, so only what it returns (card fields) is joined
+    rather than whole job documents with raw and description.
+    localField with a pipeline keeps the job_id index for the join
+    (MongoDB 5.0+; mongomock does not implement lookup pipelines).
+    """
+    return {"$lookup": {"from": jobs_col.name, "localField": local_field, "foreignField": "job_id",
+                        "pipeline": pipeline + [{"$project": _JOB_CARD}], "as": "job"}}
+
+
+def summary_pipeline(user_id: str, recommended_ids: List[str], now: datetime) -> List[Dict[str, Any]]:
+    """
+    The dashboard aggregation over users.
+
+    The user's saves and applications are joined onto their document
+    once and trimmed to ids and statuses, then each facet reads from that
+    single document. Jobs are looked up once for the saved ids within
+    the deadline window and once for the ranked ids, each returning card
+    fields only, so the joined arrays stay small however many jobs the
+    user has saved.
+    """
+    facets: Dict[str, List[Dict[str, Any]]] = {
+        "saved": [{"$project": {"_id": 0, "count": {"$size": "$saved_ids"}}}],
+        "applications": [
+            {"$unwind": "$applications"},
+            {"$group": {"_id": "$applications.status", "count": {"$sum": 1}}},
+        ],
+        "deadlines": [
+            _job_lookup("saved_ids", [{"$match": deadline_window(now, settings.DASHBOARD_DEADLINE_DAYS)}]),
+            {"$project": {"_id": 0, "job": 1}},
+        ],
+        "recommended_saved": [
+            {"$project": {"_id": 0, "job_ids": {"$filter": {
+                "input": "$saved_ids", "as": "job_id", "cond": {"$in": ["$$job_id", recommended_ids]},
+            }}}},
+        ],
+    }
+    if recommended_ids:
+        facets["recommended"] = [
+            _job_lookup("recommended_ids", []),
+            {"$project": {"_id": 0, "job": 1}},
+        ]
+    return [
+        {"$match": {"_id": ObjectId(user_id)}},
+        {"$project": {"_id": 0, "user_id": {"$toString": "$_id"}, "recommended_ids": {"$literal": recommended_ids}}},
+        {"$lookup": {"from": apply_later_col.name, "localField": "user_id",
+                     "foreignField": "user_id", "as": "saved"}},
+        {"$lookup": {"from": applications_col.name, "localField": "user_id",
+                     "foreignField": "user_id", "as": "applications"}},
+        {"$project": {"recommended_ids": 1, "applications.status": 1, "saved_ids": "$saved.job_id"}},
+        {"$facet": facets},
+    ]
+
+
+def _first(facet: List[Dict[str, Any]], key: str, default: Any) -> Any:
+    # Each facet but "applications" reduces the single user document to one row
+    return facet[0].get(key, default) if facet else default
+
+
+def _deadline_key(last_date: Any) -> str:
+    return last_date.date().isoformat() if isinstance(last_date, datetime) else str(last_date)
+
+
+@router.get("/summary", response_class=FastJSONResponse)
+async def dashboard_summary(current_user: dict = Depends(get_current_user)):
+    now = datetime.utcnow()
+    user_skills = current_user.get("skills") or []
+    await job_matrix.sync()
+    ranked = recommend_for_user(current_user["id"], user_skills, settings.RECOMMEND_TOP_K) if user_skills else []
+    # No ranking (no skills, or nothing matched): newest jobs, as /recommended-jobs does
+    newest = [] if ranked else mark_popular(await newest_jobs(settings.RECOMMEND_TOP_K), "Popular jobs for you")
+    recommended_ids = [r["job_id"] for r in ranked] or [job["job_id"] for job in newest if job.get("job_id")]
+
+    results = await users_col.aggregate(summary_pipeline(current_user["id"], recommended_ids, now)).to_list(1)
+    facets = results[0] if results else {}
+
+    by_status: Dict[str, int] = {}
+    for row in facets.get("applications", []):
+        status = row["_id"] or "unknown"
+        by_status[status] = by_status.get(status, 0) + row["count"]
+
+    deadlines = sorted(_first(facets.get("deadlines"), "job", []), key=lambda job: _deadline_key(job.get("last_date")))
+    urgent_before = (now + timedelta(days=2)).date().isoformat()
+    upcoming = []
+    for doc in deadlines[:settings.DASHBOARD_DEADLINE_LIMIT]:
+        job = serialize_job(doc, "card")
+        job["is_saved"] = True
+        upcoming.append(job)
+
+    if ranked:
+        docs = {doc["job_id"]: doc for doc in _first(facets.get("recommended"), "job", [])}
+        recommended = annotate_ranked(ranked, docs)
+    else:
+        recommended = newest
+    saved_ids = set(_first(facets.get("recommended_saved"), "job_ids", []))
+    for job in recommended:
+        job["is_saved"] = job.get("job_id") in saved_ids
+
+    saved_count = _first(facets.get("saved"), "count", 0)
+    logger.debug("Dashboard for %s: %d saved, %d applications, %d upcoming deadlines",
+                 current_user["email"], saved_count, sum(by_status.values()), len(deadlines))
+    return FastJSONResponse({
+        "saved_count": saved_count,
+        "applications": {"total": sum(by_status.values()), "by_status": by_status},
+        "deadlines": {
+            "upcoming_count": len(deadlines),
+            "urgent_count": sum(_deadline_key(job.get("last_date")) < urgent_before for job in deadlines),
+            "days": settings.DASHBOARD_DEADLINE_DAYS,
+            "upcoming": upcoming,
+        },
+        "recommended": recommended,
+    }, headers={"Cache-Control": PRIVATE_CACHE_CONTROL})
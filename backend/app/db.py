@@ -1,15 +1,19 @@
 # app/db.py
 from motor.motor_asyncio import AsyncIOMotorClient
 from .config import settings
+from .metrics import MongoCommandMetrics
 
-# Add SSL configuration to fix connection issues
+# Add SSL configuration to fix connection issues; MONGODB_TLS=false for a
+# local mongod (development, benchmarks/bench_load.py)
+# (tlsAllowInvalidCertificates bypasses SSL certificate validation)
+tls_options = {"tls": True, "tlsAllowInvalidCertificates": True} if settings.MONGODB_TLS else {}
 client = AsyncIOMotorClient(
     settings.MONGODB_URI,
-    tls=True,
-    tlsAllowInvalidCertificates=True,  # Bypass SSL certificate validation
+    **tls_options,
     connectTimeoutMS=30000,
     socketTimeoutMS=30000,
-    serverSelectionTimeoutMS=30000
+    serverSelectionTimeoutMS=30000,
+    event_listeners=[MongoCommandMetrics()]
 )
 
 db = client["workscope"]
@@ -17,4 +21,7 @@ db = client["workscope"]
 users_col = db["users"]
 jobs_col = db["jobs"]
 apply_later_col = db["apply_later"]
-applications_col = db["applications"]
\ No newline at end of file
+applications_col = db["applications"]
+ingest_state_col = db["ingest_state"]
+scheduler_jobs_col = db["scheduler_jobs"]
+notifications_col = db["notifications"]
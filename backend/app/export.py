@@ -0,0 +1,172 @@
+"""
+Streaming bulk export of the job catalog.
+
+Rows are read from one Motor cursor in `_id` order, `batch_size` at a
+time, and each batch is encoded and sent before the next is read, so
+memory stays flat however large the catalog is. Every row carries its
+`_id`; pass the last one back as `after` to resume an interrupted export.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from .auth import get_current_principal
+from .config import settings
+from .db import jobs_col
+from .hydration import fill_card_json
+from .logs import get_logger
+from .responses import dumps
+from .search import build_text_query, location_filter, parse_fields
+from .serializers import CARD_JSON_PROJECTION, job_projection, serialize_job, splice_card
+
+# Declared on the /jobs prefix; main includes it before the jobs router so
+# /jobs/export is not taken for a job_id
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+logger = get_logger(__name__)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+CSV_COLUMNS = [
+    "_id", "job_id", "title", "company_name", "location", "remote", "url",
+    "date_posted", "last_date", "summary",
+]
+
+
+def export_filter(
+    q: Optional[str],
+    location: Optional[str],
+    updated_since: Optional[datetime],
+    after: Optional[str],
+) -> Dict[str, Any]:
+    clauses = []
+    if q:
+        text_query, _, _ = build_text_query(q, parse_fields(None))
+        clauses.append(text_query)
+    if location:
+        clauses.append(location_filter(location))
+    if updated_since:
+        clauses.append({"updated_at": {"$gte": updated_since}})
+    if after:
+        if not ObjectId.is_valid(after):
+            raise HTTPException(status_code=400, detail="Invalid 'after' id")
+        clauses.append({"_id": {"$gt": ObjectId(after)}})
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+# -------------------------------------------------------------------
+# Batch encoders
+# -------------------------------------------------------------------
+async def ndjson_batch(docs: List[Dict[str, Any]], profile: str) -> bytes:
+    if profile == "card":
+        # Same pre-rendered cards as GET /jobs
+        await fill_card_json(docs)
+        rows = [splice_card(doc["card_json"], {"_id": str(doc["_id"])}) for doc in docs]
+    else:
+        rows = [dumps(serialize_job(doc, profile)) for doc in docs]
+    return b"\n".join(rows) + b"\n"
+
+
+def csv_batch(docs: List[Dict[str, Any]], columns: List[str], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    for doc in docs:
+        row = []
+        for column in columns:
+            value = doc.get(column)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            row.append("" if value is None else str(value))
+        writer.writerow(row)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def export_chunks(
+    query: Dict[str, Any],
+    fmt: str = "ndjson",
+    profile: str = "card",
+    batch_size: int = settings.EXPORT_BATCH_SIZE,
+    compress: bool = False,
+    database=None,
+) -> AsyncIterator[bytes]:
+    """Yield the encoded export, one chunk per cursor batch."""
+    collection = database.jobs if database is not None else jobs_col
+    columns = CSV_COLUMNS + (["description"] if profile != "card" else [])
+    if fmt == "csv":
+        projection = {column: 1 for column in columns}
+    elif profile == "card":
+        projection = dict(CARD_JSON_PROJECTION)
+    else:
+        projection = job_projection(profile)
+
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    header = fmt == "csv"
+
+    async def encode(docs: List[Dict[str, Any]]) -> bytes:
+        nonlocal header
+        if fmt == "csv":
+            chunk = csv_batch(docs, columns, header=header)
+            header = False
+        else:
+            chunk = await ndjson_batch(docs, profile) if docs else b""
+        return gzip.compress(chunk) if gzip is not None else chunk
+
+    cursor = collection.find(query, projection).sort("_id", 1).batch_size(batch_size)
+    batch: List[Dict[str, Any]] = []
+    try:
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                chunk = await encode(batch)
+                batch = []
+                if chunk:
+                    yield chunk
+        if batch or header:
+            chunk = await encode(batch)
+            if chunk:
+                yield chunk
+        if gzip is not None:
+            yield gzip.flush()
+    finally:
+        await cursor.close()
+
+
+# -------------------------------------------------------------------
+# GET /jobs/export
+# -------------------------------------------------------------------
+@router.get("/export")
+async def export_jobs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    profile: str = Query("card", pattern="^(card|detail|full)$"),
+    q: Optional[str] = None,
+    location: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    after: Optional[str] = None,
+    batch_size: int = Query(settings.EXPORT_BATCH_SIZE, ge=100, le=10000),
+    gzip: bool = False,
+    current_user=Depends(get_current_principal),
+):
+    """
+    Stream the catalog (or a filtered slice) as NDJSON or CSV in `_id` order.
+
+    `after` resumes from the last `_id` received. With `gzip=true` the
+    body is a .gz file rather than a transfer encoding.
+    """
+    query = export_filter(q, location, updated_since, after)
+    filename = f"jobs.{format}" + (".gz" if gzip else "")
+    logger.info("Job export started", extra={"user": current_user["email"], "format": format, "profile": profile})
+    return StreamingResponse(
+        export_chunks(query, format, profile, batch_size, compress=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,156 @@
+"""
+Liveness and readiness.
+
+A background task probes Mongo, the scheduler and the last ingest every
+HEALTH_PROBE_INTERVAL_SECONDS and keeps the result; the endpoints only
+read that snapshot, so load balancer polling adds no database load.
+
+- /health/live: the process is up and its event loop is responding.
+- /health/ready: 200 when Mongo answered the last probe and the probe
+  itself is current, 503 otherwise. A stopped scheduler or a stale
+  ingest marks the instance "degraded" without taking it out of rotation.
+- /health: same as ready, with the status/message shape the frontend reads.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from .config import settings
+from .db import client, ingest_state_col
+from .ingest import LAST_INGEST_KEY
+from .logs import get_logger
+from .scheduler import scheduler
+
+logger = get_logger(__name__)
+
+router = APIRouter(tags=["health"])
+
+
+class HealthMonitor:
+    def __init__(self):
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.checked_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------------------------------------------------------------
+    # Probes
+    # ---------------------------------------------------------------
+    async def _mongo(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(client.admin.command("ping"), settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+        except Exception as e:
+            return {"ok": False, "error": str(e) or type(e).__name__}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    def _scheduler(self) -> Dict[str, Any]:
+        jobs = {
+            job.id: job.next_run_time.isoformat() if job.next_run_time else None
+            for job in scheduler.get_jobs()
+        }
+        return {"ok": scheduler.running, "next_runs": jobs}
+
+    async def _ingest(self) -> Dict[str, Any]:
+        try:
+            state = await asyncio.wait_for(
+                ingest_state_col.find_one({"_id": LAST_INGEST_KEY}),
+                settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+            )
+        except Exception as e:
+            return {"ok": False, "error": str(e) or type(e).__name__}
+        if not state or not state.get("finished_at"):
+            return {"ok": False, "finished_at": None}
+        age = (datetime.utcnow() - state["finished_at"]).total_seconds()
+        # Allow a couple of missed runs before calling it stale
+        max_age = 3 * settings.CRON_FETCH_INTERVAL_MINUTES * 60
+        return {
+            "ok": age <= max_age,
+            "finished_at": state["finished_at"].isoformat(),
+            "age_seconds": round(age),
+            "stats": state.get("stats"),
+        }
+
+    async def probe(self) -> Dict[str, Any]:
+        mongo = await self._mongo()
+        checks = {
+            "mongo": mongo,
+            "scheduler": self._scheduler(),
+            "ingest": await self._ingest() if mongo["ok"] else {"ok": False, "error": "mongo unavailable"},
+        }
+        if not mongo["ok"]:
+            status, message = "unavailable", "MongoDB is not reachable"
+        elif not all(check["ok"] for check in checks.values()):
+            failing = ", ".join(name for name, check in checks.items() if not check["ok"])
+            status, message = "degraded", f"WorkScope backend running; degraded: {failing}"
+        else:
+            status, message = "ok", "WorkScope backend running"
+
+        self.snapshot = {
+            "status": status,
+            "message": message,
+            "checked_at": datetime.utcnow().isoformat(),
+            "checks": checks,
+        }
+        self.checked_at = time.monotonic()
+        return self.snapshot
+
+    # ---------------------------------------------------------------
+    # Background loop
+    # ---------------------------------------------------------------
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.HEALTH_PROBE_INTERVAL_SECONDS)
+            try:
+                await self.probe()
+            except Exception:
+                logger.exception("Health probe failed")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def readiness(self) -> Dict[str, Any]:
+        if self.snapshot is None:
+            return {"status": "starting", "message": "Health probe has not run yet", "ready": False}
+        age = time.monotonic() - self.checked_at
+        ready = self.snapshot["status"] != "unavailable"
+        if age > 3 * settings.HEALTH_PROBE_INTERVAL_SECONDS:
+            ready = False
+            return {**self.snapshot, "status": "unavailable", "message": "Health probe is not running",
+                    "probe_age_seconds": round(age), "ready": ready}
+        return {**self.snapshot, "probe_age_seconds": round(age), "ready": ready}
+
+
+health_monitor = HealthMonitor()
+
+
+# -------------------------------------------------------------------
+# Endpoints
+# -------------------------------------------------------------------
+@router.get("/health/live")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def ready():
+    body = health_monitor.readiness()
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+
+@router.get("/health")
+async def health():
+    return await ready()
@@ -0,0 +1,80 @@
+"""
+Conditional GET for catalog-backed endpoints.
+
+The job catalog only changes when ingestion writes, so responses are
+tagged with a catalog version kept in `ingest_state`. Each worker reads
+it at most every CATALOG_VERSION_TTL_SECONDS, so a matching If-None-Match
+is answered with 304 before any job query runs.
+"""
+import hashlib
+import time
+from typing import Any, Dict
+
+from fastapi import Request, Response
+
+from .config import settings
+from .db import ingest_state_col
+
+CATALOG_STATE_KEY = "catalog"
+
+JOBS_CACHE_CONTROL = f"public, max-age={settings.JOBS_CACHE_MAX_AGE_SECONDS}, must-revalidate"
+# Per-user responses are always revalidated; a 304 still saves the body
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+_catalog: Dict[str, Any] = {"version": 0, "checked_at": None}
+
+
+async def catalog_version() -> int:
+    now = time.monotonic()
+    checked_at = _catalog["checked_at"]
+    if checked_at is None or now - checked_at >= settings.CATALOG_VERSION_TTL_SECONDS:
+        state = await ingest_state_col.find_one({"_id": CATALOG_STATE_KEY}, {"version": 1})
+        _catalog["version"] = state.get("version", 0) if state else 0
+        _catalog["checked_at"] = now
+    return _catalog["version"]
+
+
+async def bump_catalog_version():
+    """Called by ingestion after it changed jobs."""
+    state = await ingest_state_col.find_one_and_update(
+        {"_id": CATALOG_STATE_KEY},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=True,
+    )
+    _catalog["version"] = state["version"]
+    _catalog["checked_at"] = time.monotonic()
+
+
+async def catalog_etag(request: Request, *extra: Any) -> str:
+    """Strong ETag from the catalog version, the path and the query string."""
+    # Imported here: ingest imports this module to bump the version
+    from .ingest import JOB_DOC_VERSION
+
+    version = await catalog_version()
+    params = sorted(request.query_params.multi_items())
+    key = repr((JOB_DOC_VERSION, version, request.url.path, params, extra))
+    return '"' + hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        # The compression middleware tags encoded bodies as "<etag>-gzip"/"-br"
+        for suffix in ('-gzip"', '-br"'):
+            if candidate.endswith(suffix):
+                candidate = candidate[: -len(suffix)] + '"'
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
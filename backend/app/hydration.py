@@ -0,0 +1,72 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from .db import jobs_col
+from .serializers import job_projection, render_card
+
+
+# -------------------------------------------------------------------
+# Batched job lookups shared by the list endpoints
+# -------------------------------------------------------------------
+async def fetch_jobs_by_ids(
+    ids: Iterable[str],
+    projection: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolve many job references with a single query.
+
+    Saved items may hold either the FindWork `job_id` or the Mongo `_id`
+    string, so both are matched in one $or/$in query. Returns a dict
+    keyed by the id as it was requested; ids with no job are absent.
+    """
+    ids = list(dict.fromkeys(str(i) for i in ids if i))
+    if not ids:
+        return {}
+
+    object_ids = [ObjectId(i) for i in ids if ObjectId.is_valid(i)]
+    clauses = [{"job_id": {"$in": ids}}]
+    if object_ids:
+        clauses.append({"_id": {"$in": object_ids}})
+    query = clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    if projection is not None:
+        projection = {**projection, "job_id": 1}
+
+    by_job_id: Dict[str, Dict[str, Any]] = {}
+    by_object_id: Dict[str, Dict[str, Any]] = {}
+    async for job in jobs_col.find(query, projection):
+        if job.get("job_id"):
+            by_job_id[job["job_id"]] = job
+        by_object_id[str(job["_id"])] = job
+
+    # Same precedence as the old per-item lookup: job_id first, then _id
+    found = {}
+    for i in ids:
+        job = by_job_id.get(i) or by_object_id.get(i)
+        if job is not None:
+            found[i] = job
+    return found
+
+
+async def fill_card_json(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Make sure every doc loaded with CARD_JSON_PROJECTION has `card_json`.
+
+    Jobs written before cards were pre-rendered are loaded with the card
+    projection in one query, rendered, and written back so the next read
+    takes the fast path.
+    """
+    missing = {doc["_id"]: doc for doc in docs if not doc.get("card_json")}
+    if not missing:
+        return docs
+
+    ops = []
+    async for job in jobs_col.find({"_id": {"$in": list(missing)}}, job_projection("card")):
+        card_json = render_card(job)
+        missing[job["_id"]]["card_json"] = card_json
+        ops.append(UpdateOne({"_id": job["_id"], "card_json": {"$exists": False}}, {"$set": {"card_json": card_json}}))
+    if ops:
+        await jobs_col.bulk_write(ops, ordered=False)
+    return docs
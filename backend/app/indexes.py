@@ -0,0 +1,163 @@
+"""
+Declarative index registry and query-plan checks.
+
+Indexes are declared once here and created idempotently at startup.
+With INDEX_DIAGNOSTICS enabled, startup also runs explain() on every hot
+query below and refuses to start if any of them plans a COLLSCAN. The
+same check can be run by hand:
+
+    python -m app.indexes --check
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from .config import settings
+from .db import db
+from .logs import configure_logging, get_logger
+from .pagination import JOB_LIST_SORT
+from .search import TEXT_INDEX_NAME, TEXT_INDEX_WEIGHTS
+
+logger = get_logger(__name__)
+
+# -------------------------------------------------------------------
+# Registry: collection -> indexes
+# -------------------------------------------------------------------
+INDEXES: Dict[str, List[IndexModel]] = {
+    "jobs": [
+        IndexModel([("job_id", ASCENDING)], name="job_id_unique", unique=True),
+        IndexModel(JOB_LIST_SORT, name="job_list_keyset"),
+        IndexModel([(field, TEXT) for field in TEXT_INDEX_WEIGHTS], name=TEXT_INDEX_NAME,
+                   weights=TEXT_INDEX_WEIGHTS, default_language="english"),
+        IndexModel([("search_tokens", ASCENDING)], name="job_search_tokens"),
+        IndexModel([("last_date", ASCENDING)], name="job_last_date", sparse=True),
+        IndexModel([("updated_at", ASCENDING)], name="job_updated_at", sparse=True),
+        IndexModel([("dedupe_key", ASCENDING)], name="job_dedupe_key", sparse=True),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="user_email_unique", unique=True),
+    ],
+    "apply_later": [
+        IndexModel([("user_id", ASCENDING), ("job_id", ASCENDING)], name="apply_later_user_job_unique", unique=True),
+        IndexModel([("job_id", ASCENDING)], name="apply_later_job_id"),
+    ],
+    "applications": [
+        IndexModel([("user_id", ASCENDING), ("applied_date", DESCENDING)], name="applications_user_applied"),
+    ],
+    "notifications": [
+        IndexModel([("user_id", ASCENDING), ("_id", DESCENDING)], name="notifications_user_recent"),
+        IndexModel([("created_at", ASCENDING)], name="notifications_ttl",
+                   expireAfterSeconds=settings.NOTIFY_RETENTION_DAYS * 86400),
+    ],
+}
+
+
+async def ensure_indexes(database=None) -> Dict[str, List[str]]:
+    """
+    Create every registered index; existing ones are left untouched.
+
+    Each index is created on its own so one failure is reported without
+    skipping the rest. A unique index that can't be built (duplicates
+    left behind; see migrations.dedupe_unique_keys) then raises, since
+    writes rely on those to stay idempotent.
+    """
+    database = database if database is not None else db
+    created: Dict[str, List[str]] = {}
+    missing_unique: List[str] = []
+    for collection, models in INDEXES.items():
+        for model in models:
+            name = model.document["name"]
+            try:
+                await database[collection].create_indexes([model])
+                created.setdefault(collection, []).append(name)
+            except OperationFailure as e:
+                logger.error("Could not create index %s.%s: %s", collection, name, e)
+                if model.document.get("unique"):
+                    missing_unique.append(f"{collection}.{name}")
+    if missing_unique:
+        raise RuntimeError(f"Unique indexes could not be built: {', '.join(missing_unique)}")
+    return created
+
+
+# -------------------------------------------------------------------
+# Hot queries checked with explain()
+# -------------------------------------------------------------------
+def hot_queries() -> List[Dict[str, Any]]:
+    today = datetime(2000, 1, 1)
+    sample_id = ObjectId()
+    return [
+        {"name": "job by job_id", "collection": "jobs", "filter": {"job_id": "1"}},
+        {"name": "job list page", "collection": "jobs", "filter": {}, "sort": JOB_LIST_SORT},
+        {"name": "job list keyset", "collection": "jobs", "sort": JOB_LIST_SORT,
+         "filter": {"$or": [{"date_posted": {"$lt": "2026-01-01"}},
+                            {"date_posted": "2026-01-01", "_id": {"$lt": sample_id}},
+                            {"date_posted": None}]}},
+        {"name": "job text search", "collection": "jobs", "filter": {"$text": {"$search": "python"}}},
+        {"name": "job prefix search", "collection": "jobs", "filter": {"search_tokens": {"$regex": "^title:pyth"}}},
+        {"name": "job deadline window", "collection": "jobs",
+         "filter": {"last_date": {"$gte": today, "$lt": today + timedelta(days=2)}}},
+        {"name": "ingest existing jobs", "collection": "jobs",
+         "filter": {"$or": [{"job_id": {"$in": ["1", "2"]}}, {"dedupe_key": {"$in": ["dev|acme|berlin"]}}]}},
+        {"name": "job changes since", "collection": "jobs", "filter": {"updated_at": {"$gte": today}}},
+        {"name": "user by email", "collection": "users", "filter": {"email": "someone@example.com"}},
+        {"name": "apply later by user", "collection": "apply_later", "filter": {"user_id": "u"}},
+        {"name": "apply later by user and job", "collection": "apply_later", "filter": {"user_id": "u", "job_id": "1"}},
+        {"name": "apply later by jobs", "collection": "apply_later", "filter": {"job_id": {"$in": ["1", "2"]}}},
+        {"name": "applications by user", "collection": "applications", "filter": {"user_id": "u"},
+         "sort": [("applied_date", DESCENDING)]},
+        {"name": "notifications by user", "collection": "notifications", "filter": {"user_id": "u"},
+         "sort": [("_id", DESCENDING)]},
+        {"name": "notification stream catch-up", "collection": "notifications",
+         "filter": {"user_id": "u", "_id": {"$gt": sample_id}}, "sort": [("_id", ASCENDING)]},
+    ]
+
+
+def _stages(plan: Any) -> List[str]:
+    found = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            found.append(plan["stage"])
+        for value in plan.values():
+            found.extend(_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            found.extend(_stages(value))
+    return found
+
+
+async def verify_query_plans(database=None, raise_on_scan: bool = True) -> List[Dict[str, Any]]:
+    """explain() every hot query; raise if any winning plan contains a COLLSCAN."""
+    database = database if database is not None else db
+    report = []
+    for query in hot_queries():
+        cursor = database[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        explained = await cursor.explain()
+        winning = explained.get("queryPlanner", {}).get("winningPlan", {})
+        stages = _stages(winning)
+        report.append({"name": query["name"], "stages": stages, "collscan": "COLLSCAN" in stages})
+
+    scans = [r["name"] for r in report if r["collscan"]]
+    for r in report:
+        log = logger.warning if r["collscan"] else logger.info
+        log("%8s  %s: %s", "COLLSCAN" if r["collscan"] else "ok", r["name"], " > ".join(r["stages"]))
+    if scans and raise_on_scan:
+        raise RuntimeError(f"Queries planned as COLLSCAN: {', '.join(scans)}")
+    return report
+
+
+async def _main(check: bool):
+    configure_logging()
+    print(await ensure_indexes())
+    if check:
+        await verify_query_plans()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main("--check" in sys.argv))
@@ -0,0 +1,469 @@
+import asyncio
+import contextlib
+import email.utils
+import hashlib
+import json
+import re
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import httpx
+from pymongo import UpdateOne
+
+from .config import settings
+from .db import jobs_col, ingest_state_col
+from .http_cache import bump_catalog_version
+from .logs import get_logger
+from .metrics import INGEST_JOBS, INGEST_SOURCE_FAILURES
+from .models import JobInDB
+from .upstream import UpstreamClient
+from .matching import job_matrix, recommendation_cache
+from .notifications import JobMatchFanout, start_fanout
+from .search import search_tokens
+from .serializers import render_card
+
+if TYPE_CHECKING:
+    from .sources import JobSource
+
+logger = get_logger(__name__)
+
+# Bump when build_job_doc changes shape so existing jobs are rewritten
+JOB_DOC_VERSION = 5
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+SUMMARY_LENGTH = 280
+
+# -------------------------------------------------------------------
+# Shared FindWork client (rate limited, retrying, pooled)
+# -------------------------------------------------------------------
+_findwork: Optional[UpstreamClient] = None
+
+
+def get_findwork_client() -> UpstreamClient:
+    """Return the process-wide FindWork client, creating it on first use."""
+    global _findwork
+    if _findwork is None:
+        _findwork = UpstreamClient(
+            "findwork",
+            headers={"Authorization": f"Token {settings.FINDWORK_API_KEY}"},
+            rate=settings.FINDWORK_RATE_PER_SECOND,
+            burst=settings.FINDWORK_CONCURRENCY,
+            max_retries=settings.FINDWORK_MAX_RETRIES,
+            backoff_base=settings.FINDWORK_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.FINDWORK_BACKOFF_MAX_SECONDS,
+            timeout=httpx.Timeout(
+                settings.FINDWORK_READ_TIMEOUT_SECONDS,
+                connect=settings.FINDWORK_CONNECT_TIMEOUT_SECONDS,
+            ),
+            max_connections=settings.FINDWORK_CONCURRENCY,
+            failure_threshold=settings.FINDWORK_BREAKER_THRESHOLD,
+            reset_seconds=settings.FINDWORK_BREAKER_RESET_SECONDS,
+            http2=settings.FINDWORK_HTTP2,
+        )
+    return _findwork
+
+
+async def close_http_client():
+    global _findwork
+    if _findwork is not None:
+        await _findwork.aclose()
+    _findwork = None
+
+
+# -------------------------------------------------------------------
+# Normalized job -> job document
+# -------------------------------------------------------------------
+FINDWORK = "findwork"
+_KEY_RE = re.compile(r"[^0-9a-z]+")
+
+
+def parse_date(value: Any) -> Optional[datetime]:
+    """ISO 8601 or RFC 822 (RSS) date; None when missing or unparseable."""
+    if isinstance(value, datetime):
+        return value
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.strip())
+    except ValueError:
+        pass
+    try:
+        return email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive UTC, like every other datetime the app stores."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def iso_date(value: Optional[datetime]) -> Optional[str]:
+    """date_posted is stored as FindWork formats created_at, so the two sort together."""
+    return _utc(value).strftime("%Y-%m-%dT%H:%M:%SZ") if value else None
+
+
+def findwork_job(item: Dict[str, Any]) -> JobInDB:
+    return JobInDB(
+        id=item.get("id"),
+        source=FINDWORK,
+        role=item.get("role") or item.get("title"),
+        company_name=item.get("company_name"),
+        location=item.get("location"),
+        remote=item.get("remote"),
+        description=item.get("description"),
+        url=item.get("url"),
+        date_posted=parse_date(item.get("created_at")),
+        last_date=parse_date(item.get("last_date") or item.get("deadline")),
+        raw=item,
+    )
+
+
+def source_job_id(job: JobInDB) -> str:
+    """FindWork ids stay bare (saved jobs refer to them); other sources are prefixed."""
+    return str(job.id) if job.source == FINDWORK else f"{job.source}:{job.id}"
+
+
+def dedupe_key(job: JobInDB) -> Optional[str]:
+    """
+    Normalized title + company + location, shared by reposts of a job on
+    other boards. None without a company: a bare title and location
+    would merge unrelated postings.
+    """
+    if not job.company_name:
+        return None
+    parts = (job.role, job.company_name, job.location)
+    return "|".join(_KEY_RE.sub(" ", (part or "").casefold()).strip() for part in parts)
+
+
+def content_hash(job: JobInDB) -> str:
+    """Stable fingerprint of a normalized job, used to skip unchanged jobs."""
+    payload = json.dumps(job.model_dump(mode="json"), sort_keys=True, separators=(",", ":"), default=str)
+    payload = f"{JOB_DOC_VERSION}:{payload}"
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def summarize(description: Optional[str]) -> str:
+    """Plain-text preview of an HTML description, used by card views."""
+    text = _SPACE_RE.sub(" ", _TAG_RE.sub(" ", description or "")).strip()
+    if len(text) <= SUMMARY_LENGTH:
+        return text
+    return text[:SUMMARY_LENGTH].rsplit(" ", 1)[0] + "…"
+
+
+def build_job_doc(job: Union[JobInDB, Dict[str, Any]]) -> Dict[str, Any]:
+    """Job document for a normalized job; a plain dict is taken as a FindWork result."""
+    if not isinstance(job, JobInDB):
+        job = findwork_job(job)
+    doc = {
+        "job_id": source_job_id(job),
+        "source": job.source,
+        "title": job.role,
+        "company_name": job.company_name,
+        "location": job.location,
+        "remote": job.remote,
+        "description": job.description,
+        "summary": summarize(job.description),
+        "url": job.url,
+        "date_posted": iso_date(job.date_posted),
+        "search_tokens": search_tokens(job.role, job.company_name),
+        "content_hash": content_hash(job),
+        "raw": job.raw,
+    }
+    key = dedupe_key(job)
+    if key:
+        doc["dedupe_key"] = key
+    if job.last_date:
+        doc["last_date"] = _utc(job.last_date)
+    doc["card_json"] = render_card(doc)
+    return doc
+
+
+def _new_counts() -> Dict[str, int]:
+    return {"inserted": 0, "updated": 0, "unchanged": 0, "duplicates": 0}
+
+
+async def write_jobs(
+    jobs: Iterable[Union[JobInDB, Dict[str, Any]]],
+    inserted: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Upsert the new or changed jobs of a batch with a single bulk_write
+    and return inserted/updated/unchanged/duplicates counts per source.
+    Documents of newly inserted jobs are appended to `inserted` if given.
+
+    Existing fingerprints are read with one query; jobs whose hash
+    matches are skipped entirely so unchanged postings cost no write.
+    A new job whose dedupe_key is already taken by another source's job
+    is a cross-source duplicate and is not written either.
+    """
+    docs = {}
+    for job in jobs:
+        job_doc = build_job_doc(job)
+        docs[job_doc["job_id"]] = job_doc
+
+    counts: Dict[str, Dict[str, int]] = {}
+    if not docs:
+        return counts
+
+    existing = {}
+    owners: Dict[str, Set[str]] = {}
+    keys = list({job_doc["dedupe_key"] for job_doc in docs.values() if job_doc.get("dedupe_key")})
+    cursor = jobs_col.find(
+        {"$or": [{"job_id": {"$in": list(docs)}}, {"dedupe_key": {"$in": keys}}]},
+        {"job_id": 1, "content_hash": 1, "dedupe_key": 1, "source": 1},
+    )
+    async for row in cursor:
+        existing[row["job_id"]] = row.get("content_hash")
+        if row.get("dedupe_key"):
+            owners.setdefault(row["dedupe_key"], set()).add(row.get("source", FINDWORK))
+
+    ops = []
+    changed = []
+    now = datetime.utcnow()
+    for job_id, job_doc in docs.items():
+        source, key = job_doc["source"], job_doc.get("dedupe_key")
+        tally = counts.setdefault(source, _new_counts())
+        if job_id in existing:
+            if existing[job_id] == job_doc["content_hash"]:
+                tally["unchanged"] += 1
+                continue
+            tally["updated"] += 1
+        elif key and owners.get(key) and source not in owners[key]:
+            tally["duplicates"] += 1
+            continue
+        else:
+            tally["inserted"] += 1
+            if key:
+                owners.setdefault(key, set()).add(source)
+            if inserted is not None:
+                inserted.append(job_doc)
+        job_doc["updated_at"] = now
+        changed.append(job_doc)
+        ops.append(UpdateOne({"job_id": job_id}, {"$set": job_doc}, upsert=True))
+
+    for start in range(0, len(ops), settings.INGEST_BULK_SIZE):
+        await jobs_col.bulk_write(ops[start:start + settings.INGEST_BULK_SIZE], ordered=False)
+
+    # Keep the recommendation matrix in step; before its first build it
+    # will pick these up from Mongo anyway
+    if changed and job_matrix.ready:
+        await job_matrix.upsert_async(changed)
+    if changed:
+        recommendation_cache.clear()
+        await bump_catalog_version()
+    return counts
+
+
+# -------------------------------------------------------------------
+# High-water mark on created_at, one per search
+# -------------------------------------------------------------------
+LAST_INGEST_KEY = "last_ingest"
+
+
+def state_key(search: Optional[str], location: Optional[str]) -> str:
+    return f"findwork:{search or ''}:{location or ''}"
+
+
+async def get_high_water_mark(key: str) -> Optional[str]:
+    state = await ingest_state_col.find_one({"_id": key})
+    return state.get("high_water_mark") if state else None
+
+
+async def set_high_water_mark(key: str, value: str, stats: Dict[str, Any]):
+    await ingest_state_col.update_one(
+        {"_id": key},
+        {"$max": {"high_water_mark": value}, "$set": {"last_run": stats}},
+        upsert=True,
+    )
+
+
+async def record_last_ingest(stats: Dict[str, Any]):
+    """Stamp every finished run, new jobs or not; readiness reports its age."""
+    await ingest_state_col.update_one(
+        {"_id": LAST_INGEST_KEY},
+        {"$set": {"finished_at": datetime.utcnow(), "stats": stats}},
+        upsert=True,
+    )
+
+
+def newest_created_at(results: List[Dict[str, Any]]) -> Optional[str]:
+    stamps = [job.get("created_at") for job in results if job.get("created_at")]
+    return max(stamps) if stamps else None
+
+
+def newest_first(results: List[Dict[str, Any]], after: Optional[str] = None) -> bool:
+    """True when the page's created_at stamps never increase, starting at or below `after`."""
+    stamps = [job["created_at"] for job in results if job.get("created_at")]
+    if after is not None and stamps and stamps[0] > after:
+        return False
+    return all(a >= b for a, b in zip(stamps, stamps[1:]))
+
+
+def page_already_seen(results: List[Dict[str, Any]], high_water_mark: Optional[str]) -> bool:
+    """True when every posting on the page is at or below the high-water mark."""
+    if not high_water_mark or not results:
+        return False
+    return all((job.get("created_at") or "") <= high_water_mark for job in results)
+
+
+# -------------------------------------------------------------------
+# Concurrent sources, one batched sink
+# -------------------------------------------------------------------
+async def fetch_page(client: UpstreamClient, params: Dict[str, Any], page: int) -> Tuple[Dict[str, Any], bool]:
+    """One FindWork results page and whether it changed since it was last fetched."""
+    return await client.get_json(settings.FINDWORK_API_URL, params={**params, "page": page})
+
+
+class JobSink:
+    """
+    The single writer behind every source of a run: jobs from all
+    sources arrive on one queue, are buffered and written with
+    write_jobs() once `bulk_size` have accumulated. write_jobs() drops
+    cross-source duplicates against the database and the batch, so the
+    source that stored a posting first keeps it and keeps updating it.
+    Newly inserted jobs are passed on to `fanout` (match notifications).
+    """
+
+    def __init__(self, bulk_size: Optional[int] = None, fanout: Optional[JobMatchFanout] = None):
+        self.bulk_size = bulk_size or settings.INGEST_BULK_SIZE
+        self.fanout = fanout
+        self.buffer: List[JobInDB] = []
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    async def add(self, jobs: List[JobInDB]):
+        self.buffer.extend(jobs)
+        if len(self.buffer) >= self.bulk_size:
+            await self.flush()
+
+    async def flush(self):
+        batch, self.buffer = self.buffer, []
+        if not batch:
+            return
+        inserted: Optional[List[Dict[str, Any]]] = [] if self.fanout is not None else None
+        for source, counts in (await write_jobs(batch, inserted)).items():
+            tally = self.counts.setdefault(source, _new_counts())
+            for name, value in counts.items():
+                tally[name] += value
+        if inserted:
+            await self.fanout.feed(inserted)
+
+    async def consume(self, queue: "asyncio.Queue[Optional[List[JobInDB]]]"):
+        while True:
+            jobs = await queue.get()
+            if jobs is None:
+                break
+            await self.add(jobs)
+        await self.flush()
+
+
+async def record_source_runs(stats: Dict[str, Dict[str, Any]]):
+    now = datetime.utcnow()
+    await ingest_state_col.bulk_write([
+        UpdateOne({"_id": f"source:{name}"}, {"$set": {"finished_at": now, "last_run": run}}, upsert=True)
+        for name, run in stats.items()
+    ])
+
+
+async def ingest_sources(sources: List["JobSource"], bulk_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run every source concurrently and write their jobs through one JobSink.
+
+    Each source streams batches of normalized jobs onto a bounded queue
+    (so a fast source waits for the writer rather than piling up in
+    memory). A source that fails is logged and counted in its stats
+    without stopping the others; its finish() hook (e.g. FindWork's
+    high-water mark) only runs when it completed and everything it
+    produced has been written.
+
+    Returns run totals plus per-source stats under "sources"; those are
+    also stored in ingest_state as "source:<name>" and exported as
+    metrics. New jobs are matched against users' skills as they are
+    written and the resulting notifications sent once all are in
+    (stats under "notifications").
+    """
+    started = time.perf_counter()
+    fanout = await start_fanout()
+    sink = JobSink(bulk_size, fanout)
+    queue: "asyncio.Queue[Optional[List[JobInDB]]]" = asyncio.Queue(maxsize=max(2, 2 * len(sources)))
+    stats: Dict[str, Dict[str, Any]] = {}
+
+    async def produce(source: "JobSource"):
+        run = stats[source.name] = {"fetched": 0, "error": None}
+        source_started = time.perf_counter()
+        try:
+            async for jobs in source.batches():
+                run["fetched"] += len(jobs)
+                if jobs:
+                    await queue.put(jobs)
+        except Exception as e:
+            run["error"] = f"{type(e).__name__}: {e}"
+            INGEST_SOURCE_FAILURES.labels(source.name).inc()
+            logger.exception("Ingest source %s failed", source.name)
+        run["seconds"] = round(time.perf_counter() - source_started, 3)
+
+    consumer = asyncio.create_task(sink.consume(queue))
+    producers = asyncio.gather(*(produce(source) for source in sources))
+    done, _ = await asyncio.wait({consumer, producers}, return_when=asyncio.FIRST_COMPLETED)
+    if consumer in done:
+        # The sink only stops early when a write failed
+        producers.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await producers
+        consumer.result()
+    await queue.put(None)
+    await consumer
+
+    totals = {"fetched": 0, "invalid": 0, **_new_counts(), "failed_sources": 0}
+    for source in sources:
+        run = stats[source.name]
+        run.update(source.stats)
+        run.update(sink.counts.get(source.name) or _new_counts())
+        run.setdefault("invalid", 0)
+        run["jobs_per_sec"] = round(run["fetched"] / run["seconds"], 1) if run["seconds"] else 0.0
+        if run["error"] is None:
+            await source.finish()
+        else:
+            totals["failed_sources"] += 1
+        for name in totals:
+            if name in run:
+                totals[name] += run[name]
+                INGEST_JOBS.labels(source.name, name).inc(run[name])
+
+    notified = await fanout.flush() if fanout is not None else None
+    elapsed = time.perf_counter() - started
+    summary = {**totals, "seconds": round(elapsed, 3),
+               "jobs_per_sec": round(totals["fetched"] / elapsed, 1) if elapsed else 0.0,
+               "sources": stats, "notifications": notified}
+    if stats:
+        await record_source_runs(stats)
+    await record_last_ingest(summary)
+    logger.info("Ingest finished",
+                extra={k: v for k, v in summary.items() if k not in ("sources", "notifications")})
+    return summary
+
+
+async def ingest_findwork(
+    search: Optional[str] = None,
+    location: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    full: bool = False,
+) -> Dict[str, Any]:
+    """FindWork on its own (see sources.FindWorkSource); returns its stats with the run's timing."""
+    # sources.py builds on this module, so it is imported here
+    from .sources import FindWorkSource
+
+    summary = await ingest_sources([FindWorkSource(search, location, max_pages, concurrency, full)])
+    return {**summary["sources"][FINDWORK], "seconds": summary["seconds"], "jobs_per_sec": summary["jobs_per_sec"]}
+
+
+async def ingest_configured_sources() -> Dict[str, Any]:
+    """Every source enabled in settings (FindWork, feeds, files), concurrently."""
+    from .sources import configured_sources
+
+    return await ingest_sources(configured_sources())
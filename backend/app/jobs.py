@@ -1,125 +1,141 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from .config import settings
 from .db import jobs_col
-import httpx
 from typing import List, Optional
 from datetime import datetime
-from .auth import get_current_user
+from .auth import get_current_principal, optional_oauth2_scheme
+from .apply_later import saved_ids_tag, saved_job_ids
 from bson import ObjectId
+from .ingest import ingest_configured_sources
+from .search import build_text_query, location_filter, parse_fields
+from .serializers import CARD_JSON_PROJECTION, job_projection, serialize_job, splice_card
+from .hydration import fill_card_json
+from .responses import FastJSONResponse, RawJSONResponse, json_array
+from .http_cache import JOBS_CACHE_CONTROL, PRIVATE_CACHE_CONTROL, catalog_etag, etag_matches, not_modified
+from .pagination import (
+    JOB_LIST_SORT, decode_cursor, job_cursor, keyset_filter, offset_cursor,
+)
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 # -------------------------------------------------------------------
-# Utility function to serialize MongoDB job document
+# FETCH JOBS FROM EVERY CONFIGURED SOURCE + STORE IN MONGODB
 # -------------------------------------------------------------------
-def serialize_job(job: dict) -> dict:
-    """Convert MongoDB document to JSON-serializable dict."""
-    job_copy = dict(job)
-    job_copy["id"] = str(job_copy["_id"])
-    job_copy["_id"] = str(job_copy["_id"])
-    # Convert any nested ObjectIds in 'raw' if present
-    if "raw" in job_copy and isinstance(job_copy["raw"], dict):
-        job_copy["raw"] = {k: str(v) if isinstance(v, ObjectId) else v for k, v in job_copy["raw"].items()}
-    return job_copy
-
-
-# -------------------------------------------------------------------
-# FETCH JOBS FROM FINDWORK + STORE IN MONGODB
-# -------------------------------------------------------------------
-async def fetch_from_findwork(
-    search: Optional[str] = None, 
-    location: Optional[str] = None, 
-    page: int = 1
-):
-    headers = {"Authorization": f"Token {settings.FINDWORK_API_KEY}"}
-    params = {"page": page}
-    if search:
-        params["search"] = search
-    if location:
-        params["location"] = location
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(settings.FINDWORK_API_URL, headers=headers, params=params)
-
-        # Debug logging
-        print("\n----------------------------")
-        print(" FindWork Fetch Debug")
-        print("URL:", client.build_request("GET", settings.FINDWORK_API_URL, params=params).url)
-        print("Status:", resp.status_code)
-        print("Response (first 500 chars):", resp.text[:500], "...")
-        print("----------------------------\n")
-
-        resp.raise_for_status()
-        data = resp.json()
-
-    results = data.get("results", [])
-    for job in results:
-        job_id = str(job.get("id"))
-
-        job_doc = {
-            "job_id": job_id,
-            "title": job.get("role") or job.get("title"),
-            "company_name": job.get("company_name"),
-            "location": job.get("location"),
-            "remote": job.get("remote"),
-            "description": job.get("description"),
-            "url": job.get("url"),
-            "date_posted": job.get("created_at"),
-            "raw": job,
-        }
-
-        # Upsert into MongoDB
-        await jobs_col.update_one(
-            {"job_id": job_id},
-            {"$set": job_doc},
-            upsert=True
-        )
-
-    return True
+async def fetch_jobs():
+    return await ingest_configured_sources()
 
 
 # -------------------------------------------------------------------
 # LIST JOBS FROM MONGODB
 # -------------------------------------------------------------------
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=List[dict], response_class=RawJSONResponse)
 async def list_jobs(
+    request: Request,
     q: Optional[str] = None, 
     location: Optional[str] = None, 
     limit: int = 20, 
-    offset: int = 0
+    offset: int = 0,
+    mode: str = Query("regex", pattern="^(text|regex)$", description="text: ranked whole-word search (opt-in)"),
+    fields: Optional[str] = None,
+    prefix: bool = False,
+    cursor: Optional[str] = None,
+    saved: bool = False,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
 ):
+    """
+    List jobs newest first, or by relevance when searching in text mode.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the
+    next page. Date-ordered listings page by keyset on (date_posted, _id),
+    so deep pages cost the same as the first; `offset` still works.
+
+    The body is assembled from the cards pre-rendered at ingestion.
+    Responses carry an ETag for the catalog version; If-None-Match gets
+    a 304 until the next ingest changes a job.
+
+    With `saved=true` (requires a token) every card also carries
+    `is_saved` for the caller, so clients need no per-card saved checks.
+    Those responses are private and their ETag covers the saved set.
+    """
+    saved_ids = None
+    if saved:
+        if not token:
+            raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+        principal = await get_current_principal(token)
+        saved_ids = await saved_job_ids(principal["id"])
+        headers = {
+            "ETag": await catalog_etag(request, principal["id"], saved_ids_tag(saved_ids)),
+            "Cache-Control": PRIVATE_CACHE_CONTROL,
+        }
+    else:
+        headers = {"ETag": await catalog_etag(request), "Cache-Control": JOBS_CACHE_CONTROL}
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+
     query = {}
-    # Title/keyword search
-    if q:
+    projection = dict(CARD_JSON_PROJECTION)
+    sort = None
+    # Keyword search: the title regex (substring, the default), or ranked text index search
+    if q and mode == "text":
+        query, score_projection, sort = build_text_query(q, parse_fields(fields), prefix=prefix)
+        if score_projection:
+            projection.update(score_projection)
+    elif q:
         query["title"] = {"$regex": q, "$options": "i"}
 
     # Location search including remote
-    if location:
-        if location.lower() == "remote":
-            query["remote"] = True
-        else:
-            query["location"] = {"$regex": location, "$options": "i"}
-
-    cursor = jobs_col.find(query).skip(offset).limit(limit)
-    jobs = await cursor.to_list(length=limit)
-    return [serialize_job(job) for job in jobs]
+    query.update(location_filter(location))
+
+    # Relevance-ranked results have no stable keyset, so their cursor is an offset
+    ranked = sort is not None
+    after = decode_cursor(cursor) if cursor else {}
+    if ranked:
+        offset = after.get("o", offset)
+    else:
+        sort = JOB_LIST_SORT
+        keyset = keyset_filter(after)
+        if keyset:
+            query = {"$and": [query, keyset]} if query else keyset
+            offset = 0
+
+    db_cursor = jobs_col.find(query, projection).sort(sort).skip(offset).limit(limit)
+    jobs = await db_cursor.to_list(length=limit)
+
+    await fill_card_json(jobs)
+
+    body = []
+    for job in jobs:
+        extra = {"_id": str(job["_id"]), "id": str(job["_id"])}
+        if "score" in job:
+            extra["score"] = job["score"]
+        if saved_ids is not None:
+            extra["is_saved"] = (job.get("job_id") or extra["_id"]) in saved_ids
+        body.append(splice_card(job["card_json"], extra))
+
+    if len(jobs) == limit:
+        headers["X-Next-Cursor"] = offset_cursor(offset + limit) if ranked else job_cursor(jobs[-1])
+    return RawJSONResponse(json_array(body), headers=headers)
 
 
 # -------------------------------------------------------------------
 # GET SINGLE JOB BY job_id
 # -------------------------------------------------------------------
-@router.get("/{job_id}", response_model=dict)
-async def get_job(job_id: str):
-    job = await jobs_col.find_one({"job_id": job_id})
+@router.get("/{job_id}", response_model=dict, response_class=FastJSONResponse)
+async def get_job(job_id: str, request: Request):
+    headers = {"ETag": await catalog_etag(request), "Cache-Control": JOBS_CACHE_CONTROL}
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+
+    job = await jobs_col.find_one({"job_id": job_id}, job_projection("detail"))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return serialize_job(job)
+    return FastJSONResponse(serialize_job(job, "detail"), headers=headers)
 
 
 # -------------------------------------------------------------------
 # MANUAL FETCH ENDPOINT (FOR TESTING)
 # -------------------------------------------------------------------
 @router.post("/fetch")
-async def trigger_fetch(current_user=Depends(get_current_user)):
-    await fetch_from_findwork()
-    return {"status": "ok", "message": "Jobs fetched successfully"}
+async def trigger_fetch(current_user=Depends(get_current_principal)):
+    stats = await fetch_jobs()
+    return {"status": "ok", "message": "Jobs fetched successfully", "stats": stats}
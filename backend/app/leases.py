@@ -0,0 +1,137 @@
+"""
+Mongo-backed leases so each periodic job runs on one instance at a time.
+
+Every uvicorn worker on every replica runs the scheduler, but a job body
+only runs on the instance that wins the job's lease document in
+`scheduler_jobs`. Acquiring the lease is a single conditional upsert:
+
+- the current lease must have expired (or never existed), so a run in
+  progress anywhere is never overlapped, and
+- the last run must have started at least ~one interval ago, so the
+  fleet together runs the job once per interval rather than once per
+  worker.
+
+While the job runs the lease is renewed in the background. When it
+finishes, the lease is released and the run's timing, outcome and
+result are stored on the same document.
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .config import settings
+from .db import scheduler_jobs_col
+from .logs import get_logger
+from .metrics import SCHEDULER_RUNS
+
+logger = get_logger(__name__)
+
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+# Workers fire on their own clocks; accept a run this much before a full interval
+INTERVAL_TOLERANCE = 0.9
+
+
+async def try_acquire(
+    name: str,
+    interval_seconds: float,
+    owner: str = INSTANCE_ID,
+    lease_seconds: float = settings.SCHEDULER_LEASE_SECONDS,
+    collection=None,
+) -> Optional[Dict[str, Any]]:
+    """Take the lease for `name` if it is free and the job is due; None otherwise."""
+    collection = collection if collection is not None else scheduler_jobs_col
+    now = datetime.utcnow()
+    due_before = now - timedelta(seconds=interval_seconds * INTERVAL_TOLERANCE)
+    try:
+        return await collection.find_one_and_update(
+            {
+                "_id": name,
+                "$and": [
+                    {"$or": [{"lease_until": {"$lt": now}}, {"lease_until": None}]},
+                    {"$or": [{"last_started": {"$lte": due_before}}, {"last_started": None}]},
+                ],
+            },
+            {"$set": {"owner": owner, "lease_until": now + timedelta(seconds=lease_seconds), "last_started": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # The document exists but didn't match: held elsewhere or not due yet
+        return None
+
+
+async def renew(name: str, owner: str = INSTANCE_ID,
+                lease_seconds: float = settings.SCHEDULER_LEASE_SECONDS, collection=None) -> bool:
+    collection = collection if collection is not None else scheduler_jobs_col
+    result = await collection.update_one(
+        {"_id": name, "owner": owner},
+        {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=lease_seconds)}},
+    )
+    return result.matched_count == 1
+
+
+async def release(name: str, owner: str, outcome: str, seconds: float,
+                  result: Any = None, error: Optional[str] = None, collection=None):
+    collection = collection if collection is not None else scheduler_jobs_col
+    now = datetime.utcnow()
+    await collection.update_one(
+        {"_id": name, "owner": owner},
+        {
+            "$set": {
+                "lease_until": now,
+                "owner": None,
+                "last_finished": now,
+                "last_owner": owner,
+                "last_outcome": outcome,
+                "last_duration_seconds": round(seconds, 3),
+                "last_result": result if isinstance(result, dict) else None,
+                "last_error": error,
+            },
+            "$inc": {"runs": 1},
+        },
+    )
+
+
+async def run_exclusive(
+    name: str,
+    func: Callable[[], Awaitable[Any]],
+    interval_seconds: float,
+    owner: str = INSTANCE_ID,
+    lease_seconds: float = settings.SCHEDULER_LEASE_SECONDS,
+    collection=None,
+) -> Any:
+    """Run `func` if this instance wins the lease for `name`; otherwise skip."""
+    lease = await try_acquire(name, interval_seconds, owner, lease_seconds, collection)
+    if lease is None:
+        SCHEDULER_RUNS.labels(name, "skipped").inc()
+        logger.debug("Skipping %s: leased elsewhere or not due", name)
+        return None
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            if not await renew(name, owner, lease_seconds, collection):
+                logger.warning("Lost the lease for %s while running", name)
+                return
+
+    keeper = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    outcome, error, result = "error", None, None
+    try:
+        result = await func()
+        outcome = "ok"
+        return result
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        logger.exception("Scheduled job %s failed", name)
+    finally:
+        keeper.cancel()
+        await release(name, owner, outcome, time.perf_counter() - started, result, error, collection)
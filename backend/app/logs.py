@@ -0,0 +1,52 @@
+"""
+Structured, level-controlled logging.
+
+Modules log through get_logger(__name__) with %-style arguments, so a
+disabled level costs one level check and no string formatting. LOG_LEVEL
+sets the level (default INFO) and LOG_FORMAT picks "json" (one object
+per line, with any `extra={...}` fields included) or "text".
+"""
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+from .config import settings
+
+ROOT_LOGGER = "workscope"
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: str = settings.LOG_LEVEL, fmt: str = settings.LOG_FORMAT, stream=None):
+    handler = logging.StreamHandler(stream or sys.stdout)
+    if fmt == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper())
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the application root, e.g. get_logger(__name__) -> workscope.app.jobs."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
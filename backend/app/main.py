@@ -2,13 +2,49 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .auth import router as auth_router
 from .jobs import router as jobs_router
+from .export import router as export_router
 from .applications import router as applications_router
 from .apply_later import router as apply_router
+from .dashboard import router as dashboard_router
+from .notifications import router as notifications_router
 from .recommend import router as recommend_router  # Make sure this import works
 from .scheduler import start_scheduler
 from .config import settings
+from .compression import CompressionMiddleware
+from .logs import configure_logging, get_logger
+from .metrics import MetricsMiddleware, router as metrics_router
+from .health import health_monitor, router as health_router
 import os
 from .db import client
+from .ingest import close_http_client
+from .sources import close_source_clients
+from .utils import shutdown_password_pool
+from .indexes import ensure_indexes, verify_query_plans
+from .migrations import run_migrations
+from .matching import job_matrix
+import asyncio
+import logging
+from typing import Set
+
+configure_logging()
+logger = get_logger(__name__)
+
+# Startup work left running in the background. The event loop only keeps
+# weak references to tasks, so they are held here until they finish.
+background_tasks: Set[asyncio.Task] = set()
+
+
+def _background_done(task: asyncio.Task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task %s failed", task.get_name(), exc_info=task.exception())
+
+
+def start_background(coro, name: str) -> asyncio.Task:
+    task = asyncio.create_task(coro, name=name)
+    background_tasks.add(task)
+    task.add_done_callback(_background_done)
+    return task
 
 app = FastAPI(title="WorkScope Backend")
 
@@ -24,35 +60,75 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Compress large bodies; added after CORS so it wraps the CORS headers too
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+# Outermost, so latency covers the whole request including compression
+app.add_middleware(MetricsMiddleware)
+
 # Include routers - make sure recommend_router is included
 app.include_router(auth_router)
+# Before jobs_router, whose /jobs/{job_id} would otherwise match /jobs/export
+app.include_router(export_router)
 app.include_router(jobs_router)
 app.include_router(apply_router)
 app.include_router(applications_router)
 app.include_router(recommend_router)  # This must be present
+app.include_router(dashboard_router)
+app.include_router(notifications_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
 
 # Debug: Print all routes
 @app.on_event("startup")
 async def startup_event():
-    # Print all registered routes for debugging
-    print("=== REGISTERED ROUTES ===")
-    for route in app.routes:
-        if hasattr(route, "path") and hasattr(route, "methods"):
-            print(f"{list(route.methods)} {route.path}")
-    print("=========================")
+    # Registered routes, for debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        for route in app.routes:
+            if hasattr(route, "path") and hasattr(route, "methods"):
+                logger.debug("Route %s %s", sorted(route.methods), route.path)
     
     try:
         await client.admin.command('ping')
-        print("MongoDB connected successfully!")
-        user_count = await client.workscope.users.count_documents({})
-        print(f"Users in database: {user_count}")
+        logger.info("MongoDB connected")
+        # From collection metadata; a count_documents scan slowed every boot
+        user_count = await client.workscope.users.estimated_document_count()
+        logger.info("Users in database: ~%d", user_count)
     except Exception as e:
-        print(f"MongoDB connection failed: {e}")
+        logger.error("MongoDB connection failed: %s", e)
+    else:
+        # Idempotent one-time data fixes; one worker runs them, the rest
+        # skip. First, so duplicates are gone before unique indexes are built
+        await run_migrations()
+        # Fails startup loudly if a unique index can't be built
+        await ensure_indexes()
+        # Build the recommendation matrix in the background
+        start_background(job_matrix.sync(force=True), "job_matrix_sync")
+    
+    if settings.INDEX_DIAGNOSTICS:
+        # Fails startup loudly if a hot query would scan a whole collection
+        await verify_query_plans()
     
     start_scheduler(app)
-    print("Scheduler started; fetching jobs periodically.")
+    # First probe runs now, so readiness is answered from the start
+    await health_monitor.probe()
+    health_monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in list(background_tasks):
+        task.cancel()
+    await health_monitor.stop()
+    await close_http_client()
+    await close_source_clients()
+    shutdown_password_pool()
 
 @app.get("/")
 async def root():
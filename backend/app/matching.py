@@ -0,0 +1,391 @@
+import asyncio
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from .cache import TTLCache
+from .config import settings
+from .db import jobs_col, users_col
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+# Terms as the job matrix sees them; SkillIndex tokenizes the same way
+TOKEN_PATTERN = r"(?u)[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*"
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+# Only the fields needed to vectorize a job are read from Mongo
+MATRIX_PROJECTION = {"job_id": 1, "title": 1, "company_name": 1, "description": 1,
+                     "content_hash": 1, "updated_at": 1}
+
+
+def job_text(job: Dict[str, Any]) -> str:
+    """Text used to vectorize a job; the title is repeated to weight it up."""
+    title = job.get("title") or ""
+    description = _TAG_RE.sub(" ", job.get("description") or "")
+    return f"{title} {title} {job.get('company_name') or ''} {description}"
+
+
+# -------------------------------------------------------------------
+# Hashed TF-IDF job-term matrix
+# -------------------------------------------------------------------
+class JobMatrix:
+    """
+    In-process sparse job-term matrix used to score skills against the catalog.
+
+    Rows are sublinear, l2-normalised term frequencies from a stateless
+    HashingVectorizer, so new or changed jobs are vectorised on their own
+    and appended without refitting. Document frequencies are maintained
+    incrementally and IDF is applied on the query side, which ranks the
+    same as a TF-IDF cosine. Replaced rows are masked out and compacted
+    once they make up a fifth of the matrix.
+    """
+
+    def __init__(self, n_features: int = settings.RECOMMEND_N_FEATURES):
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            token_pattern=TOKEN_PATTERN,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32,
+        )
+        self.n_features = n_features
+        self._rows = sp.csr_matrix((0, n_features), dtype=np.float32)
+        self._csc: Optional[sp.csc_matrix] = None
+        self._df = np.zeros(n_features, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._job_ids: List[str] = []
+        self._index: Dict[str, Tuple[int, Optional[str]]] = {}
+        self._lock = asyncio.Lock()
+        self.ready = False
+        self.version = 0
+        # Shared catalog version (http_cache) the last sync caught up with
+        self.catalog_version: Optional[int] = None
+        self.watermark: Optional[datetime] = None
+        self.last_sync = 0.0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # ---------------------------------------------------------------
+    # Building
+    # ---------------------------------------------------------------
+    def vectorize(self, texts: List[str]) -> sp.csr_matrix:
+        counts = self.vectorizer.transform(texts).tocsr()
+        counts.data = 1.0 + np.log(counts.data)
+        norms = np.sqrt(counts.multiply(counts).sum(axis=1)).A1
+        norms[norms == 0] = 1.0
+        return sp.csr_matrix(sp.diags(1.0 / norms).dot(counts), dtype=np.float32)
+
+    def upsert(self, jobs: List[Dict[str, Any]], rows: Optional[sp.csr_matrix] = None):
+        """Append new/changed jobs (pre-vectorised `rows` may be passed in)."""
+        latest = {}
+        for position, job in enumerate(jobs):
+            known = self._index.get(job["job_id"])
+            if known is None or known[1] != job.get("content_hash") or job.get("content_hash") is None:
+                latest[job["job_id"]] = position
+        if not latest:
+            return
+        positions = sorted(latest.values())
+        fresh = [jobs[i] for i in positions]
+        if rows is None:
+            rows = self.vectorize([job_text(job) for job in fresh])
+        elif len(positions) != rows.shape[0]:
+            rows = rows[positions]
+
+        for job in fresh:
+            previous = self._index.get(job["job_id"])
+            if previous is not None:
+                self._retire(previous[0])
+
+        start = self._rows.shape[0]
+        self._rows = sp.vstack([self._rows, rows], format="csr")
+        self._df += np.asarray((rows > 0).sum(axis=0), dtype=np.float32).ravel()
+        self._alive = np.concatenate([self._alive, np.ones(len(fresh), dtype=bool)])
+        for offset, job in enumerate(fresh):
+            self._job_ids.append(job["job_id"])
+            self._index[job["job_id"]] = (start + offset, job.get("content_hash"))
+        self._csc = None
+        self.version += 1
+
+        if (~self._alive).sum() > 0.2 * len(self._alive):
+            self._compact()
+
+    async def upsert_async(self, jobs: List[Dict[str, Any]], reindex: bool = True):
+        """
+        upsert() with the CPU-bound vectorising kept off the event loop,
+        then (unless `reindex` is False) the column copy rebuilt the same way.
+        """
+        rows = await asyncio.to_thread(self.vectorize, [job_text(job) for job in jobs])
+        self.upsert(jobs, rows)
+        if reindex:
+            await self.reindex()
+
+    async def reindex(self):
+        """Rebuild the CSC copy top_k scores from in a worker thread."""
+        rows = self._rows
+        if self._csc is not None or not rows.shape[0]:
+            return
+        csc = await asyncio.to_thread(rows.tocsc)
+        # Rows replaced meanwhile (another upsert) leave it to that call
+        if self._rows is rows:
+            self._csc = csc
+
+    def _retire(self, row: int):
+        self._alive[row] = False
+        # The row's stored columns are the terms it counted towards; no dense n_features copy
+        self._df[self._rows[row].indices] -= 1
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive)
+        self._rows = self._rows[keep]
+        self._job_ids = [self._job_ids[i] for i in keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._index = {job_id: (row, self._index[job_id][1]) for row, job_id in enumerate(self._job_ids)}
+        self._csc = None
+
+    def _fresh(self, catalog_version: Optional[int]) -> bool:
+        if catalog_version is not None and catalog_version != self.catalog_version:
+            return False
+        return self.ready and time.monotonic() - self.last_sync < settings.RECOMMEND_REFRESH_SECONDS
+
+    async def sync(self, force: bool = False, catalog_version: Optional[int] = None):
+        """
+        Pull jobs written since the last sync (everything on the first call).
+
+        Ingestion in this process upserts directly; the periodic sync picks
+        up writes made by other workers. Passing the current catalog
+        version syncs straight away when it differs from the last one
+        seen, so responses tagged with it reflect that catalog.
+        """
+        if not force and self._fresh(catalog_version):
+            return
+        async with self._lock:
+            # Requests queued behind one that just synced have nothing left to do
+            if not force and self._fresh(catalog_version):
+                return
+            query = {"updated_at": {"$gte": self.watermark}} if self.watermark else {}
+            started = time.perf_counter()
+            batch: List[Dict[str, Any]] = []
+            seen = 0
+            async for job in jobs_col.find(query, MATRIX_PROJECTION):
+                job["job_id"] = job.get("job_id") or str(job["_id"])
+                batch.append(job)
+                if len(batch) >= 2000:
+                    seen += await self._upsert_batch(batch)
+                    batch = []
+            if batch:
+                seen += await self._upsert_batch(batch)
+            await self.reindex()
+            self.ready = True
+            self.last_sync = time.monotonic()
+            if catalog_version is not None:
+                self.catalog_version = catalog_version
+            if seen:
+                logger.info("Job matrix synced %d jobs in %.2fs (%d total)",
+                            seen, time.perf_counter() - started, len(self))
+
+    async def _upsert_batch(self, batch: List[Dict[str, Any]]) -> int:
+        # The column copy is rebuilt once when the whole sync is in
+        await self.upsert_async(batch, reindex=False)
+        stamps = [job["updated_at"] for job in batch if job.get("updated_at")]
+        if stamps:
+            self.watermark = max([self.watermark, *stamps]) if self.watermark else max(stamps)
+        return len(batch)
+
+    # ---------------------------------------------------------------
+    # Scoring
+    # ---------------------------------------------------------------
+    def top_k(self, skills: Iterable[str], k: int) -> List[Dict[str, Any]]:
+        """
+        Score every job against `skills` with one sparse mat-vec.
+
+        Returns up to k {"job_id", "similarity", "matched_skills"} dicts,
+        best first; ties are broken by row order so results are stable.
+        """
+        skills = [s.strip() for s in skills if s and s.strip()]
+        if not skills or not len(self):
+            return []
+
+        skill_rows = (self.vectorizer.transform([s.lower() for s in skills]) > 0).astype(np.float32).tocsr()
+        query = sp.csr_matrix(skill_rows.max(axis=0))
+        cols = query.indices
+        if not len(cols):
+            return []
+
+        n_rows = self._rows.shape[0]
+        idf = np.log((1.0 + len(self)) / (1.0 + self._df[cols])) + 1.0
+        weights = idf / np.linalg.norm(idf)
+
+        if self._csc is not None:
+            scores = np.asarray(self._csc[:, cols].dot(weights)).ravel()
+        else:
+            # Column copy still being rebuilt (reindex): one pass over the rows instead
+            query_weights = np.zeros(self.n_features, dtype=np.float32)
+            query_weights[cols] = weights
+            scores = np.asarray(self._rows.dot(query_weights)).ravel()
+        scores[~self._alive] = -1.0
+
+        k = min(k, n_rows)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+
+        # A skill counts as matched when all of its hashed terms occur in the job
+        job_terms = (self._rows[order] > 0).astype(np.float32)
+        overlap = job_terms.dot(skill_rows.T).toarray()
+        needed = np.asarray(skill_rows.sum(axis=1)).ravel()
+
+        results = []
+        for i, row in enumerate(order):
+            if scores[row] < 0:
+                continue
+            matched = [skill for j, skill in enumerate(skills) if needed[j] and overlap[i, j] >= needed[j]]
+            results.append({
+                "job_id": self._job_ids[row],
+                "similarity": float(scores[row]),
+                "matched_skills": matched,
+            })
+        return results
+
+
+job_matrix = JobMatrix()
+
+# -------------------------------------------------------------------
+# Per-user recommendation cache
+# -------------------------------------------------------------------
+# Holds only the ranking (job ids, scores, matched skills), so memory
+# stays at a few hundred bytes per user whatever the job documents weigh.
+recommendation_cache = TTLCache(
+    "recommendations",
+    max_entries=settings.RECOMMEND_CACHE_SIZE,
+    ttl_seconds=settings.RECOMMEND_CACHE_TTL_SECONDS,
+)
+
+
+def recommend_for_user(user_id: str, skills: List[str], k: int) -> List[Dict[str, Any]]:
+    """
+    Cached job_matrix.top_k for one user.
+
+    Entries are stamped with the matrix version and the user's skills, so
+    a catalog change or a skills edit made through another worker is
+    still a miss here. update_skills and ingestion also invalidate
+    explicitly to free the memory straight away.
+    """
+    stamp = (job_matrix.version, tuple(sorted({s.strip().lower() for s in skills if s and s.strip()})))
+    ranked = recommendation_cache.get(user_id, stamp=stamp)
+    if ranked is None:
+        ranked = job_matrix.top_k(skills, k)
+        recommendation_cache.set(user_id, ranked, stamp=stamp)
+    return ranked
+
+
+# -------------------------------------------------------------------
+# Skill -> user inverted index
+# -------------------------------------------------------------------
+def text_terms(text: str) -> Set[str]:
+    """Unigrams and adjacent bigrams of `text`, the terms the job matrix hashes."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    return set(tokens).union(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+
+class SkillIndex:
+    """
+    Users by skill, for matching new jobs against every user at once.
+
+    A skill matches a job when all of its terms occur in the job (so
+    "machine learning" needs the bigram), the rule top_k uses for
+    matched_skills. Skills are filed under their first term, so a job
+    only touches the skills that could occur in it and the users who
+    list them; users with no matching skill cost nothing.
+
+    Built from users on first use and rebuilt every
+    SKILL_INDEX_REFRESH_SECONDS; skills changed through this worker are
+    applied straight away with set_user().
+    """
+
+    def __init__(self):
+        self.users: Dict[str, Set[str]] = {}
+        self.by_term: Dict[str, Set[str]] = {}
+        self.terms: Dict[str, FrozenSet[str]] = {}
+        self.user_skills: Dict[str, FrozenSet[str]] = {}
+        self._lock = asyncio.Lock()
+        self.ready = False
+        self.last_sync = 0.0
+
+    def __len__(self) -> int:
+        return len(self.user_skills)
+
+    def set_user(self, user_id: str, skills: Optional[Iterable[str]]):
+        # Sets are replaced rather than changed in place, so a fan-out
+        # reading the index from a worker thread never sees one mutate
+        old = self.user_skills.pop(user_id, frozenset())
+        new = frozenset(s.strip().lower() for s in skills or [] if s and _TOKEN_RE.search(s.lower()))
+        for skill in old - new:
+            users = self.users[skill] - {user_id}
+            if users:
+                self.users[skill] = users
+                continue
+            del self.users[skill]
+            first = _TOKEN_RE.findall(skill)[0]
+            remaining = self.by_term[first] - {skill}
+            if remaining:
+                self.by_term[first] = remaining
+            else:
+                del self.by_term[first]
+        for skill in new - old:
+            if skill not in self.users:
+                first = _TOKEN_RE.findall(skill)[0]
+                self.terms[skill] = frozenset(text_terms(skill))
+                self.by_term[first] = self.by_term.get(first, set()) | {skill}
+                self.users[skill] = set()
+            self.users[skill] = self.users[skill] | {user_id}
+        if new:
+            self.user_skills[user_id] = new
+
+    def snapshot(self) -> Tuple[List[str], List[str], sp.csr_matrix]:
+        """Skills, user ids and the skills x users 0/1 matrix of the index as it is now."""
+        user_pos = {user_id: i for i, user_id in enumerate(self.user_skills)}
+        skills = list(self.users)
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, skill in enumerate(skills):
+            users = self.users[skill]
+            rows.extend([row] * len(users))
+            cols.extend(user_pos[user_id] for user_id in users)
+        matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                               shape=(len(skills), len(user_pos)))
+        return skills, list(user_pos), matrix
+
+    def matching_skills(self, terms: Set[str]) -> List[str]:
+        """Indexed skills contained in a job's terms (see text_terms)."""
+        found = []
+        for term in terms:
+            for skill in self.by_term.get(term, ()):
+                if self.terms[skill] <= terms:
+                    found.append(skill)
+        return found
+
+    async def sync(self, force: bool = False):
+        if not force and self.ready and time.monotonic() - self.last_sync < settings.SKILL_INDEX_REFRESH_SECONDS:
+            return
+        async with self._lock:
+            started = time.perf_counter()
+            fresh = SkillIndex()
+            async for user in users_col.find({"skills.0": {"$exists": True}}, {"skills": 1}):
+                fresh.set_user(str(user["_id"]), user.get("skills"))
+            self.users, self.by_term, self.terms, self.user_skills = (
+                fresh.users, fresh.by_term, fresh.terms, fresh.user_skills)
+            self.ready = True
+            self.last_sync = time.monotonic()
+            logger.info("Skill index built for %d users, %d skills in %.2fs",
+                        len(self), len(self.users), time.perf_counter() - started)
+
+
+skill_index = SkillIndex()
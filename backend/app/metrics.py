@@ -0,0 +1,183 @@
+"""
+Prometheus metrics, exposed at GET /metrics.
+
+- HTTP: request count and latency per route template (not raw path, so
+  /jobs/{job_id} is one series).
+- Mongo: command latency and failures per collection, via a pymongo
+  command listener registered on the client in db.py.
+- Upstream APIs (FindWork): latency by status, response size, retries,
+  rate-limiter waits, 304s and circuit breaker state.
+- Ingestion: jobs per source and outcome, failed source runs.
+- Scheduler: run duration and outcome per job.
+- Caches: every TTLCache's counters, read at scrape time.
+
+Metrics live in this process; with several uvicorn workers, scrape each
+one or run prometheus_client in multiprocess mode.
+"""
+import time
+from functools import wraps
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .cache import registered_caches
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUESTS = Counter(
+    "workscope_http_requests_total", "HTTP requests", ["method", "route", "status"])
+HTTP_LATENCY = Histogram(
+    "workscope_http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+    buckets=LATENCY_BUCKETS)
+MONGO_LATENCY = Histogram(
+    "workscope_mongo_command_duration_seconds", "Mongo command latency", ["collection", "command"],
+    buckets=LATENCY_BUCKETS)
+MONGO_FAILURES = Counter(
+    "workscope_mongo_command_failures_total", "Failed Mongo commands", ["collection", "command"])
+UPSTREAM_LATENCY = Histogram(
+    "workscope_upstream_request_duration_seconds", "Upstream API request latency", ["upstream", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+UPSTREAM_BYTES = Histogram(
+    "workscope_upstream_response_bytes", "Upstream API response size", ["upstream"],
+    buckets=(1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6))
+UPSTREAM_RETRIES = Counter(
+    "workscope_upstream_retries_total", "Upstream requests retried", ["upstream", "reason"])
+UPSTREAM_THROTTLED_SECONDS = Counter(
+    "workscope_upstream_throttled_seconds_total", "Time spent waiting on the rate limiter", ["upstream"])
+UPSTREAM_NOT_MODIFIED = Counter(
+    "workscope_upstream_not_modified_total", "Conditional requests answered with 304", ["upstream"])
+UPSTREAM_CIRCUIT = Gauge(
+    "workscope_upstream_circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open)", ["upstream"])
+INGEST_JOBS = Counter(
+    "workscope_ingest_jobs_total", "Jobs seen by ingestion", ["source", "outcome"])
+INGEST_SOURCE_FAILURES = Counter(
+    "workscope_ingest_source_failures_total", "Ingest source runs that failed", ["source"])
+NOTIFICATIONS_CREATED = Counter(
+    "workscope_notifications_created_total", "Notifications written", ["kind"])
+NOTIFICATION_STREAMS = Gauge(
+    "workscope_notification_streams", "Open notification event streams")
+SCHEDULER_LATENCY = Histogram(
+    "workscope_scheduler_job_duration_seconds", "Scheduled job duration", ["job"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900))
+SCHEDULER_RUNS = Counter(
+    "workscope_scheduler_job_runs_total", "Scheduled job runs", ["job", "outcome"])
+
+
+# -------------------------------------------------------------------
+# HTTP
+# -------------------------------------------------------------------
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_LATENCY.labels(scope["method"], template).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(scope["method"], template, str(status)).inc()
+
+
+# -------------------------------------------------------------------
+# Mongo
+# -------------------------------------------------------------------
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command; the collection comes from the started event."""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[Any, int], str] = {}
+        self._lock = Lock()
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else "-"
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = collection
+
+    def _collection(self, event) -> str:
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), "-")
+
+    def succeeded(self, event):
+        MONGO_LATENCY.labels(self._collection(event), event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collection(event)
+        MONGO_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_FAILURES.labels(collection, event.command_name).inc()
+
+
+# -------------------------------------------------------------------
+# Scheduler
+# -------------------------------------------------------------------
+def timed_job(name: str):
+    """Record duration and outcome of a scheduled coroutine."""
+    def decorate(func: Callable[..., Awaitable[Any]]):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                SCHEDULER_LATENCY.labels(name).observe(time.perf_counter() - started)
+                SCHEDULER_RUNS.labels(name, outcome).inc()
+        return wrapper
+    return decorate
+
+
+# -------------------------------------------------------------------
+# Caches
+# -------------------------------------------------------------------
+class CacheCollector:
+    def collect(self):
+        counters = {
+            field: CounterMetricFamily(f"workscope_cache_{field}", f"Cache {field}", labels=["cache"])
+            for field in ("hits", "misses", "evictions", "expirations", "stale", "invalidations")
+        }
+        size = GaugeMetricFamily("workscope_cache_entries", "Entries in the cache", labels=["cache"])
+        ratio = GaugeMetricFamily("workscope_cache_hit_ratio", "Hits / lookups since start", labels=["cache"])
+        for cache in registered_caches():
+            stats = cache.stats()
+            for field, family in counters.items():
+                family.add_metric([cache.name], stats[field])
+            size.add_metric([cache.name], stats["size"])
+            ratio.add_metric([cache.name], stats["hit_ratio"])
+        yield from counters.values()
+        yield size
+        yield ratio
+
+
+REGISTRY.register(CacheCollector())
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
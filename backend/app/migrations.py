@@ -0,0 +1,180 @@
+"""
+One-time data migrations.
+
+Each migration is idempotent and recorded in `migrations` once it has
+succeeded. Startup runs the pending ones under a scheduler lease (see
+leases.py), so with several workers exactly one of them does the work
+and the others move on. They can also be run by hand:
+
+    python -m app.migrations            # pending only
+    python -m app.migrations --force    # all of them again
+"""
+import asyncio
+import sys
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from pymongo import UpdateOne
+
+from .db import db
+from .indexes import INDEXES
+from .leases import run_exclusive
+from .logs import configure_logging, get_logger
+
+logger = get_logger(__name__)
+
+
+# -------------------------------------------------------------------
+# Migrations
+# -------------------------------------------------------------------
+async def reconcile_saved_jobs(database, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Fold users.saved_jobs into apply_later, then drop the array.
+
+    Saves used to be written to both places and either could be missing
+    an entry. Every id in a user's array is upserted into apply_later
+    ($setOnInsert, so existing saves keep their saved_at and status) and
+    the array is unset once its entries are written. Saves stored twice
+    for one (user_id, job_id) are then collapsed to the oldest.
+    """
+    stats = {"users": 0, "added": 0, "already_saved": 0, "duplicates_removed": 0}
+    ops: List[UpdateOne] = []
+    user_ids: List[Any] = []
+    now = datetime.utcnow()
+
+    async def flush():
+        if ops:
+            result = await database["apply_later"].bulk_write(ops, ordered=False)
+            stats["added"] += result.upserted_count
+            stats["already_saved"] += result.matched_count
+        if user_ids:
+            await database["users"].update_many({"_id": {"$in": user_ids}}, {"$unset": {"saved_jobs": ""}})
+        ops.clear()
+        user_ids.clear()
+
+    cursor = database["users"].find({"saved_jobs": {"$exists": True}}, {"saved_jobs": 1, "email": 1})
+    async for user in cursor:
+        stats["users"] += 1
+        for job_id in dict.fromkeys(str(j) for j in user.get("saved_jobs") or [] if j):
+            ops.append(UpdateOne(
+                {"user_id": str(user["_id"]), "job_id": job_id},
+                {"$setOnInsert": {"saved_at": now, "status": "pending", "user_email": user.get("email"),
+                                  "migrated_from": "users.saved_jobs"}},
+                upsert=True,
+            ))
+        user_ids.append(user["_id"])
+        if len(ops) >= batch_size:
+            await flush()
+    await flush()
+    stats["duplicates_removed"] = await remove_duplicates(database, "apply_later", ["user_id", "job_id"], batch_size)
+    return stats
+
+
+def unique_keys() -> List[Tuple[str, List[str]]]:
+    """(collection, fields) of every unique index in the registry, users before apply_later."""
+    return [
+        (collection, list(model.document["key"]))
+        for collection, models in INDEXES.items()
+        for model in models
+        if model.document.get("unique")
+    ]
+
+
+async def _backfill_job_ids(database, batch_size: int) -> int:
+    """Give jobs without a job_id their _id string, the id saves already use for them."""
+    ops: List[UpdateOne] = []
+    filled = 0
+    async for job in database["jobs"].find({"job_id": None}, {"_id": 1}):
+        ops.append(UpdateOne({"_id": job["_id"]}, {"$set": {"job_id": str(job["_id"])}}))
+        if len(ops) >= batch_size:
+            filled += (await database["jobs"].bulk_write(ops, ordered=False)).modified_count
+            ops.clear()
+    if ops:
+        filled += (await database["jobs"].bulk_write(ops, ordered=False)).modified_count
+    return filled
+
+
+async def remove_duplicates(database, collection: str, fields: List[str], batch_size: int = 500) -> int:
+    """
+    Delete all but the oldest document (lowest _id) of each group sharing
+    `fields`, returning how many were deleted. Duplicate users have their
+    saves, applications and notifications moved to the kept user first.
+    """
+    pipeline = [
+        {"$match": {field: {"$ne": None} for field in fields}},
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": {field: f"${field}" for field in fields}, "ids": {"$push": "$_id"},
+                    "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    doomed: List[Any] = []
+    async for group in database[collection].aggregate(pipeline, allowDiskUse=True):
+        kept, extra = group["ids"][0], group["ids"][1:]
+        if collection == "users":
+            moved = {"user_id": {"$in": [str(user_id) for user_id in extra]}}
+            for owned in ("apply_later", "applications", "notifications"):
+                await database[owned].update_many(moved, {"$set": {"user_id": str(kept)}})
+        doomed.extend(extra)
+    removed = 0
+    for start in range(0, len(doomed), batch_size):
+        result = await database[collection].delete_many({"_id": {"$in": doomed[start:start + batch_size]}})
+        removed += result.deleted_count
+    if removed:
+        logger.warning("Removed %d duplicate %s documents on %s", removed, collection, ", ".join(fields))
+    return removed
+
+
+async def dedupe_unique_keys(database, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Clear duplicates that would keep a unique index from being built.
+
+    Concurrent writes could store the same (user_id, job_id) save, job_id
+    or email twice before the unique indexes existed. For each unique
+    index in indexes.INDEXES the oldest document per key is kept and the
+    rest deleted. Jobs without a job_id get their _id string first, as
+    they would otherwise all collide on a null job_id.
+    """
+    stats = {"jobs_backfilled": await _backfill_job_ids(database, batch_size)}
+    for collection, fields in unique_keys():
+        stats[f"{collection}_removed"] = await remove_duplicates(database, collection, fields, batch_size)
+    return stats
+
+
+MIGRATIONS: List[Tuple[str, Callable[..., Awaitable[Dict[str, Any]]]]] = [
+    ("2026_10_reconcile_saved_jobs", reconcile_saved_jobs),
+    # Before ensure_indexes builds the unique indexes (see main.py)
+    ("2026_10_dedupe_unique_keys", dedupe_unique_keys),
+]
+
+
+# -------------------------------------------------------------------
+# Runner
+# -------------------------------------------------------------------
+async def run_migrations(database=None, force: bool = False) -> Dict[str, Any]:
+    database = database if database is not None else db
+    applied = {doc["_id"] async for doc in database["migrations"].find({}, {"_id": 1})}
+    results: Dict[str, Any] = {}
+    for name, migrate in MIGRATIONS:
+        if name in applied and not force:
+            continue
+
+        async def apply(name=name, migrate=migrate):
+            result = await migrate(database)
+            await database["migrations"].update_one(
+                {"_id": name}, {"$set": {"applied_at": datetime.utcnow(), "result": result}}, upsert=True)
+            logger.info("Migration %s applied", name, extra=result)
+            return result
+
+        # Interval 0: always due, the lease only keeps two instances from overlapping
+        results[name] = await run_exclusive(f"migration:{name}", apply, interval_seconds=0,
+                                            collection=database["scheduler_jobs"])
+    return results
+
+
+async def _main(force: bool):
+    configure_logging()
+    print(await run_migrations(force=force))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main("--force" in sys.argv))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, constr, Field
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
 # ----------------------
@@ -21,23 +21,34 @@ class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
 
+# Profile changes that are carried in the token return a fresh one with the profile
+class UserOutWithToken(UserOut):
+    access_token: str
+    token_type: str = "bearer"
+
 # ----------------------
 # Job model (partial)
 # ----------------------
+# What every ingestion source normalizes its postings into (sources.py)
 class JobInDB(BaseModel):
-    id: int
+    id: Union[int, str]
+    source: str = "findwork"
     role: str
-    company_name: str
+    company_name: Optional[str] = None
     location: Optional[str]
     remote: Optional[bool] = False
     description: Optional[str] = None
+    url: Optional[str] = None
     date_posted: Optional[datetime]
     last_date: Optional[datetime]
     raw: dict = {}
 
 # ----------------------
-# Apply-later model
+# Apply-later models
 # ----------------------
+class JobIdList(BaseModel):
+    job_ids: List[str] = Field(..., max_length=500)
+
 class ApplyLaterItem(BaseModel):
     user_id: str
     job_id: int
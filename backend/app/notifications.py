@@ -0,0 +1,371 @@
+"""
+Notification inbox, new-job match fan-out and the event stream.
+
+Ingestion feeds every newly inserted job to a JobMatchFanout, which
+finds the matching users through matching.skill_index (skill -> users),
+so the work follows the matches rather than jobs x users. When the run
+ends each matched user gets one digest notification; they are written
+with insert_many and wake that user's open /notifications/stream
+connections on this worker.
+
+A stream reads from the collection, not from the wake-up, so nothing is
+lost when a client is slow; streams on other workers pick new
+notifications up with the same indexed query every
+NOTIFY_STREAM_POLL_SECONDS. Ids only grow because ingestion, the only
+writer, runs on one worker at a time (see leases.py).
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from .auth import get_current_principal, optional_oauth2_scheme
+from .config import settings
+from .db import notifications_col
+from .logs import get_logger
+from .matching import SkillIndex, job_text, skill_index, text_terms
+from .metrics import NOTIFICATIONS_CREATED, NOTIFICATION_STREAMS
+from .responses import FastJSONResponse, dumps
+from .utils import create_access_token, decode_token_claims
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+JOB_MATCH = "job_match"
+# Audience of stream tickets; access tokens are refused as tickets and vice versa
+STREAM_TICKET_AUDIENCE = "notification-stream"
+
+
+# -------------------------------------------------------------------
+# Writing and waking streams
+# -------------------------------------------------------------------
+class NotificationHub:
+    """This worker's open streams, as one wake-up event per connection."""
+
+    def __init__(self):
+        self._streams: Dict[str, Set[asyncio.Event]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(events) for events in self._streams.values())
+
+    def subscribe(self, user_id: str) -> asyncio.Event:
+        event = asyncio.Event()
+        self._streams.setdefault(user_id, set()).add(event)
+        NOTIFICATION_STREAMS.inc()
+        return event
+
+    def unsubscribe(self, user_id: str, event: asyncio.Event):
+        events = self._streams.get(user_id)
+        if events is not None and event in events:
+            events.discard(event)
+            if not events:
+                del self._streams[user_id]
+            NOTIFICATION_STREAMS.dec()
+
+    def publish(self, user_id: str):
+        for event in self._streams.get(user_id, ()):
+            event.set()
+
+
+hub = NotificationHub()
+
+
+async def insert_notifications(docs: List[Dict[str, Any]]) -> int:
+    """Write notifications in NOTIFY_BATCH_SIZE chunks and wake their users' streams."""
+    for start in range(0, len(docs), settings.NOTIFY_BATCH_SIZE):
+        chunk = docs[start:start + settings.NOTIFY_BATCH_SIZE]
+        await notifications_col.insert_many(chunk, ordered=False)
+        for doc in chunk:
+            hub.publish(doc["user_id"])
+            NOTIFICATIONS_CREATED.labels(doc.get("kind", "info")).inc()
+    return len(docs)
+
+
+def notification_out(doc: Dict[str, Any]) -> Dict[str, Any]:
+    created_at = doc.get("created_at")
+    return {
+        "id": str(doc["_id"]),
+        "kind": doc.get("kind"),
+        "type": doc.get("type", "info"),
+        "title": doc.get("title"),
+        "message": doc.get("message"),
+        "job_ids": doc.get("job_ids", []),
+        "matched_skills": doc.get("matched_skills", []),
+        "match_count": doc.get("match_count"),
+        "created_at": created_at.isoformat() if created_at else None,
+        "read": doc.get("read", False),
+    }
+
+
+# -------------------------------------------------------------------
+# New job -> user fan-out
+# -------------------------------------------------------------------
+def job_label(job: Dict[str, Any]) -> str:
+    title = job.get("title") or job.get("role") or "A job"
+    return f"{title} at {job['company_name']}" if job.get("company_name") else title
+
+
+def match_notification(user_id: str, count: int, best: List[Tuple[str, str]],
+                       skills: List[str], now: datetime) -> Dict[str, Any]:
+    """One user's digest; `best` is (job_id, label) pairs, best first."""
+    labels = [label for _, label in best[:3]]
+    if count == 1:
+        title, message = "New job matches your skills", f"{labels[0]} matches your skills."
+    else:
+        more = f" and {count - len(labels)} more" if count > len(labels) else ""
+        title, message = f"{count} new jobs match your skills", f"{'; '.join(labels)}{more}."
+    return {
+        "user_id": user_id,
+        "kind": JOB_MATCH,
+        "type": "info",
+        "title": title,
+        "message": message,
+        "job_ids": [job_id for job_id, _ in best],
+        "matched_skills": sorted(skills),
+        "match_count": count,
+        "created_at": now,
+        "read": False,
+    }
+
+
+class JobMatchFanout:
+    """
+    New-job -> user matches collected over one ingestion run.
+
+    Works on a snapshot of the skill index taken when the run starts: a
+    skills x users 0/1 matrix. For each written batch the jobs' matching
+    skills become a jobs x skills matrix, and one sparse product gives
+    how many of each user's skills every job matches, so the per-pair
+    work happens in scipy rather than in Python loops, as in JobMatrix.
+
+    A job counts for a user once it matches NOTIFY_MIN_MATCHED_SKILLS of
+    their skills (or all of them, for users listing fewer). Per user the
+    run keeps the number of matching jobs, the skills that matched and
+    the NOTIFY_MATCH_MAX_JOBS jobs with the most matching skills
+    (earliest first on ties); flush() writes one digest per user.
+    """
+
+    def __init__(self, index: Optional[SkillIndex] = None):
+        self.index = index if index is not None else skill_index
+        self.max_jobs = settings.NOTIFY_MATCH_MAX_JOBS
+        self.skills, self.user_ids, self.matrix = self.index.snapshot()
+        self.skill_pos = {skill: i for i, skill in enumerate(self.skills)}
+        self.user_matrix = self.matrix.T.tocsr()
+        per_user = np.asarray(self.matrix.sum(axis=0)).ravel()
+        self.needed = np.minimum(settings.NOTIFY_MIN_MATCHED_SKILLS, per_user).astype(np.int32)
+        self.counts = np.zeros(len(self.user_ids), dtype=np.int64)
+        self.hits: Optional[sp.csr_matrix] = None
+        # (job_id, label) per job seen, indexed by arrival order
+        self.jobs: List[Tuple[str, str]] = []
+        self.best_users = np.zeros(0, dtype=np.int64)
+        self.best_scores = np.zeros(0, dtype=np.int32)
+        self.best_seqs = np.zeros(0, dtype=np.int64)
+        self.stats = {"jobs": 0, "matches": 0, "match_seconds": 0.0, "error": None}
+
+    def add(self, jobs: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        base = len(self.jobs)
+        rows: List[int] = []
+        cols: List[int] = []
+        for i, job in enumerate(jobs):
+            self.jobs.append((job["job_id"], job_label(job)))
+            for skill in self.index.matching_skills(text_terms(job_text(job))):
+                col = self.skill_pos.get(skill)
+                if col is not None:  # skills first listed after the run started wait for the next run
+                    rows.append(i)
+                    cols.append(col)
+        self.stats["jobs"] += len(jobs)
+        if rows:
+            self._count(sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                                      shape=(len(jobs), len(self.skills))), base)
+        self.stats["match_seconds"] += time.perf_counter() - started
+
+    def _count(self, job_skills: sp.csr_matrix, base: int):
+        matched = (job_skills @ self.matrix).tocoo()
+        keep = matched.data >= self.needed[matched.col]
+        job_rows, users, scores = matched.row[keep], matched.col[keep], matched.data[keep]
+        if not len(users):
+            return
+        self.stats["matches"] += len(users)
+        self.counts += np.bincount(users, minlength=len(self.user_ids))
+
+        # Skills of each user that occur in the jobs that matched them
+        pairs = sp.csr_matrix((np.ones(len(users), dtype=np.int32), (users, job_rows)),
+                              shape=(len(self.user_ids), job_skills.shape[0]))
+        hits = (pairs @ job_skills).multiply(self.user_matrix).tocsr()
+        self.hits = hits if self.hits is None else self.hits + hits
+
+        # Merge with the best so far: by user, most skills first, then earliest
+        users = np.concatenate([self.best_users, users])
+        scores = np.concatenate([self.best_scores, scores])
+        seqs = np.concatenate([self.best_seqs, job_rows.astype(np.int64) + base])
+        order = np.lexsort((seqs, -scores, users))
+        users, scores, seqs = users[order], scores[order], seqs[order]
+        starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+        rank = np.arange(len(users)) - np.repeat(starts, np.diff(np.r_[starts, len(users)]))
+        top = rank < self.max_jobs
+        self.best_users, self.best_scores, self.best_seqs = users[top], scores[top], seqs[top]
+
+    def digests(self, now: datetime) -> List[Dict[str, Any]]:
+        matched = np.flatnonzero(self.counts)
+        bounds = np.searchsorted(self.best_users, np.r_[matched, len(self.user_ids)])
+        docs = []
+        for k, user in enumerate(matched):
+            best = [self.jobs[seq] for seq in self.best_seqs[bounds[k]:bounds[k + 1]]]
+            row = self.hits.indices[self.hits.indptr[user]:self.hits.indptr[user + 1]]
+            docs.append(match_notification(self.user_ids[user], int(self.counts[user]), best,
+                                           [self.skills[col] for col in row], now))
+        return docs
+
+    async def feed(self, jobs: List[Dict[str, Any]]):
+        """add() off the event loop; a failure is recorded and stops the fan-out, never the ingest."""
+        if not jobs or self.stats["error"]:
+            return
+        try:
+            await asyncio.to_thread(self.add, jobs)
+        except Exception as e:
+            self.stats["error"] = f"{type(e).__name__}: {e}"
+            logger.exception("Job match fan-out failed")
+
+    async def flush(self) -> Dict[str, Any]:
+        docs: List[Dict[str, Any]] = []
+        written = 0
+        if not self.stats["error"]:
+            try:
+                docs = self.digests(datetime.utcnow())
+                written = await insert_notifications(docs)
+            except Exception as e:
+                self.stats["error"] = f"{type(e).__name__}: {e}"
+                logger.exception("Writing job match notifications failed")
+        return {**self.stats, "match_seconds": round(self.stats["match_seconds"], 3),
+                "users": len(docs), "notifications": written}
+
+
+async def start_fanout() -> Optional[JobMatchFanout]:
+    """A fan-out for an ingestion run, or None when disabled or the index can't be loaded."""
+    if not settings.NOTIFY_NEW_JOB_MATCHES:
+        return None
+    try:
+        await skill_index.sync()
+    except Exception:
+        logger.exception("Skill index unavailable, no match notifications this run")
+        return None
+    return JobMatchFanout()
+
+
+# -------------------------------------------------------------------
+# Inbox
+# -------------------------------------------------------------------
+@router.get("", response_class=FastJSONResponse)
+async def list_notifications(
+    limit: int = Query(50, ge=1, le=200),
+    unread: bool = False,
+    before: Optional[str] = Query(None, description="id of the oldest notification already shown"),
+    user=Depends(get_current_principal),
+):
+    query: Dict[str, Any] = {"user_id": user["id"]}
+    if unread:
+        query["read"] = False
+    if before and ObjectId.is_valid(before):
+        query["_id"] = {"$lt": ObjectId(before)}
+    docs = await notifications_col.find(query).sort("_id", -1).to_list(limit)
+    return FastJSONResponse([notification_out(doc) for doc in docs])
+
+
+@router.put("/{notification_id}/read")
+async def mark_notification_read(notification_id: str, user=Depends(get_current_principal)):
+    if not ObjectId.is_valid(notification_id):
+        raise HTTPException(status_code=404, detail="Notification not found")
+    result = await notifications_col.update_one(
+        {"_id": ObjectId(notification_id), "user_id": user["id"]},
+        {"$set": {"read": True, "read_at": datetime.utcnow()}},
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return {"status": "read"}
+
+
+# -------------------------------------------------------------------
+# Server-Sent Events
+# -------------------------------------------------------------------
+async def notification_events(request: Request, user_id: str, last_id: ObjectId) -> AsyncIterator[bytes]:
+    wake = hub.subscribe(user_id)
+    try:
+        yield f"retry: {int(settings.NOTIFY_STREAM_POLL_SECONDS * 1000)}\n\n".encode()
+        while not await request.is_disconnected():
+            cursor = notifications_col.find({"user_id": user_id, "_id": {"$gt": last_id}}).sort("_id", 1)
+            for doc in await cursor.to_list(settings.NOTIFY_STREAM_BATCH_SIZE):
+                last_id = doc["_id"]
+                yield b"id: " + str(last_id).encode() + b"\nevent: notification\ndata: " + \
+                    dumps(notification_out(doc)) + b"\n\n"
+            try:
+                await asyncio.wait_for(wake.wait(), settings.NOTIFY_STREAM_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle connection
+                yield b": keep-alive\n\n"
+            wake.clear()
+    finally:
+        hub.unsubscribe(user_id, wake)
+
+
+@router.post("/stream/ticket")
+async def stream_ticket(user=Depends(get_current_principal)):
+    """
+    A short-lived ticket that only opens /notifications/stream.
+
+    EventSource can't send headers, so browsers authenticate the stream
+    in its URL; a ticket there keeps the access token out of access
+    logs, proxy logs and browser history.
+    """
+    ticket = create_access_token(
+        user["id"],
+        expires_delta=timedelta(seconds=settings.NOTIFY_STREAM_TICKET_SECONDS),
+        claims={"aud": STREAM_TICKET_AUDIENCE},
+    )
+    return {"ticket": ticket, "expires_in": settings.NOTIFY_STREAM_TICKET_SECONDS}
+
+
+async def stream_user_id(token: Optional[str], ticket: Optional[str]) -> str:
+    """The streaming user, from a stream ticket or else a bearer token in the Authorization header."""
+    if ticket:
+        claims = decode_token_claims(ticket, audience=STREAM_TICKET_AUDIENCE)
+        if not claims or not claims.get("sub"):
+            raise HTTPException(status_code=401, detail="Invalid or expired stream ticket")
+        return claims["sub"]
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return (await get_current_principal(token))["id"]
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    ticket: Optional[str] = Query(None, description="from POST /notifications/stream/ticket, for EventSource"),
+    since: Optional[str] = Query(None, description="resume after this notification id"),
+):
+    """
+    New notifications as Server-Sent Events ("notification" events whose
+    id is the notification id). Reconnecting clients send Last-Event-ID
+    (or ?since=) and get what they missed; otherwise the stream starts
+    at the time of connecting.
+
+    The ticket is checked when the stream opens; reconnecting after it
+    expired takes a new one.
+    """
+    user_id = await stream_user_id(token, ticket)
+
+    resume = request.headers.get("last-event-id") or since
+    last_id = ObjectId(resume) if resume and ObjectId.is_valid(resume) else ObjectId.from_datetime(datetime.utcnow())
+    return StreamingResponse(
+        notification_events(request, user_id, last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,67 @@
+import base64
+import json
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+# Sort used by date-ordered job listings; the keyset index matches it
+JOB_LIST_SORT = [("date_posted", -1), ("_id", -1)]
+
+
+# -------------------------------------------------------------------
+# Opaque cursor tokens
+# -------------------------------------------------------------------
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, dict):
+            raise ValueError("cursor payload must be an object")
+        return payload
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def job_cursor(job: Dict[str, Any]) -> str:
+    """Cursor pointing just after `job` in JOB_LIST_SORT order."""
+    return encode_cursor({"d": job.get("date_posted"), "i": str(job["_id"])})
+
+
+def offset_cursor(offset: int) -> str:
+    """Cursor for relevance-ranked results, which have no stable keyset."""
+    return encode_cursor({"o": offset})
+
+
+# -------------------------------------------------------------------
+# Keyset filter
+# -------------------------------------------------------------------
+def keyset_filter(cursor: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Filter selecting the documents after `cursor` in JOB_LIST_SORT order.
+
+    Mongo sorts null/missing date_posted lowest, so in descending order
+    they come last: once the cursor is past dated jobs only the null
+    bucket remains, ordered by _id.
+    """
+    if "i" not in cursor:
+        return None
+    try:
+        last_id = ObjectId(cursor["i"])
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    last_date = cursor.get("d")
+    if last_date is None:
+        return {"date_posted": None, "_id": {"$lt": last_id}}
+    return {"$or": [
+        {"date_posted": {"$lt": last_date}},
+        {"date_posted": last_date, "_id": {"$lt": last_id}},
+        {"date_posted": None},
+    ]}
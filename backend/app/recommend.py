@@ -1,129 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from .db import jobs_col, users_col
 from .auth import get_current_user
 from bson import ObjectId
-import random
 from typing import List, Dict, Any
+from .config import settings
+from .matching import job_matrix, recommend_for_user, recommendation_cache
+from .pagination import JOB_LIST_SORT
+from .hydration import fetch_jobs_by_ids
+from .serializers import job_projection, serialize_job
+from .responses import FastJSONResponse
+from .http_cache import PRIVATE_CACHE_CONTROL, catalog_etag, catalog_version, etag_matches, not_modified
+from .logs import get_logger
+
+logger = get_logger(__name__)
 
 # Remove any prefix since jobs.py already uses /jobs prefix
 router = APIRouter()
 
-def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
-    try:
-        job_copy = dict(job)
-        
-        if "_id" in job_copy:
-            job_copy["id"] = str(job_copy["_id"])
-            job_copy["_id"] = str(job_copy["_id"])
-        
-        job_copy.setdefault("title", "No Title")
-        job_copy.setdefault("company_name", "Unknown Company")
-        job_copy.setdefault("location", "Remote")
-        job_copy.setdefault("description", "")
-        job_copy.setdefault("remote", False)
-        job_copy.setdefault("url", "")
-        job_copy.setdefault("date_posted", "")
-        job_copy.setdefault("raw", {})
-        
-        return job_copy
-    except Exception as e:
-        print(f"Error serializing job: {e}")
-        return {
-            "id": str(job.get("_id", "")),
-            "title": "Error loading job",
-            "company_name": "Unknown",
-            "location": "Remote",
-            "description": "Error loading job details",
-            "remote": False,
-            "url": "",
-            "date_posted": "",
-            "raw": {}
-        }
+async def newest_jobs(limit: int) -> List[Dict[str, Any]]:
+    cursor = jobs_col.find({}, job_projection("card")).sort(JOB_LIST_SORT).limit(limit)
+    jobs = await cursor.to_list(length=limit)
+    return [serialize_job(job, "card") for job in jobs]
+
+
+def mark_popular(jobs: List[Dict[str, Any]], reason: str) -> List[Dict[str, Any]]:
+    """Annotate unranked fallback jobs (newest first) like ranked ones."""
+    for job in jobs:
+        job["matched_skills"] = []
+        job["match_score"] = 70
+        job["match_reason"] = reason
+    return jobs
+
+
+def annotate_ranked(ranked: List[Dict[str, Any]], docs: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Serialize the ranked jobs found in `docs` (keyed by job id) in rank order, with match details."""
+    best = ranked[0]["similarity"] if ranked else 0.0
+
+    result = []
+    for r in ranked:
+        job = docs.get(r["job_id"])
+        if not job:
+            continue
+        job = serialize_job(job, "card")
+        matched = r["matched_skills"]
+        job["matched_skills"] = matched
+        if matched:
+            job["match_score"] = min(100, len(matched) * 20 + 60)
+            job["match_reason"] = f"Matches {len(matched)} of your skills"
+        else:
+            job["match_score"] = 50 + round(25 * r["similarity"] / best) if best > 0 else 50
+            job["match_reason"] = "Based on your profile"
+        result.append(job)
+    return result
+
+
+async def hydrate_ranked(ranked: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Load the ranked jobs with one $in query and annotate them in rank order."""
+    docs = await fetch_jobs_by_ids((r["job_id"] for r in ranked), projection=job_projection("card"))
+    return annotate_ranked(ranked, docs)
+
 
 # Change the route to avoid conflict with jobs.py
-@router.get("/recommended-jobs")
-async def get_recommended_jobs(current_user: dict = Depends(get_current_user)):
+@router.get("/recommended-jobs", response_class=FastJSONResponse)
+async def get_recommended_jobs(request: Request, current_user: dict = Depends(get_current_user)):
     try:
-        print(f"Getting recommended jobs for user: {current_user['email']}")
         user_id = current_user["id"]
         
-        user = await users_col.find_one({"_id": ObjectId(user_id)})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        user_skills = user.get("skills", [])
-        print(f"User skills: {user_skills}")
-        
-        all_jobs = await jobs_col.find({}).to_list(length=100)
-        print(f"Found {len(all_jobs)} total jobs in database")
-        
-        if not all_jobs:
-            print("No jobs found in database")
-            return []
-        
-        serialized_jobs = [serialize_job(job) for job in all_jobs]
+        # get_current_user already loaded the skills; no second user read
+        user_skills = current_user.get("skills") or []
+        logger.debug("Recommending for %s with skills %s", current_user["email"], user_skills)
         
-        if user_skills:
-            recommended_jobs = []
-            other_jobs = []
-            
-            for job in serialized_jobs:
-                job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
-                user_skills_normalized = [skill.lower().strip() for skill in user_skills]
-                
-                matched_skills = []
-                for skill in user_skills_normalized:
-                    if skill in job_text:
-                        matched_skills.append(skill)
-                
-                if matched_skills:
-                    job["matched_skills"] = matched_skills
-                    job["match_score"] = min(100, len(matched_skills) * 20 + 60)
-                    job["match_reason"] = f"Matches {len(matched_skills)} of your skills"
-                    recommended_jobs.append(job)
-                else:
-                    job["matched_skills"] = []
-                    job["match_score"] = random.randint(50, 75)
-                    job["match_reason"] = "Based on your profile"
-                    other_jobs.append(job)
-            
-            print(f"Found {len(recommended_jobs)} skill-matched jobs")
-            print(f"Found {len(other_jobs)} other jobs")
-            
-            recommended_jobs.sort(key=lambda x: x.get("match_score", 0), reverse=True)
-            other_jobs.sort(key=lambda x: x.get("match_score", 0), reverse=True)
-            
-            result = recommended_jobs + other_jobs
-            final_result = result[:6]
-            print(f"Returning {len(final_result)} recommended jobs")
-            return final_result
+        # Catch up with a catalog change this worker's matrix hasn't pulled
+        # yet, then tag per user from the shared catalog version and their
+        # skills, so every worker tags the same ranking alike
+        await job_matrix.sync(catalog_version=await catalog_version())
+        headers = {
+            "ETag": await catalog_etag(request, user_id, tuple(sorted(user_skills))),
+            "Cache-Control": PRIVATE_CACHE_CONTROL,
+        }
+        if etag_matches(request, headers["ETag"]):
+            return not_modified(headers)
+
+        ranked = recommend_for_user(user_id, user_skills, settings.RECOMMEND_TOP_K) if user_skills else []
+        if ranked:
+            result = await hydrate_ranked(ranked)
+            logger.debug("Returning %d recommended jobs from %d scored", len(result), len(job_matrix))
+            return FastJSONResponse(result, headers=headers)
         
-        else:
-            print("User has no skills, returning random jobs")
-            random_jobs = random.sample(serialized_jobs, min(6, len(serialized_jobs)))
-            for job in random_jobs:
-                job["matched_skills"] = []
-                job["match_score"] = random.randint(70, 90)
-                job["match_reason"] = "Popular jobs for you"
-            
-            return random_jobs
+        logger.debug("No skill matches available, returning newest jobs")
+        newest = mark_popular(await newest_jobs(settings.RECOMMEND_TOP_K), "Popular jobs for you")
+        return FastJSONResponse(newest, headers=headers)
         
     except Exception as e:
-        print(f"Error getting recommended jobs: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting recommended jobs: %s", e)
         
         try:
-            all_jobs = await jobs_col.find({}).to_list(length=50)
-            serialized_jobs = [serialize_job(job) for job in all_jobs]
-            random_jobs = random.sample(serialized_jobs, min(6, len(serialized_jobs)))
-            for job in random_jobs:
-                job["matched_skills"] = []
-                job["match_score"] = random.randint(70, 90)
-                job["match_reason"] = "Featured job"
-            return random_jobs
+            return mark_popular(await newest_jobs(settings.RECOMMEND_TOP_K), "Featured job")
         except Exception as fallback_error:
-            print(f"Fallback also failed: {fallback_error}")
+            logger.error("Fallback also failed: %s", fallback_error)
             return []
 
 
@@ -153,6 +127,14 @@ async def debug_jobs():
     except Exception as e:
         return {"error": str(e)}
 
+@router.get("/recommended-jobs/cache-stats")
+async def recommendation_cache_stats():
+    return {
+        "cache": recommendation_cache.stats(),
+        "catalog_version": job_matrix.version,
+        "jobs_scored": len(job_matrix),
+    }
+
 # Test endpoint
 @router.get("/test-recommend")
 async def test_recommend():
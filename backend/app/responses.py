@@ -0,0 +1,41 @@
+from typing import Any, Iterable
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse, Response
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encoding; datetimes are native, ObjectIds become strings."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson.
+
+    Return it directly from an endpoint (not a plain dict) so FastAPI
+    skips jsonable_encoder as well; that walk is most of the cost on
+    job pages.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """A body that is already JSON bytes (e.g. spliced card payloads)."""
+
+    media_type = "application/json"
+
+
+def json_array(items: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(items) + b"]"
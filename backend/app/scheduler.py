@@ -1,11 +1,18 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from .jobs import fetch_from_findwork
+from .jobs import fetch_jobs
 from .db import apply_later_col, users_col, jobs_col
 from datetime import datetime, timedelta
 from .config import settings
 from bson import ObjectId
+from typing import Dict, List
 import asyncio
 import httpx
+import time
+from .logs import get_logger
+from .metrics import timed_job
+from .leases import run_exclusive
+
+logger = get_logger(__name__)
 
 scheduler = AsyncIOScheduler()
 
@@ -18,50 +25,129 @@ async def send_push_notification(user_token: str, title: str, body: str):
         # r = await client.post("https://fcm.googleapis.com/fcm/send", headers=headers, json=payload)
         return True
 
-async def check_deadlines_and_notify():
-    now = datetime.utcnow()
-    tomorrow = now + timedelta(days=1)
+def deadline_window(now: datetime, days: int = 2):
+    """[start of today, + days) as datetime and ISO-string ranges; by default today and tomorrow."""
+    start = datetime(now.year, now.month, now.day)
+    end = start + timedelta(days=days)
+    return {"$or": [
+        {"last_date": {"$gte": start, "$lt": end}},
+        {"last_date": {"$gte": start.date().isoformat(), "$lt": end.date().isoformat()}},
+    ]}
+
 
-    items = await apply_later_col.find({}).to_list(length=1000)
+def reminder_text(jobs: List[dict]):
+    if len(jobs) == 1:
+        job = jobs[0]
+        return "Apply Reminder", f"Deadline for {job.get('title') or job.get('role')} at {job.get('company_name')} is approaching."
+    names = ", ".join(job.get("title") or job.get("role") or "a job" for job in jobs[:3])
+    more = f" and {len(jobs) - 3} more" if len(jobs) > 3 else ""
+    return "Apply Reminders", f"{len(jobs)} saved jobs have deadlines approaching: {names}{more}."
 
-    for item in items:
-        job = await jobs_col.find_one({"job_id": item.get("job_id")})
-        if not job:
+
+async def _notify_users(pending: Dict[str, List[dict]], stats: dict, semaphore: asyncio.Semaphore):
+    """Look up a batch of users with one query and send their reminders concurrently."""
+    object_ids = {}
+    for user_id in pending:
+        try:
+            object_ids[ObjectId(user_id)] = user_id
+        except Exception:
             continue
 
-        last_date = job.get("last_date")
-        if not last_date:
+    users = users_col.find({"_id": {"$in": list(object_ids)}}, {"fcm_token": 1})
+    sends = []
+    async for user in users:
+        fcm_token = user.get("fcm_token")
+        if not fcm_token:
+            stats["no_token"] += 1
             continue
+        title, body = reminder_text(pending[object_ids[user["_id"]]])
+        sends.append((fcm_token, title, body))
 
-        if isinstance(last_date, str):
+    async def send(fcm_token, title, body):
+        async with semaphore:
             try:
-                last_date_dt = datetime.fromisoformat(last_date)
-            except Exception:
-                continue
-        else:
-            last_date_dt = last_date
+                await send_push_notification(fcm_token, title, body)
+                stats["sent"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                logger.warning("Push notification failed: %s", e)
 
-        if last_date_dt.date() in [now.date(), tomorrow.date()]:
-            # safely convert user_id to ObjectId
-            try:
-                user_id = ObjectId(item.get("user_id"))
-            except Exception:
-                continue
+    await asyncio.gather(*(send(*args) for args in sends))
+
+
+async def check_deadlines_and_notify():
+    """
+    Streaming deadline sweep.
+
+    1. Select jobs whose last_date falls today or tomorrow (indexed range).
+    2. Group the apply_later rows for those jobs by user in Mongo (the
+       job_id index serves the $match), so each user's saves arrive as
+       one row and are merged into one reminder.
+    3. Every NOTIFY_BATCH_SIZE users, load their push tokens with one $in
+       query and send concurrently under a semaphore.
 
-            user = await users_col.find_one({"_id": user_id})
-            if not user:
+    Memory is bounded by the deadline window and one batch of users, not
+    by the number of saved rows.
+    """
+    started = time.perf_counter()
+    stats = {"window_jobs": 0, "saved_rows": 0, "users": 0, "sent": 0, "no_token": 0, "failed": 0}
+
+    window_jobs = {}
+    async for job in jobs_col.find(deadline_window(datetime.utcnow()), {"job_id": 1, "title": 1, "role": 1, "company_name": 1}):
+        if job.get("job_id"):
+            window_jobs[job["job_id"]] = job
+    stats["window_jobs"] = len(window_jobs)
+
+    if window_jobs:
+        semaphore = asyncio.Semaphore(settings.NOTIFY_CONCURRENCY)
+        pending: Dict[str, List[dict]] = {}
+
+        # No sort: an index on job_id can't order by user_id, and $group
+        # already brings each user's saves together
+        saved = apply_later_col.aggregate([
+            {"$match": {"job_id": {"$in": list(window_jobs)}}},
+            {"$group": {"_id": "$user_id", "job_ids": {"$addToSet": "$job_id"}, "rows": {"$sum": 1}}},
+        ], allowDiskUse=True)
+
+        async for row in saved:
+            stats["saved_rows"] += row["rows"]
+            if row["_id"] is None:
                 continue
+            pending[row["_id"]] = [window_jobs[job_id] for job_id in row["job_ids"]]
+            if len(pending) >= settings.NOTIFY_BATCH_SIZE:
+                stats["users"] += len(pending)
+                await _notify_users(pending, stats, semaphore)
+                pending = {}
+
+        if pending:
+            stats["users"] += len(pending)
+            await _notify_users(pending, stats, semaphore)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info("Deadline sweep finished", extra=stats)
+    return stats
+
+def add_leased_job(name: str, func, minutes: int):
+    """
+    Schedule `func` every `minutes` in this worker, running it only when
+    this worker holds the job's lease (see leases.py).
+
+    APScheduler awaits the coroutine itself; max_instances=1 skips a tick
+    while the previous run in this worker is still going, and the lease
+    does the same across workers and replicas.
+    """
+    timed = timed_job(name)(func)
+
+    async def run():
+        return await run_exclusive(name, timed, interval_seconds=minutes * 60)
+
+    scheduler.add_job(run, 'interval', minutes=minutes, id=name, max_instances=1, coalesce=True)
 
-            fcm_token = user.get("fcm_token")
-            if fcm_token:
-                title = "Apply Reminder"
-                body = f"Deadline for {job.get('role')} at {job.get('company_name')} is approaching."
-                await send_push_notification(fcm_token, title, body)
 
 def start_scheduler(app=None):
     # fetch jobs periodically
-    scheduler.add_job(lambda: asyncio.create_task(fetch_from_findwork()), 'interval', minutes=settings.CRON_FETCH_INTERVAL_MINUTES)
+    add_leased_job("fetch_jobs", fetch_jobs, settings.CRON_FETCH_INTERVAL_MINUTES)
     # check deadlines hourly
-    scheduler.add_job(lambda: asyncio.create_task(check_deadlines_and_notify()), 'interval', minutes=60)
+    add_leased_job("deadline_sweep", check_deadlines_and_notify, 60)
     scheduler.start()
-    print("Scheduler started; fetching jobs periodically.")
+    logger.info("Scheduler started; fetching jobs every %s minutes", settings.CRON_FETCH_INTERVAL_MINUTES)
@@ -0,0 +1,107 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+# -------------------------------------------------------------------
+# Searchable fields
+# -------------------------------------------------------------------
+# Public name used by the `fields` selector -> Mongo field
+SEARCH_FIELDS = {
+    "title": "title",
+    "company": "company_name",
+    "description": "description",
+}
+
+# Relevance weights for the Mongo text index
+TEXT_INDEX_WEIGHTS = {"title": 10, "company_name": 5, "description": 1}
+TEXT_INDEX_NAME = "job_text_search"
+
+# Fields whose tokens are stored in `search_tokens` for prefix matching
+PREFIX_FIELDS = {"title", "company"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens; keeps terms like c++, c# and node.js intact."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def search_tokens(title: Optional[str], company_name: Optional[str]) -> List[str]:
+    """Field-qualified title/company tokens (e.g. "title:python") for indexed prefix lookups."""
+    tokens = {f"title:{t}" for t in tokenize(title)}
+    tokens.update(f"company:{t}" for t in tokenize(company_name))
+    return sorted(tokens)
+
+
+# -------------------------------------------------------------------
+# Query building
+# -------------------------------------------------------------------
+def parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return list(SEARCH_FIELDS)
+    selected = [f.strip().lower() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in SEARCH_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown search fields: {', '.join(unknown) or fields}. "
+                   f"Allowed: {', '.join(SEARCH_FIELDS)}",
+        )
+    return selected
+
+
+def build_text_query(
+    q: str,
+    fields: List[str],
+    prefix: bool = False,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[List[Tuple[str, Any]]]]:
+    """
+    Translate a search string into (filter, projection, sort).
+
+    Full terms go through the text index and are ranked by textScore.
+    With prefix=True the last term is matched as a prefix against the
+    indexed `search_tokens` of the selected title/company fields, which
+    is how search-as-you-type is served. When `fields` is narrower than the
+    text index, the text-index candidates are additionally required to
+    contain each term in one of the selected fields.
+    """
+    terms = tokenize(q)
+    prefix_term = None
+    if prefix and terms and PREFIX_FIELDS.intersection(fields):
+        prefix_term = terms.pop()
+
+    query: Dict[str, Any] = {}
+    clauses = []
+    if terms:
+        query["$text"] = {"$search": " ".join(terms)}
+        if set(fields) != set(SEARCH_FIELDS):
+            for term in terms:
+                pattern = rf"\b{re.escape(term)}"
+                clauses.append({"$or": [
+                    {SEARCH_FIELDS[f]: {"$regex": pattern, "$options": "i"}} for f in fields
+                ]})
+    if prefix_term:
+        clauses.append({"search_tokens": {"$in": [
+            re.compile(f"^{f}:{re.escape(prefix_term)}") for f in fields if f in PREFIX_FIELDS
+        ]}})
+    if clauses:
+        query["$and"] = clauses
+
+    if terms:
+        projection = {"score": {"$meta": "textScore"}}
+        sort = [("score", {"$meta": "textScore"})]
+        return query, projection, sort
+    return query, None, None
+
+
+def location_filter(location: Optional[str]) -> Dict[str, Any]:
+    """Mongo filter for the `location` parameter; "remote" means remote jobs."""
+    if not location:
+        return {}
+    if location.lower() == "remote":
+        return {"remote": True}
+    return {"location": {"$regex": location, "$options": "i"}}
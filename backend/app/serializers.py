@@ -0,0 +1,114 @@
+from typing import Any, Dict, Optional
+
+import orjson
+from bson import ObjectId
+
+# -------------------------------------------------------------------
+# Field profiles
+# -------------------------------------------------------------------
+# "card"   - list views: no description body and only the raw keys the UI reads
+# "detail" - single job view: card plus the full description
+# "full"   - the whole stored document (exports, debugging)
+_CARD_FIELDS = [
+    "job_id", "title", "role", "company_name", "location", "remote", "url",
+    "date_posted", "last_date", "summary",
+    "raw.employment_type", "raw.salary", "raw.last_date", "raw.deadline",
+    "raw.keywords", "raw.logo",
+]
+_DETAIL_FIELDS = _CARD_FIELDS + ["description", "raw.requirements", "raw.skills", "raw.required_skills"]
+
+PROFILES: Dict[str, Optional[Dict[str, int]]] = {
+    "card": {field: 1 for field in _CARD_FIELDS},
+    "detail": {field: 1 for field in _DETAIL_FIELDS},
+    "full": None,
+}
+
+_DEFAULTS = {
+    "title": "No Title",
+    "company_name": "Unknown Company",
+    "location": "Remote",
+    "remote": False,
+    "url": "",
+    "date_posted": "",
+}
+
+
+def job_projection(profile: str = "card") -> Optional[Dict[str, Any]]:
+    """Mongo projection for a profile (None means the whole document)."""
+    projection = PROFILES[profile]
+    return dict(projection) if projection is not None else None
+
+
+# -------------------------------------------------------------------
+# Serialization
+# -------------------------------------------------------------------
+def serialize_job(job: Dict[str, Any], profile: str = "card") -> Dict[str, Any]:
+    """
+    Single pass over a job document loaded with job_projection(profile).
+
+    ObjectIds at the top level and inside `raw` become strings; nothing
+    else is copied or walked, so the work is proportional to the fields
+    the profile actually loads.
+    """
+    out: Dict[str, Any] = {}
+    for key, value in job.items():
+        if key == "card_json":
+            continue
+        if isinstance(value, ObjectId):
+            value = str(value)
+        elif key == "raw" and isinstance(value, dict):
+            value = {k: str(v) if isinstance(v, ObjectId) else v for k, v in value.items()}
+        out[key] = value
+
+    if "_id" in out:
+        out["id"] = out["_id"]
+    for key, default in _DEFAULTS.items():
+        if out.get(key) is None:
+            out[key] = default
+    out.setdefault("raw", {})
+    return out
+
+
+# -------------------------------------------------------------------
+# Pre-rendered card JSON
+# -------------------------------------------------------------------
+# Ingestion stores each job's card as JSON bytes (`card_json`). List
+# endpoints load just those bytes and splice the per-request keys (_id,
+# id, score, saved_at...) in front, so a page is built without decoding
+# or re-encoding the job at all.
+CARD_JSON_PROJECTION = {"card_json": 1, "job_id": 1, "date_posted": 1}
+
+
+def project_doc(job: Dict[str, Any], profile: str = "card") -> Dict[str, Any]:
+    """Apply a profile's projection in Python (for documents not read back from Mongo)."""
+    projection = PROFILES[profile]
+    if projection is None:
+        return dict(job)
+    out: Dict[str, Any] = {}
+    for field in projection:
+        head, _, tail = field.partition(".")
+        if head not in job:
+            continue
+        if not tail:
+            out[head] = job[head]
+        elif isinstance(job[head], dict) and tail in job[head]:
+            out.setdefault(head, {})[tail] = job[head][tail]
+    return out
+
+
+def render_card(job: Dict[str, Any]) -> bytes:
+    """Card JSON for a job document, without the per-document _id/id keys."""
+    card = serialize_job(project_doc(job, "card"), "card")
+    card.pop("_id", None)
+    card.pop("id", None)
+    return orjson.dumps(card)
+
+
+def splice_card(card_json: bytes, extra: Dict[str, Any]) -> bytes:
+    """Prepend `extra` keys to a rendered card object."""
+    head = orjson.dumps(extra, default=str)
+    if len(head) == 2:
+        return card_json
+    if len(card_json) == 2:
+        return head
+    return head[:-1] + b"," + card_json[1:]
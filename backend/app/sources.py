@@ -0,0 +1,385 @@
+"""
+Job source adapters.
+
+A source fetches postings from one board and yields them in batches,
+already normalized into the JobInDB shape (models.py). ingest.py runs
+any number of sources concurrently and writes what they yield through
+one batched sink, dropping cross-source duplicates on the way.
+
+- FindWorkSource: the paginated FindWork API (incremental, see ingest.py)
+- FeedSource: an RSS/Atom or JSON feed over HTTP
+- FileSource: a local .json, .jsonl/.ndjson, .csv or RSS/Atom file
+
+Which ones run on schedule comes from settings (INGEST_FINDWORK,
+INGEST_FEED_URLS, INGEST_FILE_PATHS); see configured_sources().
+"""
+import abc
+import asyncio
+import csv
+import hashlib
+import io
+import math
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import orjson
+
+from .config import settings
+from .ingest import (
+    FINDWORK, fetch_page, findwork_job, get_findwork_client, get_high_water_mark,
+    newest_created_at, newest_first, page_already_seen, parse_date, set_high_water_mark, state_key,
+)
+from .logs import get_logger
+from .models import JobInDB
+from .upstream import UpstreamClient, UpstreamError
+
+try:
+    from defusedxml import ElementTree as XML  # refuses entity-expansion bombs
+except ImportError:
+    from xml.etree import ElementTree as XML
+
+logger = get_logger(__name__)
+
+
+class JobSource(abc.ABC):
+    """
+    Base adapter. Subclasses set `name` (unique per run; it also prefixes
+    their job ids) and implement batches(); adapter-specific counters go
+    in `stats` and are reported with the run.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stats: Dict[str, Any] = {"invalid": 0}
+
+    @abc.abstractmethod
+    def batches(self) -> AsyncIterator[List[JobInDB]]:
+        """Yield lists of normalized jobs; implemented as an async generator."""
+
+    async def finish(self):
+        """Called once everything this source yielded has been written."""
+
+    def normalize(self, items: Iterable[Any], convert: Callable[[Any], JobInDB]) -> List[JobInDB]:
+        jobs = []
+        for item in items:
+            try:
+                jobs.append(convert(item))
+            except (ValueError, TypeError, AttributeError) as e:
+                # pydantic's ValidationError is a ValueError
+                self.stats["invalid"] += 1
+                logger.debug("Skipping invalid %s posting: %s", self.name, e)
+        return jobs
+
+
+def chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# -------------------------------------------------------------------
+# FindWork
+# -------------------------------------------------------------------
+class FindWorkSource(JobSource):
+    """
+    Page 1 is fetched first to learn the total count and page size; the
+    remaining pages are fetched in concurrent waves of `concurrency`
+    pages. Results are requested newest first (sort_by=date; FindWork
+    ranks by relevance otherwise), so once a wave contains a page made
+    up entirely of postings at or below the stored created_at
+    high-water mark, paging stops. Pass full=True to ignore the
+    high-water mark and walk every page.
+
+    Pages the server reports as not modified (304) are skipped, and an
+    unchanged page 1 ends the run. Both early stops rely on the date
+    order, so a page found out of order turns them off for the rest of
+    the run and every page is read. A page that still fails after the
+    client's retries is counted in `failed_pages` without discarding the
+    others; the high-water mark is then left alone so the next run
+    fetches those pages again.
+    """
+
+    def __init__(
+        self,
+        search: Optional[str] = None,
+        location: Optional[str] = None,
+        max_pages: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        full: bool = False,
+    ):
+        super().__init__(FINDWORK)
+        self.params: Dict[str, Any] = {"sort_by": "date"}
+        if search:
+            self.params["search"] = search
+        if location:
+            self.params["location"] = location
+        self.max_pages = max_pages or settings.FINDWORK_MAX_PAGES
+        self.concurrency = concurrency or settings.FINDWORK_CONCURRENCY
+        self.full = full
+        self.key = state_key(search, location)
+        self.newest: List[str] = []
+        self.date_ordered = True
+        self._oldest: Optional[str] = None
+        self.stats.update({"pages": 0, "not_modified": 0, "failed_pages": 0})
+
+    def page(self, results: List[Dict[str, Any]], fresh: bool) -> List[JobInDB]:
+        self.stats["pages"] += 1
+        if not fresh:
+            self.stats["not_modified"] += 1
+            return []
+        stamp = newest_created_at(results)
+        if stamp:
+            self.newest.append(stamp)
+        return self.normalize(results, findwork_job)
+
+    def seen(self, results: List[Dict[str, Any]], high_water_mark: Optional[str]) -> bool:
+        """Whether paging can stop after this page (pages are checked in page order)."""
+        if self.date_ordered and not newest_first(results, self._oldest):
+            self.date_ordered = False
+            logger.warning("FindWork results are not in date order; reading every page")
+        stamps = [job["created_at"] for job in results if job.get("created_at")]
+        if stamps:
+            self._oldest = stamps[-1]
+        return self.date_ordered and page_already_seen(results, high_water_mark)
+
+    async def batches(self) -> AsyncIterator[List[JobInDB]]:
+        high_water_mark = None if self.full else await get_high_water_mark(self.key)
+        client = get_findwork_client()
+
+        first, fresh = await fetch_page(client, self.params, 1)
+        first_results = first.get("results", [])
+        yield self.page(first_results, fresh)
+
+        total = first.get("count")
+        page_size = len(first_results)
+        stop = self.seen(first_results, high_water_mark) or not first.get("next")
+        stop = stop or (self.date_ordered and not fresh)
+        if not (total and page_size) or stop:
+            return
+
+        last_page = min(self.max_pages, math.ceil(total / page_size))
+        page = 2
+        while page <= last_page and not stop:
+            wave = range(page, min(page + self.concurrency, last_page + 1))
+            outcomes = await asyncio.gather(*(fetch_page(client, self.params, p) for p in wave),
+                                            return_exceptions=True)
+            for outcome in outcomes:
+                if isinstance(outcome, UpstreamError):
+                    self.stats["failed_pages"] += 1
+                    logger.warning("FindWork page failed after retries: %s", outcome)
+                    continue
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                data, fresh = outcome
+                results = data.get("results", [])
+                yield self.page(results, fresh)
+                stop = self.seen(results, high_water_mark) or stop
+            page = wave.stop
+
+    async def finish(self):
+        if self.newest and not self.stats["failed_pages"]:
+            await set_high_water_mark(self.key, max(self.newest), self.stats)
+
+
+# -------------------------------------------------------------------
+# Feeds and files
+# -------------------------------------------------------------------
+def _first(item: Dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def generic_job(item: Dict[str, Any], source: str, default_company: Optional[str] = None) -> JobInDB:
+    """
+    Map a feed entry or file row onto JobInDB, accepting the usual field
+    names. `default_company` is for items naming no company; it must be
+    a real employer (a board dedicated to one company), since the
+    company is part of the cross-source dedupe_key.
+    """
+    role = _first(item, "role", "title", "position")
+    company = _first(item, "company_name", "company", "hiring_organization", "author")
+    if isinstance(company, dict):
+        company = company.get("name")
+    if isinstance(role, str) and " at " in role:
+        # RSS boards commonly title items "Role at Company"
+        head, tail = (part.strip() for part in role.rsplit(" at ", 1))
+        if not company or tail == company:
+            role, company = head, tail
+    location = _first(item, "location", "candidate_required_location", "job_location")
+    remote = item.get("remote")
+    if isinstance(remote, str):
+        remote = remote.strip().lower() in ("1", "true", "yes")
+    elif remote is None and isinstance(location, str):
+        remote = "remote" in location.lower()
+    url = _first(item, "url", "link", "apply_url")
+    job_id = _first(item, "id", "guid")
+    if job_id is None:
+        basis = url or f"{role}|{company}|{location}"
+        job_id = hashlib.blake2b(str(basis).encode("utf-8"), digest_size=8).hexdigest()
+    return JobInDB(
+        id=str(job_id),
+        source=source,
+        role=role,
+        company_name=company or default_company,
+        location=location,
+        remote=remote,
+        description=_first(item, "description", "content_html", "content_text", "content", "summary"),
+        url=url,
+        date_posted=parse_date(_first(item, "date_posted", "created_at", "date_published",
+                                      "published", "pubDate", "updated", "date")),
+        last_date=parse_date(_first(item, "last_date", "deadline", "valid_through", "validThrough")),
+        raw=item,
+    )
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def xml_items(body: bytes) -> List[Dict[str, Any]]:
+    """RSS <item>s or Atom <entry>s as flat dicts keyed by child tag."""
+    root = XML.fromstring(body)
+    items = []
+    for element in root.iter():
+        name = _local(element.tag)
+        if name in ("item", "entry"):
+            fields: Dict[str, Any] = {}
+            for child in element:
+                key = _local(child.tag)
+                if key == "link" and child.get("href"):
+                    value = child.get("href")
+                elif len(child) and not (child.text or "").strip():
+                    value = (child[0].text or "").strip()  # e.g. Atom <author><name>
+                else:
+                    value = (child.text or "").strip()
+                if value and key not in fields:
+                    fields[key] = value
+            items.append(fields)
+    return items
+
+
+def parse_feed(body: bytes) -> List[Dict[str, Any]]:
+    """A JSON feed (list, or object with items/jobs/results) or an RSS/Atom document."""
+    if body.lstrip()[:1] in (b"{", b"["):
+        data = orjson.loads(body)
+        if isinstance(data, list):
+            return data
+        return data.get("items") or data.get("jobs") or data.get("results") or []
+    return xml_items(body)
+
+
+def read_job_file(path: str) -> List[Dict[str, Any]]:
+    with open(path, "rb") as f:
+        body = f.read()
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".ndjson"):
+        return [orjson.loads(line) for line in body.splitlines() if line.strip()]
+    if suffix == ".csv":
+        return list(csv.DictReader(io.StringIO(body.decode("utf-8-sig"))))
+    return parse_feed(body)
+
+
+_feed_clients: Dict[str, UpstreamClient] = {}
+
+
+def feed_client(name: str) -> UpstreamClient:
+    """One client per feed, so each has its own rate limit, breaker and validators."""
+    if name not in _feed_clients:
+        _feed_clients[name] = UpstreamClient(
+            name,
+            rate=settings.INGEST_FEED_RATE_PER_SECOND,
+            burst=1,
+            max_retries=settings.FINDWORK_MAX_RETRIES,
+            backoff_base=settings.FINDWORK_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.FINDWORK_BACKOFF_MAX_SECONDS,
+            timeout=httpx.Timeout(
+                settings.FINDWORK_READ_TIMEOUT_SECONDS,
+                connect=settings.FINDWORK_CONNECT_TIMEOUT_SECONDS,
+            ),
+            max_connections=2,
+            failure_threshold=settings.FINDWORK_BREAKER_THRESHOLD,
+            reset_seconds=settings.FINDWORK_BREAKER_RESET_SECONDS,
+            http2=settings.FINDWORK_HTTP2,
+        )
+    return _feed_clients[name]
+
+
+async def close_source_clients():
+    for client in _feed_clients.values():
+        await client.aclose()
+    _feed_clients.clear()
+
+
+class FeedSource(JobSource):
+    """
+    Items without a company keep it unset unless `company` is given; the
+    feed's own <title> names the board, not the employer.
+    """
+
+    def __init__(self, url: str, name: Optional[str] = None, company: Optional[str] = None):
+        super().__init__(name or f"feed:{urlsplit(url).netloc}")
+        self.url = url
+        self.company = company
+        self.stats["not_modified"] = 0
+
+    async def batches(self) -> AsyncIterator[List[JobInDB]]:
+        body, fresh = await feed_client(self.name).get(self.url)
+        if not fresh:
+            self.stats["not_modified"] += 1
+            return
+        items = await asyncio.to_thread(parse_feed, body)
+        for chunk in chunks(items, settings.INGEST_BULK_SIZE):
+            yield self.normalize(chunk, lambda item: generic_job(item, self.name, self.company))
+
+
+class FileSource(JobSource):
+    """A local file; `company` as for FeedSource."""
+
+    def __init__(self, path: str, name: Optional[str] = None, company: Optional[str] = None):
+        super().__init__(name or f"file:{Path(path).stem}")
+        self.path = path
+        self.company = company
+
+    async def batches(self) -> AsyncIterator[List[JobInDB]]:
+        items = await asyncio.to_thread(read_job_file, self.path)
+        for chunk in chunks(items, settings.INGEST_BULK_SIZE):
+            yield self.normalize(chunk, lambda item: generic_job(item, self.name, self.company))
+
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+def _entries(value: str) -> Iterable[Tuple[Optional[str], str]]:
+    """"a,b=c" -> (None, "a"), ("b", "c"); a bare URL with "=" in its query stays whole."""
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, target = entry.partition("=")
+        if sep and "/" not in name and ":" not in name:
+            yield name.strip(), target.strip()
+        else:
+            yield None, entry
+
+
+def configured_sources() -> List[JobSource]:
+    sources: List[JobSource] = []
+    if settings.INGEST_FINDWORK:
+        sources.append(FindWorkSource())
+    for name, url in _entries(settings.INGEST_FEED_URLS):
+        sources.append(FeedSource(url, name))
+    for name, path in _entries(settings.INGEST_FILE_PATHS):
+        sources.append(FileSource(path, name))
+
+    # Names prefix job ids, so two sources may not share one
+    unique: Dict[str, JobSource] = {}
+    for source in sources:
+        if source.name in unique:
+            logger.warning("Skipping ingest source %s: name already in use; give it a name=", source.name)
+            continue
+        unique[source.name] = source
+    return list(unique.values())
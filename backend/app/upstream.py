@@ -0,0 +1,329 @@
+"""
+Resilient client for third-party JSON APIs (FindWork).
+
+- Token bucket: at most `rate` requests/second with bursts of `burst`.
+  A 429's Retry-After or an exhausted X-RateLimit-Remaining pauses the
+  bucket for every caller, not just the request that saw it.
+- Retries: 429, 5xx and transport errors/timeouts are retried with
+  full-jitter exponential backoff; other 4xx fail at once.
+- Circuit breaker: after `failure_threshold` consecutive failures calls
+  fail fast for `reset_seconds`, then a single trial request decides
+  whether to close it again. A 429 is no verdict either way: the
+  upstream is up but busy, so a throttled (or cancelled) trial just
+  hands the trial to the next call.
+- Conditional requests: ETag / Last-Modified validators are kept per URL
+  and params; a 304 returns the previous body without re-downloading it.
+- HTTP/2 with connection reuse when the `h2` package is installed.
+"""
+import asyncio
+import email.utils
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from .cache import TTLCache
+from .logs import get_logger
+from .metrics import (
+    UPSTREAM_BYTES, UPSTREAM_CIRCUIT, UPSTREAM_LATENCY, UPSTREAM_NOT_MODIFIED,
+    UPSTREAM_RETRIES, UPSTREAM_THROTTLED_SECONDS,
+)
+
+try:
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+# -------------------------------------------------------------------
+# Rate limiting
+# -------------------------------------------------------------------
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> float:
+        """Take one token, waiting as needed; returns the seconds waited."""
+        waited = 0.0
+        # Waiters queue on the lock, so tokens are handed out in order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    delay = (1 - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+# -------------------------------------------------------------------
+# Circuit breaker
+# -------------------------------------------------------------------
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._trial = 0
+        UPSTREAM_CIRCUIT.labels(name).set(self.state)
+
+    def _set(self, state: int):
+        if state != self.state:
+            logger.warning("Circuit for %s is now %s", self.name, ("closed", "open", "half-open")[state])
+        self.state = state
+        UPSTREAM_CIRCUIT.labels(self.name).set(state)
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self._set(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            self._trial += 1
+        return True
+
+    def trial(self) -> Optional[int]:
+        """Id of the trial a caller just got from allow(), None outside half-open."""
+        return self._trial if self.state == self.HALF_OPEN else None
+
+    def release(self, trial: Optional[int]):
+        """
+        End `trial` without a verdict; the next call becomes the trial.
+        A no-op once success() or failure() has settled it, so callers
+        can release on every exit path.
+        """
+        if trial is not None and self._trial_running and trial == self._trial:
+            self._trial_running = False
+
+    def success(self):
+        self._trial_running = False
+        self.failures = 0
+        self._set(self.CLOSED)
+
+    def failure(self):
+        self._trial_running = False
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set(self.OPEN)
+
+
+# -------------------------------------------------------------------
+# Client
+# -------------------------------------------------------------------
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds; it may be a number or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class UpstreamClient:
+    def __init__(
+        self,
+        name: str,
+        headers: Optional[Dict[str, str]] = None,
+        rate: float = 5.0,
+        burst: int = 5,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: Optional[httpx.Timeout] = None,
+        max_connections: int = 10,
+        failure_threshold: int = 5,
+        reset_seconds: float = 60.0,
+        http2: bool = True,
+        conditional: bool = True,
+    ):
+        self.name = name
+        self.headers = headers or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout or httpx.Timeout(20.0, connect=5.0)
+        self.max_connections = max_connections
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_seconds)
+        # url+params -> validators and last body; bounded, like the other caches
+        self.validators = TTLCache(f"upstream:{name}", max_entries=512, ttl_seconds=86400) if conditional else None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _observe_rate_limit(self, resp: httpx.Response):
+        remaining = resp.headers.get("x-ratelimit-remaining")
+        reset = resp.headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining_count, reset_value = int(remaining), float(reset)
+        except ValueError:
+            return
+        if remaining_count > 0:
+            return
+        # Either seconds until reset or an epoch timestamp
+        delay = reset_value - time.time() if reset_value > 1e9 else reset_value
+        if delay > 0:
+            self.bucket.pause(min(delay, self.backoff_max))
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, bool]:
+        """GET `url` and decode JSON; see get()."""
+        return await self.get(url, params, decode=lambda resp: resp.json())
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        decode: Optional[Callable[[httpx.Response], Any]] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        GET `url`, retrying per the policy above, and return the body as
+        `decode(response)` (raw bytes without one).
+
+        Returns (data, fresh); fresh is False when the server answered 304
+        and `data` is the body stored from the previous response.
+        """
+        params = params or {}
+        key = (url, tuple(sorted(params.items())))
+        cached = self.validators.get(key) if self.validators is not None else None
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"{self.name} circuit is open")
+
+            trial = self.breaker.trial()
+            try:
+                waited = await self.bucket.acquire()
+                if waited:
+                    UPSTREAM_THROTTLED_SECONDS.labels(self.name).inc(waited)
+
+                started = time.perf_counter()
+                try:
+                    resp = await self.client.get(url, params=params, headers=headers)
+                except httpx.TransportError as e:
+                    UPSTREAM_LATENCY.labels(self.name, "error").observe(time.perf_counter() - started)
+                    self.breaker.failure()
+                    if last_attempt:
+                        raise UpstreamError(f"{self.name} request failed: {type(e).__name__}: {e}") from e
+                    UPSTREAM_RETRIES.labels(self.name, type(e).__name__).inc()
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+
+                UPSTREAM_LATENCY.labels(self.name, str(resp.status_code)).observe(time.perf_counter() - started)
+                UPSTREAM_BYTES.labels(self.name).observe(len(resp.content))
+                self._observe_rate_limit(resp)
+
+                if resp.status_code == 304 and cached:
+                    self.breaker.success()
+                    UPSTREAM_NOT_MODIFIED.labels(self.name).inc()
+                    return cached["data"], False
+
+                if resp.is_success:
+                    self.breaker.success()
+                    data = decode(resp) if decode else resp.content
+                    if self.validators is not None and (resp.headers.get("etag") or resp.headers.get("last-modified")):
+                        self.validators.set(key, {
+                            "etag": resp.headers.get("etag"),
+                            "last_modified": resp.headers.get("last-modified"),
+                            "data": data,
+                        })
+                    return data, True
+
+                if resp.status_code not in RETRY_STATUSES:
+                    # The upstream is up and answered; the request itself is wrong
+                    self.breaker.success()
+                    raise UpstreamError(f"{self.name} returned {resp.status_code}", resp.status_code)
+
+                retry_after = retry_after_seconds(resp.headers.get("retry-after"))
+                if resp.status_code == 429:
+                    # Throttling is not an outage; slow every caller down instead
+                    delay = max(retry_after or 0.0, self._backoff(attempt))
+                    self.bucket.pause(delay)
+                else:
+                    self.breaker.failure()
+                    delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if last_attempt:
+                    raise UpstreamError(f"{self.name} returned {resp.status_code} after {attempt + 1} attempts",
+                                        resp.status_code)
+                UPSTREAM_RETRIES.labels(self.name, str(resp.status_code)).inc()
+                await asyncio.sleep(min(delay, self.backoff_max))
+            finally:
+                # A throttled, cancelled or otherwise unsettled trial must not keep the circuit half-open
+                self.breaker.release(trial)
+
+        raise UpstreamError(f"{self.name} retries exhausted")  # not reached
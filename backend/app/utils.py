@@ -1,10 +1,24 @@
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 from .config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool runs hashes in parallel
+# without blocking the event loop
+_password_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_WORKERS,
+    thread_name_prefix="password"
+)
+_password_in_flight = 0
+
+
+class PasswordWorkSaturated(Exception):
+    """Raised when the password pool and its queue are both full."""
+
 def hash_password(password: str):
     password = password[:72]   # bcrypt limit
     return pwd_context.hash(password)
@@ -13,15 +27,54 @@ def hash_password(password: str):
 def verify_password(plain, hashed):
     return pwd_context.verify(plain, hashed)
 
-def create_access_token(subject: str, expires_delta: timedelta = None):
+async def _run_password_work(fn, *args):
+    global _password_in_flight
+    if _password_in_flight >= settings.PASSWORD_WORKERS + settings.PASSWORD_QUEUE_LIMIT:
+        raise PasswordWorkSaturated()
+    _password_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_pool, fn, *args)
+    finally:
+        _password_in_flight -= 1
+
+async def hash_password_async(password: str):
+    return await _run_password_work(hash_password, password)
+
+async def verify_and_update_password_async(plain, hashed):
+    """(valid, new_hash); new_hash is set when the stored hash is deprecated."""
+    return await _run_password_work(pwd_context.verify_and_update, plain[:72], hashed)
+
+def password_pool_stats():
+    return {
+        "workers": settings.PASSWORD_WORKERS,
+        "queue_limit": settings.PASSWORD_QUEUE_LIMIT,
+        "in_flight": _password_in_flight,
+    }
+
+def shutdown_password_pool():
+    _password_pool.shutdown(wait=False)
+
+def create_access_token(subject: str, expires_delta: timedelta = None, claims: dict = None):
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
-def decode_token(token: str):
+def decode_token_claims(token: str, audience: str = None):
+    """
+    Verified claims, or None. Tokens issued for an audience (e.g. stream
+    tickets) only decode when that audience is asked for.
+    """
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload.get("sub")
+        claims = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM], audience=audience)
     except Exception:
         return None
+    # jose lets a token without "aud" through for any audience
+    if audience is not None and claims.get("aud") != audience:
+        return None
+    return claims
+
+def decode_token(token: str):
+    payload = decode_token_claims(token)
+    return payload.get("sub") if payload else None
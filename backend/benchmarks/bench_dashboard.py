@@ -0,0 +1,152 @@
+"""
+Dashboard load: the four requests the page used to make (/apply/count,
+/apply/list, /applications/, /recommended-jobs, concurrently) vs one
+GET /dashboard/summary.
+
+    python -m benchmarks.bench_dashboard --saved 150 --applications 40 --mongo-uri mongodb://localhost:27017
+
+Needs a real mongod (5.0+): mongomock does not implement $lookup
+sub-pipelines, which the summary uses to join card fields only.
+
+Drives the app in-process (httpx ASGITransport). Reports latency and
+Mongo round trips cold (principal, saved-id and recommendation caches
+cleared) and warm, and checks the summary agrees with the fan-out.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from bson import ObjectId
+
+from app import auth, ingest, matching
+from app.config import settings
+from app.main import app
+from app.cache import registered_caches
+
+from .common import WORDS, CountingCollection, bind_app_collections, fake_findwork_job, make_database, percentiles
+
+FAN_OUT = ["/apply/count", "/apply/list", "/applications/", "/recommended-jobs"]
+
+
+def count_app_collections():
+    """Wrap every app module's *_col global in one shared counter per collection."""
+    import importlib
+    import pkgutil
+
+    import app as app_package
+
+    counters = {}
+    for info in pkgutil.iter_modules(app_package.__path__):
+        if info.name == "main":
+            continue
+        module = importlib.import_module(f"app.{info.name}")
+        for attr in list(vars(module)):
+            if attr.endswith("_col"):
+                col = getattr(module, attr)
+                col = col.col if isinstance(col, CountingCollection) else col
+                counters.setdefault(attr, CountingCollection(col))
+                setattr(module, attr, counters[attr])
+    return counters
+
+
+async def seed(db, args, rng):
+    for name in ("jobs", "users", "apply_later", "applications", "ingest_state"):
+        await db[name].drop()
+    today = datetime.utcnow()
+    docs = []
+    for i in range(1, args.jobs + 1):
+        item = fake_findwork_job(i, rng)
+        if rng.random() < 0.2:
+            item["last_date"] = (today + timedelta(days=rng.randint(0, 14))).date().isoformat()
+        docs.append(ingest.build_job_doc(item))
+    await db.jobs.insert_many(docs)
+
+    uid = ObjectId()
+    await db.users.insert_one({"_id": uid, "email": "bench@example.com", "name": "Bench",
+                               "skills": rng.sample(WORDS, 4)})
+    saved = rng.sample(range(1, args.jobs + 1), args.saved)
+    await db.apply_later.insert_many([{"user_id": str(uid), "job_id": str(i), "saved_at": datetime.utcnow(),
+                                       "status": "pending", "user_email": "bench@example.com"} for i in saved])
+    statuses = ["pending", "applied", "interview", "rejected", "offer"]
+    await db.applications.insert_many([
+        {"user_id": str(uid), "job_id": str(rng.randint(1, args.jobs)), "status": rng.choice(statuses),
+         "applied_date": datetime.utcnow(), "created_at": datetime.utcnow()}
+        for _ in range(args.applications)
+    ])
+    return str(uid)
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    bind_app_collections(db)
+    rng = random.Random(11)
+    user_id = await seed(db, args, rng)
+    settings.JWT_SECRET = settings.JWT_SECRET or "bench-secret"
+    token = auth.create_access_token(user_id, claims={"email": "bench@example.com"})
+    headers = {"Authorization": f"Bearer {token}"}
+    await matching.job_matrix.sync(force=True)
+    counters = count_app_collections()
+
+    def trips():
+        total = sum(c.calls for c in counters.values())
+        for c in counters.values():
+            c.calls = 0
+        return total
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def fan_out():
+            responses = await asyncio.gather(*(client.get(path, headers=headers) for path in FAN_OUT))
+            return [r.json() for r in responses]
+
+        async def summary():
+            return (await client.get("/dashboard/summary", headers=headers)).json()
+
+        report = {}
+        for name, fn in (("fan_out", fan_out), ("summary", summary)):
+            for cold in (True, False):
+                samples, queries, body = [], [], None
+                for _ in range(args.repeat):
+                    if cold:
+                        for cache in registered_caches():
+                            cache.clear()
+                    trips()
+                    started = time.perf_counter()
+                    body = await fn()
+                    samples.append((time.perf_counter() - started) * 1000)
+                    queries.append(trips())
+                report[f"{name}_{'cold' if cold else 'warm'}"] = {
+                    "http_requests": len(FAN_OUT) if name == "fan_out" else 1,
+                    "mongo_round_trips": max(queries),
+                    "latency_ms": percentiles(samples),
+                }
+                if name == "fan_out":
+                    count, saved_list, applications, recommended = body
+                else:
+                    summary_body = body
+
+    report["agrees"] = {
+        "saved_count": summary_body["saved_count"] == count["count"] == saved_list["count"],
+        "applications": summary_body["applications"]["total"] == len(applications),
+        "recommended": [j["job_id"] for j in summary_body["recommended"]] == [j["job_id"] for j in recommended],
+        "upcoming_deadlines": summary_body["deadlines"]["upcoming_count"],
+        "urgent_deadlines": summary_body["deadlines"]["urgent_count"],
+    }
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--saved", type=int, default=150)
+    parser.add_argument("--applications", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--mongo-uri", required=True)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+/jobs/export throughput and memory.
+
+    python -m benchmarks.bench_export --jobs 1000000 --mongo-uri mongodb://localhost:27017
+
+Seeds N jobs, then consumes export_chunks() directly (no HTTP buffering
+in between) for each format, reporting rows/sec and how far RSS rose
+above its level when the export started. With mongomock the catalog
+itself lives in this process, so use a real server for the 1M run.
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import threading
+import time
+
+from app import export, hydration, ingest
+
+from .common import fake_findwork_job, make_database
+
+
+def current_rss() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RSSSampler(threading.Thread):
+    def __init__(self, interval: float = 0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_rss = current_rss()
+        self.peak = self.start_rss
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak = max(self.peak, current_rss())
+            time.sleep(self.interval)
+
+    def stop(self) -> int:
+        self._done.set()
+        self.join()
+        return self.peak - self.start_rss
+
+
+async def seed(db, n: int, chunk: int = 5000):
+    await db.jobs.drop()
+    rng = random.Random(17)
+    for start in range(0, n, chunk):
+        docs = [ingest.build_job_doc(fake_findwork_job(i, rng)) for i in range(start + 1, min(n, start + chunk) + 1)]
+        await db.jobs.insert_many(docs)
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    hydration.jobs_col = db.jobs
+    if not args.skip_seed:
+        started = time.perf_counter()
+        await seed(db, args.jobs)
+        print(f"Seeded {args.jobs} jobs in {time.perf_counter() - started:.1f}s")
+
+    report = {}
+    for fmt, profile, gzip in (("ndjson", "card", False), ("ndjson", "card", True),
+                               ("csv", "card", False), ("ndjson", "full", False)):
+        name = f"{fmt}:{profile}" + (":gzip" if gzip else "")
+        sampler = RSSSampler()
+        sampler.start()
+        started = time.perf_counter()
+        size = rows = 0
+        async for chunk in export.export_chunks({}, fmt, profile, args.batch_size, compress=gzip, database=db):
+            size += len(chunk)
+            if not gzip:
+                rows += chunk.count(b"\n")
+        elapsed = time.perf_counter() - started
+        growth = sampler.stop()
+        if gzip or fmt == "csv":
+            rows = args.jobs
+        report[name] = {
+            "rows": rows,
+            "seconds": round(elapsed, 2),
+            "rows_per_sec": round(rows / elapsed),
+            "mb": round(size / 1e6, 1),
+            "rss_growth_mb": round(growth / 1e6, 1),
+        }
+        print(f"{name}: {json.dumps(report[name])}")
+
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
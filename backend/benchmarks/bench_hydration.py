@@ -0,0 +1,96 @@
+"""
+Apply Later list hydration: per-item find_one loop vs one batched query.
+
+    python -m benchmarks.bench_hydration --saved 100,1000 [--mongo-uri ...]
+
+Reports latency and Mongo round trips for a user with N saved jobs. With
+mongomock there is no network, so multiply the round-trip count by your
+real RTT to estimate the difference against Atlas.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from app import hydration, ingest
+
+from .common import fake_findwork_job, make_database, percentiles
+
+
+async def legacy_hydrate(jobs_col, items):
+    """The old list_apply_later loop: find_one by job_id, then by _id, then a linear scan."""
+    jobs, trips = [], 0
+    job_ids = [item["job_id"] for item in items]
+    for job_id in job_ids:
+        job = await jobs_col.find_one({"job_id": job_id})
+        trips += 1
+        if not job:
+            try:
+                job = await jobs_col.find_one({"_id": ObjectId(job_id)})
+                trips += 1
+            except Exception:
+                job = None
+        if job:
+            saved_item = next((item for item in items if item["job_id"] == job_id), None)
+            job["saved_at"] = saved_item["saved_at"] if saved_item else None
+            jobs.append(job)
+    return jobs, trips
+
+
+async def batched_hydrate(items):
+    found = await hydration.fetch_jobs_by_ids(item["job_id"] for item in items)
+    jobs = []
+    for item in items:
+        job = found.get(item["job_id"])
+        if job:
+            job["saved_at"] = item["saved_at"]
+            jobs.append(job)
+    return jobs, 1
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    hydration.jobs_col = db.jobs
+    rng = random.Random(5)
+    sizes = [int(s) for s in args.saved.split(",")]
+
+    await db.jobs.drop()
+    docs = [ingest.build_job_doc(fake_findwork_job(i, rng)) for i in range(1, max(sizes) * 2 + 1)]
+    await db.jobs.insert_many(docs)
+    await db.jobs.create_index("job_id", unique=True)
+    inserted = [d async for d in db.jobs.find({}, {"job_id": 1})]
+
+    report = {}
+    for size in sizes:
+        picks = rng.sample(inserted, size)
+        # A tenth of old saves reference the Mongo _id instead of job_id
+        items = [{"job_id": str(d["_id"]) if i % 10 == 0 else d["job_id"], "saved_at": datetime.utcnow()}
+                 for i, d in enumerate(picks)]
+        result = {}
+        for name, fn in (("legacy", lambda: legacy_hydrate(db.jobs, items)), ("batched", lambda: batched_hydrate(items))):
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                jobs, trips = await fn()
+                samples.append((time.perf_counter() - started) * 1000)
+            result[name] = {"jobs": len(jobs), "round_trips": trips, "latency_ms": percentiles(samples)}
+        report[size] = result
+        print(f"{size} saved: {json.dumps(result)}")
+
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--saved", default="100,1000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
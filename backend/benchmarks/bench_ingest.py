@@ -0,0 +1,80 @@
+"""
+FindWork ingestion throughput against a local mock server.
+
+    python -m benchmarks.bench_ingest --jobs 5000 --latency-ms 50
+
+Compares the legacy path (serial pages, one update_one per job) with
+app.ingest.ingest_findwork (concurrent pages, one bulk_write per page),
+then re-runs the pipeline over the unchanged catalog to show skipped writes.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from app import ingest
+from app.config import settings
+
+from .common import MockFindWork, bind_app_collections, make_database
+
+
+async def legacy_ingest(col, max_pages: int) -> int:
+    written = 0
+    for page in range(1, max_pages + 1):
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            resp = await client.get(settings.FINDWORK_API_URL, params={"page": page})
+            resp.raise_for_status()
+            data = resp.json()
+        for job in data.get("results", []):
+            job_doc = ingest.build_job_doc(job)
+            await col.update_one({"job_id": job_doc["job_id"]}, {"$set": job_doc}, upsert=True)
+            written += 1
+        if not data.get("next"):
+            break
+    return written
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    max_pages = -(-args.jobs // args.page_size)
+    results = {}
+
+    with MockFindWork(args.jobs, page_size=args.page_size, latency_ms=args.latency_ms) as server:
+        settings.FINDWORK_API_URL = server.url
+
+        await db.jobs.drop()
+        started = time.perf_counter()
+        written = await legacy_ingest(db.jobs, max_pages)
+        elapsed = time.perf_counter() - started
+        results["legacy"] = {"jobs": written, "seconds": round(elapsed, 3),
+                             "jobs_per_sec": round(written / elapsed, 1)}
+
+        await db.jobs.drop()
+        await db.ingest_state.drop()
+        bind_app_collections(db)
+        stats = await ingest.ingest_findwork(max_pages=max_pages, concurrency=args.concurrency)
+        await ingest.close_http_client()
+        results["pipeline"] = stats
+
+        # Second run over an unchanged catalog: every job is skipped.
+        stats = await ingest.ingest_findwork(max_pages=max_pages, concurrency=args.concurrency, full=True)
+        await ingest.close_http_client()
+        results["pipeline_unchanged"] = stats
+
+    print(json.dumps(results, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated upstream latency per page")
+    parser.add_argument("--concurrency", type=int, default=settings.FINDWORK_CONCURRENCY)
+    parser.add_argument("--mongo-uri", default=None, help="use a real mongod instead of mongomock")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+"""
+End-to-end load test: seeded data, a local FindWork stand-in and a
+weighted mix of API calls at a fixed concurrency.
+
+    python -m benchmarks.bench_load --users 200 --jobs 5000 --concurrency 32 --duration 30 \
+        [--mix jobs=25,search=10,login=5,...] [--mongo-uri mongodb://localhost:27017] \
+        [--base-url http://127.0.0.1:8000] [--out load.json] [--baseline previous.json]
+
+Setup:
+  jobs        ingested by app.ingest from MockFindWork, so cards, search
+              tokens and dedupe keys are the ones production writes
+  users       --users accounts (password "loadtest1"), each with
+              --saved-per-user Apply Later rows and
+              --applications-per-user applications
+
+By default the app runs in-process (httpx ASGITransport) on mongomock.
+--mongo-uri seeds a real mongod instead (database "workscope", indexes
+built); add --base-url to send the load to a server started against it:
+
+    MONGODB_URI=mongodb://localhost:27017 MONGODB_TLS=false JWT_SECRET=... \
+        uvicorn app.main:app --workers 4
+
+Tokens are minted here, so that server needs the same JWT_SECRET.
+--findwork-port keeps the stand-in on a fixed port for its
+FINDWORK_API_URL.
+
+Each of --concurrency virtual users loops: pick a scenario by weight,
+run it as a random seeded user, record latency and status. Requests
+during the first --warmup seconds are not recorded. The run ends after
+--duration seconds or --requests requests.
+
+The report (stdout, and --out) is JSON: git commit, parameters, seed
+sizes, then overall and per-scenario throughput, p50/p95/p99 latency
+and status counts. --baseline compares it with an earlier report and
+exits 1 when a scenario's p95 grew, or overall throughput fell, by more
+than --tolerance, or when errors appear (see compare()).
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from bson import ObjectId
+
+from app import auth, indexes, ingest, matching, utils
+from app.config import settings
+from app.logs import configure_logging
+
+from .common import WORDS, MockFindWork, bind_app_collections, make_database, percentiles
+
+PASSWORD = "loadtest1"
+STATUSES = ["pending", "applied", "interview", "rejected", "offer"]
+
+
+# -------------------------------------------------------------------
+# Seeding
+# -------------------------------------------------------------------
+class Account:
+    def __init__(self, user_id: str, email: str, saved: List[str]):
+        self.user_id = user_id
+        self.email = email
+        self.saved = saved
+        self.headers = {"Authorization": "Bearer " + auth.create_access_token(
+            user_id, claims={"email": email, "name": None, "sv": 0})}
+
+
+async def seed(db, args, findwork: MockFindWork, rng: random.Random) -> Dict[str, Any]:
+    started = time.perf_counter()
+    for name in ("jobs", "users", "apply_later", "applications", "ingest_state", "notifications"):
+        await db[name].drop()
+    await indexes.ensure_indexes(db)
+
+    settings.FINDWORK_API_URL = findwork.url
+    settings.FINDWORK_RATE_PER_SECOND = 1000
+    await ingest.ingest_findwork(max_pages=-(-args.jobs // findwork.page_size), full=True)
+    job_ids = [str(job["id"]) for job in findwork.jobs]
+
+    # One hash for every account: bcrypt per user would dominate setup
+    hashed = utils.hash_password(PASSWORD)
+    users, saved, applications, accounts = [], [], [], []
+    for i in range(args.users):
+        uid, email = ObjectId(), f"load{i}@example.com"
+        users.append({"_id": uid, "email": email, "password": hashed, "name": f"Load {i}",
+                      "skills": rng.sample(WORDS, rng.randint(3, 6))})
+        picked = rng.sample(job_ids, min(args.saved_per_user, len(job_ids)))
+        saved.extend({"user_id": str(uid), "job_id": job_id, "saved_at": datetime.utcnow(),
+                      "status": "pending", "user_email": email} for job_id in picked)
+        applications.extend({"user_id": str(uid), "job_id": rng.choice(job_ids), "status": rng.choice(STATUSES),
+                             "applied_date": datetime.utcnow(), "created_at": datetime.utcnow()}
+                            for _ in range(args.applications_per_user))
+        accounts.append(Account(str(uid), email, picked))
+    for name, docs in (("users", users), ("apply_later", saved), ("applications", applications)):
+        for start in range(0, len(docs), 5000):
+            await db[name].insert_many(docs[start:start + 5000], ordered=False)
+
+    return {
+        "accounts": accounts,
+        "job_ids": job_ids,
+        "report": {
+            "jobs": await db.jobs.count_documents({}),
+            "users": len(users),
+            "saved": len(saved),
+            "applications": len(applications),
+            "seconds": round(time.perf_counter() - started, 3),
+        },
+    }
+
+
+# -------------------------------------------------------------------
+# Scenarios
+# -------------------------------------------------------------------
+class Session:
+    """What a scenario needs: the client, the seeded data and a random source."""
+
+    def __init__(self, client: httpx.AsyncClient, accounts: List[Account], job_ids: List[str],
+                 search_mode: str, rng: random.Random):
+        self.client = client
+        self.accounts = accounts
+        self.job_ids = job_ids
+        self.search_mode = search_mode
+        self.rng = rng
+
+    def account(self) -> Account:
+        return self.rng.choice(self.accounts)
+
+    def job_id(self) -> str:
+        return self.rng.choice(self.job_ids)
+
+
+async def list_jobs(s: Session):
+    if s.rng.random() < 0.5:
+        return await s.client.get("/jobs/", params={"limit": 20})
+    return await s.client.get("/jobs/", params={"limit": 20, "saved": "true"}, headers=s.account().headers)
+
+
+async def search_jobs(s: Session):
+    return await s.client.get("/jobs/", params={"q": s.rng.choice(WORDS), "mode": s.search_mode, "limit": 20})
+
+
+async def job_detail(s: Session):
+    return await s.client.get(f"/jobs/{s.job_id()}")
+
+
+async def recommended(s: Session):
+    return await s.client.get("/recommended-jobs", headers=s.account().headers)
+
+
+async def dashboard(s: Session):
+    return await s.client.get("/dashboard/summary", headers=s.account().headers)
+
+
+async def apply_list(s: Session):
+    return await s.client.get("/apply/list", headers=s.account().headers)
+
+
+async def apply_check(s: Session):
+    ids = s.rng.sample(s.job_ids, min(20, len(s.job_ids)))
+    return await s.client.post("/apply/check", json={"job_ids": ids}, headers=s.account().headers)
+
+
+async def apply_add(s: Session):
+    return await s.client.post(f"/apply/add/{s.job_id()}", headers=s.account().headers)
+
+
+async def apply_remove(s: Session):
+    account = s.account()
+    job_id = s.rng.choice(account.saved) if account.saved else s.job_id()
+    return await s.client.delete(f"/apply/remove/{job_id}", headers=account.headers)
+
+
+async def list_applications(s: Session):
+    return await s.client.get("/applications/", headers=s.account().headers)
+
+
+async def create_application(s: Session):
+    return await s.client.post("/applications/", params={"jobId": s.job_id()}, headers=s.account().headers)
+
+
+async def login(s: Session):
+    return await s.client.post("/auth/token", data={"username": s.account().email, "password": PASSWORD})
+
+
+SCENARIOS: Dict[str, Callable[[Session], Any]] = {
+    "jobs": list_jobs,
+    "search": search_jobs,
+    "job_detail": job_detail,
+    "recommended": recommended,
+    "dashboard": dashboard,
+    "apply_list": apply_list,
+    "apply_check": apply_check,
+    "apply_add": apply_add,
+    "apply_remove": apply_remove,
+    "applications": list_applications,
+    "apply": create_application,
+    "login": login,
+}
+DEFAULT_MIX = ("jobs=25,search=10,job_detail=10,recommended=10,dashboard=5,apply_list=8,apply_check=5,"
+               "apply_add=7,apply_remove=3,applications=7,apply=3,login=5")
+
+
+# Scenarios whose queries mongomock cannot run ($lookup sub-pipelines)
+NEEDS_MONGOD = {"dashboard"}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        name, _, weight = entry.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise SystemExit("--mix needs at least one scenario with a positive weight")
+    return mix
+
+
+# -------------------------------------------------------------------
+# Driving the load
+# -------------------------------------------------------------------
+class Recorder:
+    """Samples of requests started inside the recording window [start, end)."""
+
+    def __init__(self, start: float, end: float, limit: int = 0):
+        self.start = start
+        self.end = end
+        self.limit = limit
+        self.count = 0
+        self.last_finished = start
+        self.samples: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def done(self, now: float) -> bool:
+        return now >= self.end or bool(self.limit and self.count >= self.limit)
+
+    def claim(self, now: float) -> bool:
+        """Whether a request starting now is recorded; counts it against --requests."""
+        if now < self.start:
+            return False
+        self.count += 1
+        return True
+
+    def add(self, name: str, started: float, finished: float, status: str, ok: bool):
+        self.last_finished = max(self.last_finished, finished)
+        self.samples.setdefault(name, []).append((finished - started) * 1000)
+        counts = self.statuses.setdefault(name, {})
+        counts[status] = counts.get(status, 0) + 1
+        self.errors[name] = self.errors.get(name, 0) + (not ok)
+
+
+async def drive(client: httpx.AsyncClient, seeded: Dict[str, Any], mix: Dict[str, float],
+                args, search_mode: str) -> Dict[str, Any]:
+    start = time.perf_counter() + args.warmup
+    recorder = Recorder(start, start + args.duration, args.requests)
+    names, weights = list(mix), list(mix.values())
+
+    async def virtual_user(n: int):
+        session = Session(client, seeded["accounts"], seeded["job_ids"], search_mode, random.Random(args.seed + n))
+        while True:
+            # mongomock never suspends, so without this one virtual user would run the whole test
+            await asyncio.sleep(0)
+            if recorder.done(time.perf_counter()):
+                return
+            name = session.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            recorded = recorder.claim(started)
+            try:
+                response = await SCENARIOS[name](session)
+                status, ok = str(response.status_code), response.status_code < 400
+            except Exception as e:
+                status, ok = type(e).__name__, False
+            if recorded:
+                recorder.add(name, started, time.perf_counter(), status, ok)
+
+    await asyncio.gather(*(virtual_user(n) for n in range(args.concurrency)))
+    elapsed = recorder.last_finished - start
+
+    every = [ms for samples in recorder.samples.values() for ms in samples]
+    return {
+        "overall": {
+            "requests": len(every),
+            "errors": sum(recorder.errors.values()),
+            "seconds": round(elapsed, 3),
+            "throughput_rps": round(len(every) / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": percentiles(every),
+        },
+        "scenarios": {
+            name: {
+                "requests": len(samples),
+                "errors": recorder.errors.get(name, 0),
+                "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+                "statuses": recorder.statuses[name],
+                "latency_ms": percentiles(samples),
+            }
+            for name, samples in sorted(recorder.samples.items())
+        },
+    }
+
+
+# -------------------------------------------------------------------
+# Comparing runs
+# -------------------------------------------------------------------
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            min_requests: int = 20) -> Dict[str, Any]:
+    """
+    p95 and throughput ratios (this run / baseline) and the regressions
+    among them. Per-scenario throughput follows the random mix, so only
+    the overall figure is held to --tolerance; p95 is checked for every
+    scenario with at least `min_requests` samples in both runs.
+    """
+    rows, regressions = {}, []
+    current = {"overall": report["overall"], **report["scenarios"]}
+    previous = {"overall": baseline["overall"], **baseline.get("scenarios", {})}
+    for name in sorted(current.keys() & previous.keys()):
+        now, before = current[name], previous[name]
+        p95 = now["latency_ms"]["p95"] / before["latency_ms"]["p95"] if before["latency_ms"]["p95"] else None
+        rps = now["throughput_rps"] / before["throughput_rps"] if before["throughput_rps"] else None
+        rows[name] = {"p95_ratio": round(p95, 3) if p95 is not None else None,
+                      "throughput_ratio": round(rps, 3) if rps is not None else None,
+                      "errors": now["errors"], "baseline_errors": before["errors"]}
+        if p95 and p95 > 1 + tolerance and min(now["requests"], before["requests"]) >= min_requests:
+            regressions.append(f"{name}: p95 x{p95:.2f}")
+        if name == "overall" and rps is not None and rps < 1 - tolerance:
+            regressions.append(f"{name}: throughput x{rps:.2f}")
+        if now["errors"] > before["errors"]:
+            regressions.append(f"{name}: {now['errors']} errors (was {before['errors']})")
+    return {"baseline_commit": baseline.get("commit"), "tolerance": tolerance,
+            "scenarios": rows, "regressions": regressions}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> int:
+    from app.main import app
+
+    # After app.main has set up logging: stdout carries only the report
+    configure_logging(stream=sys.stderr)
+    mix = parse_mix(args.mix)
+    if not args.mongo_uri:
+        skipped = [name for name in mix if name in NEEDS_MONGOD]
+        for name in skipped:
+            del mix[name]
+        if skipped:
+            print(f"mongomock: skipping {', '.join(skipped)} (needs --mongo-uri)", file=sys.stderr)
+        if not any(mix.values()):
+            raise SystemExit("no scenario in --mix runs on mongomock")
+    db = make_database(args.mongo_uri, name="workscope" if args.base_url else "workscope_bench")
+    bind_app_collections(db)
+    settings.JWT_SECRET = settings.JWT_SECRET or "load-test-secret"
+    rng = random.Random(args.seed)
+
+    findwork = MockFindWork(args.jobs, seed=args.seed)
+    if args.findwork_port:
+        findwork.port = args.findwork_port
+    with findwork:
+        seeded = await seed(db, args, findwork, rng)
+        await ingest.close_http_client()
+        if args.base_url:
+            target = args.base_url
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout,
+                                       limits=httpx.Limits(max_connections=args.concurrency))
+        else:
+            await matching.job_matrix.sync(force=True)
+            target = "in-process"
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load",
+                                       timeout=args.timeout)
+        # mongomock has no $text; regex search is what it can serve
+        search_mode = "text" if args.mongo_uri else "regex"
+        async with client:
+            results = await drive(client, seeded, mix, args, search_mode)
+
+    report = {
+        "benchmark": "load",
+        "commit": git_commit(),
+        "started_at": datetime.utcnow().isoformat() + "Z",
+        "target": target,
+        "database": "mongod" if args.mongo_uri else "mongomock",
+        "params": {key: value for key, value in vars(args).items()
+                   if key not in ("out", "baseline", "mongo_uri", "base_url")},
+        "mix": mix,
+        "seed": seeded["report"],
+        **results,
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        status = 1 if report["comparison"]["regressions"] else 0
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--saved-per-user", type=int, default=20)
+    parser.add_argument("--applications-per-user", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users issuing requests back to back")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds recorded after the warmup")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many recorded requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="comma-separated scenario=weight")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--mongo-uri", default=None, help="use a real mongod instead of mongomock")
+    parser.add_argument("--base-url", default=None, help="load a running server instead of the in-process app")
+    parser.add_argument("--findwork-port", type=int, default=0)
+    parser.add_argument("--out", default=None, help="also write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    if args.base_url and not args.mongo_uri:
+        parser.error("--base-url needs --mongo-uri: the server must see the seeded data")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Tail latency of an unrelated endpoint during a login storm.
+
+    python -m benchmarks.bench_login_storm --logins 200 --concurrency 50
+
+Drives the FastAPI app in-process (httpx ASGITransport, mongomock users)
+and probes GET / while logins run, first with bcrypt inline on the event
+loop (the old behaviour), then through the bounded password pool.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from app import auth, utils
+from app.main import app
+
+from .common import make_database, percentiles
+
+
+async def inline_verify(plain, hashed):
+    return utils.pwd_context.verify_and_update(plain[:72], hashed)
+
+
+async def storm(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        done = asyncio.Event()
+        probes = []
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/")
+                probes.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        statuses = {}
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def login():
+            async with semaphore:
+                r = await client.post("/auth/token", data={"username": "storm@example.com", "password": "secret123"})
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "logins_per_sec": round(args.logins / elapsed, 1),
+        "statuses": statuses,
+        "probe_ms": percentiles(probes),
+    }
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    await db.users.drop()
+    await db.users.insert_one({
+        "email": "storm@example.com",
+        "password": utils.hash_password("secret123"),
+        "name": "Storm",
+        "skills": ["python"],
+    })
+    auth.users_col = db.users
+
+    original = auth.verify_and_update_password_async
+    auth.verify_and_update_password_async = inline_verify
+    inline = await storm(args)
+    auth.verify_and_update_password_async = original
+    pooled = await storm(args)
+    print(json.dumps({"inline": inline, "pooled": pooled, "pool": utils.password_pool_stats()}, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
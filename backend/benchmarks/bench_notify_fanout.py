@@ -0,0 +1,176 @@
+"""
+New-job -> user match fan-out: skill index vs scanning every user, the
+bulk notification write and push latency to an open stream.
+
+    python -m benchmarks.bench_notify_fanout --users 20000 --jobs 1000 --skills 800 [--mongo-uri ...]
+
+Reports:
+  index       building app.matching.SkillIndex from users
+  scan        the naive loop (every job x every user's skills) on a
+              sample of jobs, extrapolated; matches are compared with the
+              index on the same sample
+  fanout      JobMatchFanout.add over all new jobs: jobs x users / sec
+  write       JobMatchFanout.flush: digests written with insert_many
+  stream      time from flush to the event leaving an open stream
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from app import ingest, notifications
+from app.matching import SkillIndex, job_text, skill_index, text_terms
+
+from .common import WORDS, bind_app_collections, fake_findwork_job, make_database
+
+PHRASES = ["machine learning", "data engineering", "site reliability", "ci cd", "event driven"]
+FILLER = ["team", "remote", "senior", "build", "product", "customers", "growth", "scale", "ship", "own"]
+
+
+def skill_vocabulary(size, rng):
+    """WORDS and PHRASES plus made-up tool names, Zipf-weighted like real skill lists."""
+    vocabulary = WORDS + PHRASES
+    while len(vocabulary) < size:
+        vocabulary.append("".join(rng.choice("bcdfghklmnprstvz") + rng.choice("aeiou") for _ in range(3)))
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    return vocabulary, weights
+
+
+def pick(rng, vocabulary, weights, k):
+    picked = set()
+    while len(picked) < k:
+        picked.add(rng.choices(vocabulary, weights)[0])
+    return list(picked)
+
+
+def naive_matches(jobs, users, min_matched):
+    """Every user's skills checked against every job."""
+    pairs = set()
+    for job in jobs:
+        terms = text_terms(job_text(job))
+        for user_id, skills in users.items():
+            matched = [skill for skill in skills if text_terms(skill) <= terms]
+            if matched and len(matched) >= min(min_matched, len(skills)):
+                pairs.add((user_id, job["job_id"]))
+    return pairs
+
+
+class FakeRequest:
+    def __init__(self):
+        self.closed = False
+
+    async def is_disconnected(self):
+        return self.closed
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    bind_app_collections(db)
+    rng = random.Random(5)
+    for name in ("users", "notifications"):
+        await db[name].drop()
+
+    vocabulary, weights = skill_vocabulary(args.skills, rng)
+    users = {}
+    docs = []
+    for _ in range(args.users):
+        uid = ObjectId()
+        skills = pick(rng, vocabulary, weights, rng.randint(2, 8))
+        users[str(uid)] = [s.lower() for s in skills]
+        docs.append({"_id": uid, "email": f"{uid}@example.com", "skills": skills})
+    for start in range(0, len(docs), 5000):
+        await db.users.insert_many(docs[start:start + 5000])
+    jobs = []
+    for i in range(1, args.jobs + 1):
+        item = fake_findwork_job(1_000_000 + i, rng)
+        skills = pick(rng, vocabulary, weights, 12)
+        words = skills + [rng.choice(FILLER) for _ in range(60)]
+        rng.shuffle(words)
+        item.update(text=" ".join(skills), keywords=skills[:5], description="<p>" + " ".join(words) + "</p>")
+        jobs.append(ingest.build_job_doc(item))
+
+    report = {}
+    started = time.perf_counter()
+    await skill_index.sync(force=True)
+    report["index"] = {"users": len(skill_index), "skills": len(skill_index.users),
+                       "build_seconds": round(time.perf_counter() - started, 3)}
+
+    sample = jobs[:args.scan_sample]
+    started = time.perf_counter()
+    expected = naive_matches(sample, users, notifications.settings.NOTIFY_MIN_MATCHED_SKILLS)
+    scan_seconds = time.perf_counter() - started
+    check = notifications.JobMatchFanout()
+    check.max_jobs = len(sample)
+    check.add(sample)
+    found = {(check.user_ids[user], check.jobs[seq][0]) for user, seq in zip(check.best_users, check.best_seqs)}
+    report["scan"] = {
+        "sample_jobs": len(sample),
+        "seconds": round(scan_seconds, 3),
+        "job_users_per_sec": round(len(sample) * len(users) / scan_seconds),
+        "projected_seconds_for_all_jobs": round(scan_seconds * len(jobs) / len(sample), 1),
+        "matches": len(expected),
+        "index_agrees": found == expected,
+    }
+
+    fanout = notifications.JobMatchFanout()
+    started = time.perf_counter()
+    for start in range(0, len(jobs), args.batch):
+        await fanout.feed(jobs[start:start + args.batch])
+    add_seconds = time.perf_counter() - started
+    report["fanout"] = {
+        "jobs": len(jobs), "users": len(users),
+        "seconds": round(add_seconds, 3),
+        "job_users_per_sec": round(len(jobs) * len(users) / add_seconds),
+        "matches": fanout.stats["matches"],
+        "users_matched": int((fanout.counts > 0).sum()),
+        "speedup_vs_scan": round(report["scan"]["projected_seconds_for_all_jobs"] / add_seconds, 1),
+    }
+
+    # One open stream for a matched user, then the write
+    watched_at = int(fanout.counts.argmax())
+    watched = fanout.user_ids[watched_at]
+    request = FakeRequest()
+    stream = notifications.notification_events(request, watched, ObjectId.from_datetime(datetime.utcnow()))
+    await stream.__anext__()  # retry: line; the stream is now subscribed
+    received = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    result = await fanout.flush()
+    write_seconds = time.perf_counter() - started
+    event = await asyncio.wait_for(received, 30)
+    push_ms = (time.perf_counter() - started) * 1000
+    request.closed = True
+    await stream.aclose()
+    report["write"] = {
+        "notifications": result["notifications"],
+        "seconds": round(write_seconds, 3),
+        "per_sec": round(result["notifications"] / write_seconds) if write_seconds else None,
+        "stored": await db.notifications.count_documents({}),
+    }
+    report["stream"] = {
+        "event_bytes": len(event),
+        "flush_to_event_ms": round(push_ms, 2),
+        "event_is_for_user": json.loads(event.split(b"data: ", 1)[1])["match_count"] == int(fanout.counts[watched_at]),
+        "open_streams_after_close": len(notifications.hub),
+    }
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--skills", type=int, default=800)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--scan-sample", type=int, default=20)
+    parser.add_argument("--mongo-uri", default=None, help="use a real mongod instead of mongomock")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Recommendation scoring latency for the in-process job matrix.
+
+    python -m benchmarks.bench_recommend --jobs 100000
+
+Builds app.matching.JobMatrix from synthetic jobs (no database needed)
+and times top-k scoring for random skill sets, from the column-major
+copy and from the rows alone (while that copy is being rebuilt).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from app import ingest
+from app.matching import JobMatrix
+
+from .common import WORDS, fake_findwork_job, percentiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=6)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    matrix = JobMatrix()
+    started = time.perf_counter()
+    for start in range(0, args.jobs, 5000):
+        docs = [ingest.build_job_doc(fake_findwork_job(i, rng))
+                for i in range(start + 1, min(start + 5000, args.jobs) + 1)]
+        matrix.upsert(docs)
+    build_seconds = time.perf_counter() - started
+
+    skill_sets = [rng.sample(WORDS, rng.randint(2, 8)) for _ in range(args.queries)]
+
+    def time_queries():
+        samples = []
+        for skills in skill_sets:
+            t0 = time.perf_counter()
+            matrix.top_k(skills, args.k)
+            samples.append((time.perf_counter() - t0) * 1000)
+        return percentiles(samples)
+
+    rows_only = time_queries()
+    started = time.perf_counter()
+    asyncio.run(matrix.reindex())  # as sync() and upsert_async() do after writing
+    reindex_seconds = time.perf_counter() - started
+
+    print(json.dumps({
+        "jobs": len(matrix),
+        "build_seconds": round(build_seconds, 2),
+        "reindex_seconds": round(reindex_seconds, 2),
+        "top_k_ms": time_queries(),
+        "top_k_ms_rows_only": rows_only,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+GET /jobs and GET /apply/list throughput: dicts through jsonable_encoder
+and stdlib json vs. pre-rendered card bytes spliced into the body.
+
+    python -m benchmarks.bench_responses [--limit 100] [--mongo-uri ...]
+
+Requests go through the FastAPI app in-process (httpx ASGITransport), so
+routing, dependencies and rendering are included but no network is. The
+legacy variants are the previous endpoint bodies mounted on the same app.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+
+import httpx
+from fastapi import APIRouter, Depends
+
+from app import apply_later, auth, hydration, ingest, jobs
+from app.main import app
+from app.pagination import JOB_LIST_SORT
+from app.serializers import job_projection, serialize_job
+
+from .common import fake_findwork_job, make_database, percentiles
+
+USER = {"id": "bench-user", "email": "bench@example.com", "name": "Bench", "skills_version": 0}
+
+legacy = APIRouter(prefix="/legacy")
+
+
+@legacy.get("/jobs")
+async def legacy_jobs(limit: int = 20):
+    docs = await jobs.jobs_col.find({}, job_projection("card")).sort(JOB_LIST_SORT).limit(limit).to_list(length=limit)
+    return [serialize_job(job, "card") for job in docs]
+
+
+@legacy.get("/apply/list")
+async def legacy_apply_list(limit: int = 100, user=Depends(auth.get_current_principal)):
+    items = await apply_later.apply_later_col.find({"user_id": user["id"]}).to_list(limit)
+    found = await hydration.fetch_jobs_by_ids((i["job_id"] for i in items), projection=job_projection("card"))
+    out = []
+    for item in items:
+        job = found.get(item["job_id"])
+        if job:
+            job = serialize_job(job, "card")
+            job["isSaved"] = True
+            job["saved_at"] = item["saved_at"].isoformat()
+            out.append(job)
+    return {"jobs": out, "count": len(out)}
+
+
+async def measure(client, path, repeat):
+    samples, size = [], 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        r = await client.get(path)
+        samples.append((time.perf_counter() - t0) * 1000)
+        r.raise_for_status()
+        size = len(r.content)
+    elapsed = time.perf_counter() - started
+    return {"bytes": size, "req_per_sec": round(repeat / elapsed, 1), "latency_ms": percentiles(samples)}
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    jobs.jobs_col = hydration.jobs_col = db.jobs
+    apply_later.apply_later_col = db.apply_later
+    app.include_router(legacy)
+    app.dependency_overrides[auth.get_current_principal] = lambda: USER
+
+    await db.jobs.drop()
+    await db.apply_later.drop()
+    rng = random.Random(13)
+    docs = [ingest.build_job_doc(fake_findwork_job(i, rng)) for i in range(1, args.jobs + 1)]
+    await db.jobs.insert_many(docs)
+    await db.apply_later.insert_many([
+        {"user_id": USER["id"], "job_id": d["job_id"], "saved_at": datetime.utcnow()}
+        for d in rng.sample(docs, args.limit)
+    ])
+
+    # Both paths must return the same jobs
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        fast = (await client.get(f"/jobs/?limit={args.limit}")).json()
+        slow = (await client.get(f"/legacy/jobs?limit={args.limit}")).json()
+        assert fast == slow, "spliced /jobs body differs from the legacy serializer"
+
+        report = {}
+        for name, path in (
+            ("jobs_legacy", f"/legacy/jobs?limit={args.limit}"),
+            ("jobs_fast", f"/jobs/?limit={args.limit}"),
+            ("apply_list_legacy", f"/legacy/apply/list?limit={args.limit}"),
+            ("apply_list_fast", f"/apply/list?limit={args.limit}"),
+        ):
+            report[name] = await measure(client, path, args.repeat)
+            print(f"{name}: {json.dumps(report[name])}")
+
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
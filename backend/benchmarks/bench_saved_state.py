@@ -0,0 +1,96 @@
+"""
+Saved-state lookups for a page of job cards: one /apply/check/{id} per
+card (the old lookup) vs app.apply_later.saved_status for the whole page.
+
+    python -m benchmarks.bench_saved_state --page 20 --saved 200 [--mongo-uri ...]
+
+Reports latency and Mongo round trips per page, cold (saved set not yet
+cached) and warm, and checks both paths agree.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from app import apply_later, hydration, ingest
+
+from .common import CountingCollection, bind_app_collections, fake_findwork_job, make_database, percentiles
+
+
+async def legacy_check(jobs_col, apply_later_col, user_id, job_id):
+    """The old GET /apply/check/{job_id} body."""
+    job = await jobs_col.find_one({"job_id": job_id})
+    if not job:
+        try:
+            job = await jobs_col.find_one({"_id": ObjectId(job_id)})
+        except Exception:
+            job = None
+    actual_job_id = job.get("job_id") or str(job["_id"]) if job else job_id
+    saved = await apply_later_col.find_one({"user_id": user_id, "job_id": actual_job_id})
+    return bool(saved)
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    bind_app_collections(db)
+    rng = random.Random(3)
+    await db.jobs.drop()
+    await db.apply_later.drop()
+    await db.jobs.insert_many([ingest.build_job_doc(fake_findwork_job(i, rng)) for i in range(1, args.jobs + 1)])
+
+    user_id = str(ObjectId())
+    saved = rng.sample(range(1, args.jobs + 1), args.saved)
+    await db.apply_later.insert_many([{"user_id": user_id, "job_id": str(i), "saved_at": datetime.utcnow(),
+                                       "status": "pending"} for i in saved])
+    page = [str(i) for i in rng.sample(range(1, args.jobs + 1), args.page - args.page // 4)]
+    page += [str(i) for i in saved[:args.page // 4]]
+
+    jobs_counter, apply_counter = CountingCollection(db.jobs), CountingCollection(db.apply_later)
+    hydration.jobs_col = jobs_counter
+    apply_later.apply_later_col = apply_counter
+
+    async def legacy():
+        return {job_id: await legacy_check(jobs_counter, apply_counter, user_id, job_id) for job_id in page}
+
+    async def batched():
+        return await apply_later.saved_status(user_id, page)
+
+    report = {}
+    expected = None
+    for name, fn, cold in (("per_card", legacy, False), ("batch_cold", batched, True), ("batch_warm", batched, False)):
+        samples, queries = [], []
+        for _ in range(args.repeat):
+            if cold:
+                apply_later.saved_ids_cache.clear()
+            jobs_counter.calls = apply_counter.calls = 0
+            started = time.perf_counter()
+            result = await fn()
+            samples.append((time.perf_counter() - started) * 1000)
+            queries.append(jobs_counter.calls + apply_counter.calls)
+        expected = expected or result
+        report[name] = {
+            "http_requests": len(page) if name == "per_card" else 1,
+            "mongo_queries": max(queries),
+            "latency_ms": percentiles(samples),
+            "saved_on_page": sum(result.values()),
+            "matches_per_card": result == expected,
+        }
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--page", type=int, default=20)
+    parser.add_argument("--saved", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--mongo-uri", default=None, help="use a real mongod instead of mongomock")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+GET /jobs keyword search latency: legacy $regex scan vs the text index.
+
+    python -m benchmarks.bench_search --mongo-uri mongodb://localhost:27017 \
+        --sizes 10000,100000,1000000
+
+Needs a real mongod: mongomock does not implement $text. For each catalog
+size the jobs collection is reseeded, indexes are built, and the same
+random queries are timed through both query builders.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+from app import indexes, ingest, search
+
+from .common import WORDS, fake_findwork_job, make_database, percentiles
+
+
+async def seed(col, size: int, batch: int = 5000):
+    await col.drop()
+    rng = random.Random(size)
+    for start in range(0, size, batch):
+        docs = [ingest.build_job_doc(fake_findwork_job(i, rng))
+                for i in range(start + 1, min(start + batch, size) + 1)]
+        await col.insert_many(docs, ordered=False)
+
+
+async def time_queries(col, queries, build, limit: int = 20):
+    samples = []
+    for q in queries:
+        query, projection, sort = build(q)
+        started = time.perf_counter()
+        cursor = col.find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        await cursor.limit(limit).to_list(length=limit)
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+
+def regex_query(q):
+    return {"title": {"$regex": re.escape(q), "$options": "i"}}, None, None
+
+
+def text_query(q):
+    return search.build_text_query(q, list(search.SEARCH_FIELDS))
+
+
+def prefix_query(q):
+    return search.build_text_query(q[:4], ["title", "company"], prefix=True)
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    rng = random.Random(1)
+    queries = [rng.choice(WORDS) for _ in range(args.queries)]
+    report = {}
+
+    for size in [int(s) for s in args.sizes.split(",")]:
+        await seed(db.jobs, size)
+        await indexes.ensure_indexes(db)
+        report[size] = {
+            "regex_ms": await time_queries(db.jobs, queries, regex_query),
+            "text_ms": await time_queries(db.jobs, queries, text_query),
+            "prefix_ms": await time_queries(db.jobs, queries, prefix_query),
+        }
+        print(f"{size} jobs: {json.dumps(report[size])}")
+
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-uri", required=True)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
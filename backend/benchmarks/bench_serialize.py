@@ -0,0 +1,73 @@
+"""
+Response size and serialization time per job profile for a 100-job page.
+
+    python -m benchmarks.bench_serialize [--mongo-uri ...]
+
+Loads a page with each profile's projection pushed down to the query and
+compares against the old behaviour (whole document, copied and walked
+by the recursive serialize_doc).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from bson import ObjectId
+
+from app import ingest
+from app.serializers import PROFILES, job_projection, serialize_job
+
+from .common import fake_findwork_job, make_database, percentiles
+
+
+def legacy_serialize(doc):
+    """The previous apply_later path: serialize_job copy, then serialize_doc."""
+    def walk(value):
+        if isinstance(value, list):
+            return [walk(v) for v in value]
+        if isinstance(value, dict):
+            return {k: str(v) if isinstance(v, ObjectId) else walk(v) for k, v in value.items()}
+        return value
+    job = dict(doc)
+    job["id"] = str(job["_id"])
+    job["_id"] = str(job["_id"])
+    return walk(job)
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    await db.jobs.drop()
+    rng = random.Random(11)
+    await db.jobs.insert_many([ingest.build_job_doc(fake_findwork_job(i, rng)) for i in range(1, args.page + 1)])
+
+    report = {}
+    variants = [("legacy", None, legacy_serialize)] + [
+        (name, job_projection(name), lambda d, n=name: serialize_job(d, n)) for name in PROFILES
+    ]
+    for name, projection, serialize in variants:
+        load, ser, size = [], [], 0
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            docs = await db.jobs.find({}, projection).to_list(length=args.page)
+            t1 = time.perf_counter()
+            page = [serialize(d) for d in docs]
+            t2 = time.perf_counter()
+            size = len(json.dumps(page, default=str).encode("utf-8"))
+            load.append((t1 - t0) * 1000)
+            ser.append((t2 - t1) * 1000)
+        report[name] = {"bytes": size, "load_ms": percentiles(load)["p50"], "serialize_ms": percentiles(ser)["p50"]}
+
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Multi-source ingestion: FindWork, an RSS feed, a JSON feed and a CSV file.
+
+    python -m benchmarks.bench_sources --jobs 3000 --feed-jobs 600
+
+A third of every feed/file reposts FindWork jobs under the same title,
+company and location. The sources are ingested one after another and
+then all at once through app.ingest.ingest_sources; both runs must end
+with no dedupe_key shared by jobs of two different sources.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from app import ingest
+from app.config import settings
+from app.sources import FeedSource, FileSource, FindWorkSource, close_source_clients
+
+from .common import MockFindWork, bind_app_collections, fake_findwork_job, make_database
+
+
+def feed_entries(findwork_jobs, count: int, offset: int, rng: random.Random):
+    """`count` entries; every third reposts a FindWork job, the rest are new."""
+    entries = []
+    for i in range(count):
+        if i % 3 == 0:
+            job = dict(rng.choice(findwork_jobs))
+        else:
+            job = fake_findwork_job(offset + i, rng)
+            job["company_name"] = f"Feed {job['company_name']} {offset}"
+        entries.append({
+            "id": f"{offset}-{i}",
+            "title": job["role"],
+            "company": job["company_name"],
+            "location": job["location"],
+            "url": f"https://boards.example.com/{offset}/{i}",
+            "description": job["description"],
+            "date_posted": job["created_at"],
+        })
+    return entries
+
+
+def render_rss(entries) -> bytes:
+    items = "".join(
+        f"<item><title>{escape(e['title'])} at {escape(e['company'])}</title>"
+        f"<link>{e['url']}</link><guid>{e['id']}</guid><location>{escape(e['location'])}</location>"
+        f"<description>{escape(e['description'])}</description>"
+        f"<pubDate>Mon, 05 Jan 2026 12:00:00 GMT</pubDate></item>"
+        for e in entries
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Board</title>{items}</channel></rss>'.encode()
+
+
+async def shared_keys(db) -> int:
+    """dedupe_keys held by jobs of more than one source (must be 0)."""
+    sources = {}
+    async for row in db.jobs.find({}, {"dedupe_key": 1, "source": 1}):
+        sources.setdefault(row["dedupe_key"], set()).add(row["source"])
+    return sum(1 for owners in sources.values() if len(owners) > 1)
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    bind_app_collections(db)
+    settings.FINDWORK_RATE_PER_SECOND = args.rate
+    rng = random.Random(11)
+    results = {}
+
+    with MockFindWork(args.jobs, latency_ms=args.latency_ms) as server, tempfile.TemporaryDirectory() as tmp:
+        settings.FINDWORK_API_URL = server.url
+        server.feed_latency = args.feed_latency_ms / 1000.0
+        server.feeds["jobs.rss"] = (render_rss(feed_entries(server.jobs, args.feed_jobs, 100000, rng)),
+                                    "application/rss+xml")
+        server.feeds["jobs.json"] = (json.dumps({"title": "JSON board", "items": feed_entries(
+            server.jobs, args.feed_jobs, 200000, rng)}).encode(), "application/json")
+        csv_path = Path(tmp) / "partner.csv"
+        rows = feed_entries(server.jobs, args.feed_jobs, 300000, rng)
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+        def sources():
+            return [
+                FindWorkSource(max_pages=-(-args.jobs // 100), full=True),
+                FeedSource(server.feed_url("jobs.rss"), "rss"),
+                FeedSource(server.feed_url("jobs.json"), "json"),
+                FileSource(str(csv_path), "partner"),
+            ]
+
+        for mode in ("serial", "concurrent"):
+            await db.jobs.drop()
+            await db.ingest_state.drop()
+            await ingest.close_http_client()
+            await close_source_clients()
+            started = time.perf_counter()
+            if mode == "serial":
+                runs = [await ingest.ingest_sources([source]) for source in sources()]
+                per_source = {name: stats for r in runs for name, stats in r["sources"].items()}
+            else:
+                per_source = (await ingest.ingest_sources(sources()))["sources"]
+            results[mode] = {
+                "seconds": round(time.perf_counter() - started, 3),
+                "jobs_in_db": await db.jobs.count_documents({}),
+                "keys_shared_across_sources": await shared_keys(db),
+                "sources": per_source,
+            }
+
+        # Nothing changed: FindWork and the feeds are fetched again, nothing is written
+        await ingest.close_http_client()
+        summary = await ingest.ingest_sources(sources())
+        results["rerun"] = {k: v for k, v in summary.items() if k != "sources"}
+
+    await ingest.close_http_client()
+    await close_source_clients()
+    print(json.dumps(results, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=3000)
+    parser.add_argument("--feed-jobs", type=int, default=600)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated FindWork latency per page")
+    parser.add_argument("--feed-latency-ms", type=float, default=1500.0, help="simulated feed response time")
+    parser.add_argument("--rate", type=float, default=20.0, help="FindWork requests per second")
+    parser.add_argument("--mongo-uri", default=None, help="use a real mongod instead of mongomock")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
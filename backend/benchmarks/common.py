@@ -0,0 +1,205 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run benchmarks from the backend/ directory, e.g.:
+
+    python -m benchmarks.bench_ingest --jobs 5000
+
+By default collections come from mongomock-motor so no server is needed;
+pass --mongo-uri to measure against a real mongod instead.
+"""
+import asyncio
+import random
+import socket
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+WORDS = [
+    "python", "react", "django", "fastapi", "golang", "rust", "kubernetes",
+    "aws", "postgres", "mongodb", "typescript", "java", "spring", "docker",
+    "terraform", "graphql", "redis", "kafka", "spark", "pandas", "vue",
+    "angular", "node", "swift", "kotlin", "flutter", "linux", "security",
+]
+ROLES = ["Backend Engineer", "Frontend Developer", "Data Engineer", "DevOps Engineer",
+         "Full Stack Developer", "ML Engineer", "Mobile Developer", "SRE"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka"]
+LOCATIONS = ["Berlin", "London", "New York", "Lahore", "Toronto", "Remote", "Paris"]
+
+
+def fake_findwork_job(i: int, rng: random.Random) -> Dict[str, Any]:
+    skills = rng.sample(WORDS, 5)
+    return {
+        "id": i,
+        "role": f"{rng.choice(ROLES)} ({skills[0]})",
+        "company_name": f"{rng.choice(COMPANIES)} {i % 97}",
+        "location": rng.choice(LOCATIONS),
+        "remote": rng.random() < 0.3,
+        "employment_type": "full time",
+        "url": f"https://example.com/jobs/{i}",
+        "text": " ".join(skills),
+        "description": "<p>" + " ".join(rng.choice(WORDS) for _ in range(120)) + "</p>",
+        "keywords": skills,
+        "created_at": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T12:00:00Z",
+        "logo": None,
+    }
+
+
+# -------------------------------------------------------------------
+# Local FindWork stand-in
+# -------------------------------------------------------------------
+class MockFindWork:
+    """A FindWork-compatible JSON API served by uvicorn on a background thread."""
+
+    def __init__(self, total_jobs: int, page_size: int = 100, latency_ms: float = 0.0, seed: int = 7,
+                 throttle_every: int = 0, retry_after: float = 0.2, error_rate: float = 0.0,
+                 etags: bool = False):
+        rng = random.Random(seed)
+        self.jobs = [fake_findwork_job(i, rng) for i in range(1, total_jobs + 1)]
+        self.jobs_by_date = sorted(self.jobs, key=lambda job: job["created_at"], reverse=True)
+        self.page_size = page_size
+        self.latency = latency_ms / 1000.0
+        # Fault injection: every Nth request gets a 429, a share get a 503
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.etags = etags
+        self._faults = random.Random(seed + 1)
+        self.requests = 0
+        self.responses: Dict[int, int] = {}
+        # name -> (body, media type), served at /feeds/<name> after `feed_latency`
+        self.feeds: Dict[str, Any] = {}
+        self.feed_latency = 0.0
+        self.port = _free_port()
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api/jobs/"
+
+    def _respond(self, response: Response) -> Response:
+        self.responses[response.status_code] = self.responses.get(response.status_code, 0) + 1
+        return response
+
+    async def _jobs(self, request: Request):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.throttle_every and self.requests % self.throttle_every == 0:
+            return self._respond(JSONResponse({"detail": "throttled"}, status_code=429,
+                                              headers={"Retry-After": str(self.retry_after)}))
+        if self.error_rate and self._faults.random() < self.error_rate:
+            return self._respond(JSONResponse({"detail": "unavailable"}, status_code=503))
+
+        page = int(request.query_params.get("page", 1))
+        start = (page - 1) * self.page_size
+        jobs = self.jobs_by_date if request.query_params.get("sort_by") == "date" else self.jobs
+        results = jobs[start:start + self.page_size]
+        has_next = start + self.page_size < len(self.jobs)
+        etag = f'"{len(self.jobs)}-{page}"'
+        if self.etags and request.headers.get("if-none-match") == etag:
+            return self._respond(Response(status_code=304, headers={"ETag": etag}))
+        return self._respond(JSONResponse({
+            "count": len(self.jobs),
+            "next": f"{self.url}?page={page + 1}" if has_next else None,
+            "previous": f"{self.url}?page={page - 1}" if page > 1 else None,
+            "results": results,
+        }, headers={"ETag": etag} if self.etags else None))
+
+    async def _feed(self, request: Request):
+        if self.feed_latency:
+            await asyncio.sleep(self.feed_latency)
+        body, media_type = self.feeds[request.path_params["name"]]
+        return Response(body, media_type=media_type)
+
+    def feed_url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.port}/feeds/{name}"
+
+    def __enter__(self):
+        app = Starlette(routes=[Route("/api/jobs/", self._jobs), Route("/feeds/{name}", self._feed)])
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# -------------------------------------------------------------------
+# Database stand-in
+# -------------------------------------------------------------------
+def make_database(mongo_uri: Optional[str] = None, name: str = "workscope_bench"):
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return AsyncIOMotorClient(mongo_uri)[name]
+    from mongomock_motor import AsyncMongoMockClient
+    return AsyncMongoMockClient()[name]
+
+
+def bind_app_collections(database):
+    """Point every app module's collection globals at `database`."""
+    import importlib
+    import pkgutil
+
+    import app
+
+    for info in pkgutil.iter_modules(app.__path__):
+        if info.name == "main":
+            continue
+        module = importlib.import_module(f"app.{info.name}")
+        for attr in list(vars(module)):
+            if attr.endswith("_col"):
+                setattr(module, attr, database[attr[:-4]])
+
+
+class CountingCollection:
+    """Proxy for a collection that counts the operations sent through it."""
+
+    def __init__(self, col):
+        self.col = col
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.col, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "p50": round(pick(0.50), 3),
+        "p95": round(pick(0.95), 3),
+        "p99": round(pick(0.99), 3),
+        "mean": round(statistics.fmean(ordered), 3),
+    }
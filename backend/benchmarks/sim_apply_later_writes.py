@@ -0,0 +1,144 @@
+"""
+Apply Later write path: round trips, idempotency, bulk endpoints and the
+users.saved_jobs migration.
+
+    python -m benchmarks.sim_apply_later_writes [--jobs 2000] [--batch 50]
+
+Checks, each reported:
+  single      Mongo round trips for one save/remove, old path vs new
+  concurrent  the same job saved by N concurrent requests: one document,
+              one "saved" answer, the rest "exists"
+  batch       POST/DELETE /apply/batch over `batch` ids
+  migration   users with saved_jobs arrays (some entries missing from
+              apply_later) end up with one apply_later row per save and
+              no array; a second run changes nothing
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from app import apply_later, hydration, ingest, migrations
+from app.models import JobIdList
+
+from .common import CountingCollection, bind_app_collections, fake_findwork_job, make_database
+
+
+async def legacy_add(jobs_col, apply_later_col, users_col, job_id, user):
+    """The old add_apply_later body."""
+    job = await jobs_col.find_one({"job_id": job_id})
+    if not job:
+        try:
+            job = await jobs_col.find_one({"_id": ObjectId(job_id)})
+        except Exception:
+            job = None
+    actual_job_id = job.get("job_id") or str(job["_id"])
+    if await apply_later_col.find_one({"user_id": user["id"], "job_id": actual_job_id}):
+        return {"status": "exists"}
+    user_doc = await users_col.find_one({"_id": ObjectId(user["id"])})
+    if user_doc and actual_job_id in user_doc.get("saved_jobs", []):
+        return {"status": "exists"}
+    await apply_later_col.insert_one({"user_id": user["id"], "job_id": actual_job_id,
+                                      "saved_at": datetime.utcnow(), "status": "pending"})
+    await users_col.update_one({"_id": ObjectId(user["id"])}, {"$addToSet": {"saved_jobs": actual_job_id}},
+                               upsert=True)
+    return {"status": "saved"}
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    bind_app_collections(db)
+    rng = random.Random(9)
+    for name in ("jobs", "apply_later", "users", "migrations", "scheduler_jobs"):
+        await db[name].drop()
+    await db.jobs.insert_many([ingest.build_job_doc(fake_findwork_job(i, rng)) for i in range(1, args.jobs + 1)])
+    await db.apply_later.create_index([("user_id", 1), ("job_id", 1)], unique=True)
+
+    report = {}
+    jobs, saves, users = (CountingCollection(db.jobs), CountingCollection(db.apply_later),
+                          CountingCollection(db.users))
+    hydration.jobs_col = jobs
+    apply_later.apply_later_col = saves
+
+    def trips():
+        total = jobs.calls + saves.calls + users.calls
+        jobs.calls = saves.calls = users.calls = 0
+        return total
+
+    user = {"id": str(ObjectId()), "email": "bench@example.com"}
+    await db.users.insert_one({"_id": ObjectId(user["id"]), "email": user["email"]})
+    trips()
+    await legacy_add(jobs, saves, users, "1", user)
+    legacy_trips = trips()
+    await db.apply_later.delete_many({})
+    await apply_later.add_apply_later("1", user)
+    add_trips = trips()
+    await apply_later.remove_apply_later("1", user)
+    report["single"] = {"legacy_add_round_trips": legacy_trips, "add_round_trips": add_trips,
+                        "remove_round_trips": trips()}
+
+    answers = await asyncio.gather(*(apply_later.add_apply_later("2", user) for _ in range(args.concurrency)))
+    report["concurrent"] = {
+        "requests": args.concurrency,
+        "saved": sum(a["status"] == "saved" for a in answers),
+        "exists": sum(a["status"] == "exists" for a in answers),
+        "documents": await db.apply_later.count_documents({"user_id": user["id"], "job_id": "2"}),
+    }
+
+    ids = [str(i) for i in rng.sample(range(3, args.jobs + 1), args.batch)] + ["missing-1"]
+    trips()
+    started = time.perf_counter()
+    added = await apply_later.add_apply_later_batch(JobIdList(job_ids=ids), user)
+    add_ms = (time.perf_counter() - started) * 1000
+    add_trips = trips()
+    again = await apply_later.add_apply_later_batch(JobIdList(job_ids=ids[:10]), user)
+    trips()
+    removed = await apply_later.remove_apply_later_batch(JobIdList(job_ids=ids), user)
+    report["batch"] = {
+        "ids": len(ids),
+        "saved": len(added["saved"]), "exists": len(added["exists"]), "not_found": added["not_found"],
+        "round_trips": add_trips, "ms": round(add_ms, 2),
+        "resave_exists": len(again["exists"]),
+        "removed": removed["removed"], "remove_round_trips": trips(),
+        "left": await db.apply_later.count_documents({"user_id": user["id"], "job_id": {"$in": ids}}),
+    }
+
+    # Legacy dual-written data: arrays with entries apply_later lacks, and vice versa
+    await db.apply_later.delete_many({})
+    await db.users.delete_many({})
+    expected = 0
+    for u in range(args.users):
+        uid = ObjectId()
+        saved = [str(i) for i in rng.sample(range(1, args.jobs + 1), 8)]
+        await db.users.insert_one({"_id": uid, "email": f"u{u}@example.com", "saved_jobs": saved[:6]})
+        await db.apply_later.insert_many([{"user_id": str(uid), "job_id": j, "saved_at": datetime.utcnow(),
+                                           "status": "pending"} for j in saved[3:]])
+        expected += len(saved)
+    first = await migrations.run_migrations(db)
+    await asyncio.sleep(0.01)  # lease timestamps have millisecond precision
+    second = await migrations.run_migrations(db, force=True)
+    report["migration"] = {
+        "first": first, "second": second,
+        "apply_later_rows": await db.apply_later.count_documents({}), "expected_rows": expected,
+        "users_with_array": await db.users.count_documents({"saved_jobs": {"$exists": True}}),
+        "skipped_when_applied": await migrations.run_migrations(db) == {},
+    }
+    print(json.dumps(report, indent=2, default=str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--mongo-uri", default=None, help="use a real mongod instead of mongomock")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Several scheduler instances competing for one leased job.
+
+    python -m benchmarks.sim_scheduler_leases --workers 4
+    python -m benchmarks.sim_scheduler_leases --workers 4 --processes --mongo-uri mongodb://localhost:27017
+
+Each worker fires every --tick seconds (far more often than the job's
+--interval, and out of phase with the others) and calls run_exclusive.
+Runs are recorded in Mongo, then checked: no two runs overlap and the
+job ran about once per interval in total. With mongomock the workers are
+tasks in one process with distinct owner ids; --processes starts real
+processes against a shared mongod.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+from datetime import datetime
+
+from app import leases
+
+from .common import make_database
+
+JOB = "lease_sim"
+
+
+async def worker(db, owner: str, args):
+    async def job():
+        started = datetime.utcnow()
+        await asyncio.sleep(args.job_seconds)
+        await db.lease_sim_runs.insert_one({"owner": owner, "started": started, "finished": datetime.utcnow()})
+        return {"owner": owner}
+
+    await asyncio.sleep(random.random() * args.tick)
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        await leases.run_exclusive(JOB, job, args.interval, owner=owner,
+                                   lease_seconds=args.lease, collection=db.scheduler_jobs)
+        await asyncio.sleep(args.tick)
+
+
+def process_main(owner: str, args):
+    db = make_database(args.mongo_uri)
+    asyncio.run(worker(db, owner, args))
+
+
+async def run(args):
+    db = make_database(args.mongo_uri)
+    await db.scheduler_jobs.delete_many({"_id": JOB})
+    await db.lease_sim_runs.drop()
+    owners = [f"worker-{i}" for i in range(args.workers)]
+
+    if args.processes:
+        if not args.mongo_uri:
+            raise SystemExit("--processes needs --mongo-uri (mongomock is per-process)")
+        procs = [multiprocessing.Process(target=process_main, args=(o, args)) for o in owners]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+    else:
+        await asyncio.gather(*(worker(db, o, args) for o in owners))
+
+    runs = await db.lease_sim_runs.find({}).sort("started", 1).to_list(length=None)
+    overlaps = sum(1 for a, b in zip(runs, runs[1:]) if b["started"] < a["finished"])
+    gaps = [(b["started"] - a["started"]).total_seconds() for a, b in zip(runs, runs[1:])]
+    state = await db.scheduler_jobs.find_one({"_id": JOB})
+    report = {
+        "workers": args.workers,
+        "duration_s": args.duration,
+        "interval_s": args.interval,
+        "runs": len(runs),
+        "expected_runs": round(args.duration / args.interval),
+        "runs_by_owner": {o: sum(1 for r in runs if r["owner"] == o) for o in owners},
+        "overlaps": overlaps,
+        "min_gap_s": round(min(gaps), 3) if gaps else None,
+        "persisted": {k: state.get(k) for k in ("runs", "last_owner", "last_outcome", "last_duration_seconds")},
+    }
+    print(json.dumps(report, indent=2, default=str))
+    if overlaps:
+        raise SystemExit("overlapping runs detected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--duration", type=float, default=12.0)
+    parser.add_argument("--tick", type=float, default=0.2)
+    parser.add_argument("--job-seconds", type=float, default=0.5)
+    parser.add_argument("--lease", type=float, default=3.0)
+    parser.add_argument("--processes", action="store_true")
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
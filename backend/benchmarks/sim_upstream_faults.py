@@ -0,0 +1,102 @@
+"""
+FindWork ingestion against a local fake server that injects faults.
+
+    python -m benchmarks.sim_upstream_faults [--jobs 3000] [--throttle-every 7] [--error-rate 0.1]
+
+Scenarios, each checked and reported:
+  clean      no faults; baseline request count and time
+  faulty     every Nth request is a 429 with Retry-After and a share are
+             503s; the run must still ingest every job
+  conditional  same catalog fetched twice with ETags; the second run
+             gets 304 and writes nothing
+  outage     every request fails; the breaker opens and later calls fail
+             fast instead of retrying
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app import ingest
+from app.config import settings
+from app.upstream import CircuitOpenError, UpstreamClient, UpstreamError
+
+from .common import MockFindWork, bind_app_collections, make_database
+
+
+async def ingest_once(db, server, args, **kwargs):
+    await ingest.close_http_client()
+    bind_app_collections(db)
+    settings.FINDWORK_API_URL = server.url
+    started = time.perf_counter()
+    stats = await ingest.ingest_findwork(max_pages=-(-args.jobs // 100), concurrency=4, full=True, **kwargs)
+    stats["requests"] = server.requests
+    stats["responses"] = dict(server.responses)
+    stats["wall_seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+async def run(args):
+    settings.FINDWORK_RATE_PER_SECOND = args.rate
+    settings.FINDWORK_BACKOFF_BASE_SECONDS = 0.05
+    settings.FINDWORK_BACKOFF_MAX_SECONDS = 1.0
+    settings.FINDWORK_MAX_RETRIES = 6
+    report = {}
+
+    db = make_database(args.mongo_uri)
+    await db.jobs.drop()
+    with MockFindWork(args.jobs) as server:
+        report["clean"] = await ingest_once(db, server, args)
+
+    await db.jobs.drop()
+    with MockFindWork(args.jobs, throttle_every=args.throttle_every, error_rate=args.error_rate) as server:
+        report["faulty"] = await ingest_once(db, server, args)
+    report["faulty"]["jobs_in_db"] = await db.jobs.count_documents({})
+    assert report["faulty"]["jobs_in_db"] == args.jobs, "jobs lost under injected faults"
+
+    await db.jobs.drop()
+    with MockFindWork(args.jobs, etags=True) as server:
+        first = await ingest_once(db, server, args)
+        client = ingest.get_findwork_client()
+        # Keep the validators from the first run: reuse the same client object
+        ingest._findwork = client
+        server.requests, server.responses = 0, {}
+        settings.FINDWORK_API_URL = server.url
+        second = await ingest.ingest_findwork(max_pages=-(-args.jobs // 100), concurrency=4, full=True)
+        second["responses"] = dict(server.responses)
+        report["conditional"] = {"first": first, "second": second}
+    assert report["conditional"]["second"]["inserted"] + report["conditional"]["second"]["updated"] == 0
+
+    with MockFindWork(10, error_rate=1.0) as server:
+        client = UpstreamClient("outage", max_retries=2, backoff_base=0.01, backoff_max=0.05,
+                                failure_threshold=3, reset_seconds=60)
+        outcomes = []
+        for _ in range(5):
+            started = time.perf_counter()
+            try:
+                await client.get_json(server.url)
+                outcomes.append("ok")
+            except CircuitOpenError:
+                outcomes.append("circuit_open")
+            except UpstreamError as e:
+                outcomes.append(f"error {e.status}")
+            outcomes[-1] += f" ({(time.perf_counter() - started) * 1000:.0f} ms)"
+        await client.aclose()
+        report["outage"] = {"calls": outcomes, "server_requests": server.requests}
+
+    await ingest.close_http_client()
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=3000)
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--throttle-every", type=int, default=7)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Shared fixtures. Run from backend/:
+
+    python -m pytest
+
+Collections come from mongomock-motor (the `db` fixture); no mongod or
+FindWork key is needed. The few tests that need a real mongod use
+`live_db` and are skipped unless TEST_MONGODB_URI is set.
+"""
+import asyncio
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import pytest
+import uvicorn
+from bson import ObjectId
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Read by app.config at import time
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("FINDWORK_API_KEY", "test-key")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeUpstream:
+    """
+    A local HTTP server answering from a script: each request takes the
+    next scripted reply (status, headers, body, delay); once the script
+    runs out it answers 200 with `responder(query params)` if one is set,
+    else DEFAULT_BODY, after `delay` seconds. Requests are recorded with
+    their arrival time, headers and query params.
+    """
+
+    DEFAULT_BODY = {"ok": True}
+
+    def __init__(self):
+        self.port = _free_port()
+        self.script: List[Dict[str, Any]] = []
+        self.requests: List[Dict[str, Any]] = []
+        self.responder: Optional[Callable[[Dict[str, str]], Any]] = None
+        self.delay = 0.0
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api/jobs/"
+
+    def reply(self, status: int = 200, body: Any = None, headers: Optional[Dict[str, str]] = None,
+              delay: float = 0.0):
+        self.script.append({"status": status, "body": body, "headers": headers or {}, "delay": delay})
+
+    def reset(self):
+        self.script.clear()
+        self.requests.clear()
+        self.responder = None
+        self.delay = 0.0
+
+    def gaps(self) -> List[float]:
+        """Seconds between consecutive requests."""
+        times = [r["at"] for r in self.requests]
+        return [b - a for a, b in zip(times, times[1:])]
+
+    async def _handle(self, request: Request):
+        params = dict(request.query_params)
+        self.requests.append({"at": time.monotonic(), "headers": dict(request.headers), "params": params})
+        if self.script:
+            step = self.script.pop(0)
+        else:
+            body = self.responder(params) if self.responder else None
+            step = {"status": 200, "body": body, "headers": {}, "delay": self.delay}
+        if step["delay"]:
+            await asyncio.sleep(step["delay"])
+        if step["status"] == 304:
+            return Response(status_code=304, headers=step["headers"])
+        body = self.DEFAULT_BODY if step["body"] is None else step["body"]
+        return JSONResponse(body, status_code=step["status"], headers=step["headers"])
+
+    def start(self):
+        app = Starlette(routes=[Route("/api/jobs/", self._handle)])
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join()
+
+
+@pytest.fixture(scope="session")
+def _upstream_server():
+    server = FakeUpstream()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def upstream(_upstream_server):
+    _upstream_server.reset()
+    yield _upstream_server
+    _upstream_server.reset()
+
+
+# -------------------------------------------------------------------
+# Database and process state
+# -------------------------------------------------------------------
+def reset_app_state():
+    """Drop what app modules keep in process between requests."""
+    from app import http_cache, ingest, sources
+    from app.cache import registered_caches
+    from app.matching import job_matrix, skill_index
+
+    for cache in registered_caches():
+        cache.clear()
+    job_matrix.__init__(job_matrix.n_features)
+    skill_index.__init__()
+    http_cache._catalog.update({"version": 0, "checked_at": None})
+    # Pooled HTTP clients belong to the event loop of the test that made them
+    ingest._findwork = None
+    sources._feed_clients.clear()
+
+
+@pytest.fixture
+def db():
+    """A fresh mongomock database behind every app module's collections."""
+    from mongomock_motor import AsyncMongoMockClient
+
+    from benchmarks.common import bind_app_collections
+
+    database = AsyncMongoMockClient()["workscope_test"]
+    bind_app_collections(database)
+    reset_app_state()
+    yield database
+    reset_app_state()
+
+
+@pytest.fixture
+def live_db():
+    """
+    For behaviour mongomock lacks ($text, $lookup): a scratch database on
+    the mongod at TEST_MONGODB_URI, skipped when that isn't set. Await
+    `live_db()` inside the test's coroutine; it binds the app's collections
+    and builds the registered indexes. The database is dropped afterwards.
+    """
+    uri = os.environ.get("TEST_MONGODB_URI")
+    if not uri:
+        pytest.skip("TEST_MONGODB_URI is not set")
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from pymongo import MongoClient
+
+    from app.indexes import ensure_indexes
+    from benchmarks.common import bind_app_collections
+
+    name = f"workscope_test_{ObjectId()}"
+
+    async def connect():
+        # Motor clients belong to the loop they're made on
+        database = AsyncIOMotorClient(uri)[name]
+        bind_app_collections(database)
+        await ensure_indexes(database)
+        return database
+
+    reset_app_state()
+    yield connect
+    reset_app_state()
+    with MongoClient(uri) as client:
+        client.drop_database(name)
+
+
+@pytest.fixture
+def api(db):
+    """
+    Call the app in process, without its startup work: inside a test's
+    coroutine, `await api("GET", "/jobs", token=token)`.
+    """
+    from app.main import app
+
+    async def call(method: str, path: str, token: Optional[str] = None, **kwargs) -> httpx.Response:
+        headers = kwargs.pop("headers", {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(method, path, headers=headers, **kwargs)
+
+    return call
+
+
+@pytest.fixture
+def add_user(db):
+    """Insert a user and return (user_id, access token); await it inside the test's coroutine."""
+    from app.auth import issue_token
+
+    async def add(email: str = "ada@example.com", skills: Optional[List[str]] = None, **fields):
+        user = {"_id": ObjectId(), "email": email, "name": email.split("@")[0], "password": "x",
+                "skills": skills or [], "skills_version": 0, **fields}
+        await db.users.insert_one(user)
+        return str(user["_id"]), issue_token(user)
+
+    return add
+
+
+def findwork_posting(i: int, **fields) -> Dict[str, Any]:
+    """A FindWork result; write_jobs() takes these as they come."""
+    posting = {"id": i, "role": f"Engineer {i}", "company_name": f"Company {i}", "location": "Remote",
+               "remote": True, "url": f"https://example.com/jobs/{i}", "text": "python",
+               "description": "<p>python</p>", "keywords": ["python"], "created_at": "2026-01-01T00:00:00Z"}
+    posting.update(fields)
+    return posting
+
+
+@pytest.fixture
+def posting():
+    return findwork_posting
+
+
+@pytest.fixture
+def serve_findwork(upstream, monkeypatch):
+    """
+    Point FindWork at the fake upstream and serve `postings` from it:
+    serve_findwork(postings, page_size=2). Pages are in the order given
+    (relevance) unless sort_by=date is asked for and `honour_sort` holds.
+    """
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "FINDWORK_API_URL", upstream.url)
+    monkeypatch.setattr(settings, "FINDWORK_RATE_PER_SECOND", 1000.0)
+    monkeypatch.setattr(settings, "FINDWORK_BACKOFF_BASE_SECONDS", 0.01)
+
+    def serve(postings: List[Dict[str, Any]], page_size: int = 2, honour_sort: bool = True):
+        def respond(params: Dict[str, str]) -> Dict[str, Any]:
+            ordered = postings
+            if honour_sort and params.get("sort_by") == "date":
+                ordered = sorted(postings, key=lambda job: job["created_at"], reverse=True)
+            start = (int(params.get("page", 1)) - 1) * page_size
+            return {"count": len(ordered), "results": ordered[start:start + page_size],
+                    "next": "more" if start + page_size < len(ordered) else None}
+        upstream.responder = respond
+        return upstream
+
+    return serve
@@ -0,0 +1,179 @@
+"""Apply Later writes and saved-state lookups."""
+import asyncio
+
+from bson import ObjectId
+
+from app import apply_later
+from app.indexes import ensure_indexes
+from app.ingest import write_jobs
+from app.migrations import reconcile_saved_jobs
+from benchmarks.common import CountingCollection
+
+
+def test_remove_deletes_every_copy_of_a_duplicated_save(db, api, add_user):
+    async def scenario():
+        user_id, token = await add_user()
+        await db.jobs.insert_one({"job_id": "1", "title": "Engineer"})
+        # Stored twice before the unique (user_id, job_id) index existed
+        await db.apply_later.insert_many([{"user_id": user_id, "job_id": "1"} for _ in range(2)])
+
+        removed = await api("DELETE", "/apply/remove/1", token=token)
+        listed = await api("GET", "/apply/list", token=token)
+        checked = await api("GET", "/apply/check/1", token=token)
+        return removed.json(), listed.json(), checked.json(), await db.apply_later.count_documents({})
+
+    removed, listed, checked, left = asyncio.run(scenario())
+
+    assert removed["status"] == "removed"
+    assert listed["count"] == 0
+    assert checked == {"is_saved": False}
+    assert left == 0
+
+
+def test_reconcile_collapses_duplicate_saves(db):
+    async def scenario():
+        await db.apply_later.insert_many([
+            {"user_id": "u", "job_id": "1", "status": "applied"},
+            {"user_id": "u", "job_id": "1", "status": "pending"},
+            {"user_id": "u", "job_id": "2"},
+        ])
+        stats = await reconcile_saved_jobs(db)
+        return stats, await db.apply_later.find({}, {"_id": 0}).sort("job_id", 1).to_list(None)
+
+    stats, saves = asyncio.run(scenario())
+
+    assert stats["duplicates_removed"] == 1
+    assert saves == [{"user_id": "u", "job_id": "1", "status": "applied"}, {"user_id": "u", "job_id": "2"}]
+
+
+# -------------------------------------------------------------------
+# Saved-state lookups
+# -------------------------------------------------------------------
+async def seed_saves(db, add_user, posting):
+    """A user who saved job "1" and a job without job_id (stored under its _id); job "2" is not saved."""
+    user_id, token = await add_user()
+    await write_jobs([posting(1), posting(2)])
+    legacy = (await db.jobs.insert_one({"title": "Legacy"})).inserted_id
+    await db.apply_later.insert_many([{"user_id": user_id, "job_id": job_id} for job_id in ("1", str(legacy))])
+    job_1 = await db.jobs.find_one({"job_id": "1"})
+    return token, str(legacy), str(job_1["_id"])
+
+
+def test_batch_check_agrees_with_the_single_check(db, api, add_user, posting):
+    async def scenario():
+        token, legacy_id, job_1_oid = await seed_saves(db, add_user, posting)
+        # job_id, _id of a saved job, legacy _id, unsaved, unknown and unknown ObjectId
+        ids = ["1", job_1_oid, legacy_id, "2", "nope", str(ObjectId())]
+        batch = (await api("POST", "/apply/check", token=token, json={"job_ids": ids})).json()["saved"]
+        single = {job_id: (await api("GET", f"/apply/check/{job_id}", token=token)).json()["is_saved"]
+                  for job_id in ids}
+        return ids, batch, single
+
+    ids, batch, single = asyncio.run(scenario())
+
+    assert batch == single
+    assert [batch[job_id] for job_id in ids] == [True, True, True, False, False, False]
+
+
+def test_the_saved_set_is_read_once_and_kept_in_step_with_saves(db, api, add_user, posting, monkeypatch):
+    async def scenario():
+        token, _, _ = await seed_saves(db, add_user, posting)
+        reads = CountingCollection(apply_later.apply_later_col)
+        monkeypatch.setattr(apply_later, "apply_later_col", reads)
+        checks = [(await api("POST", "/apply/check", token=token, json={"job_ids": ["1", "2"]})).json()["saved"]]
+        finds = reads.calls
+        await api("POST", "/apply/add/2", token=token)
+        checks.append((await api("POST", "/apply/check", token=token, json={"job_ids": ["1", "2"]})).json()["saved"])
+        await api("DELETE", "/apply/remove/1", token=token)
+        checks.append((await api("POST", "/apply/check", token=token, json={"job_ids": ["1", "2"]})).json()["saved"])
+        # One find for the set, then one write each for the add and the remove
+        return checks, finds, reads.calls
+
+    checks, finds, calls = asyncio.run(scenario())
+
+    assert checks == [{"1": True, "2": False}, {"1": True, "2": True}, {"1": False, "2": True}]
+    assert (finds, calls) == (1, 3)
+
+
+def test_job_lists_can_carry_is_saved_inline(db, api, add_user, posting):
+    async def scenario():
+        token, legacy_id, _ = await seed_saves(db, add_user, posting)
+        before = await api("GET", "/jobs/", token=token, params={"saved": "true"})
+        await api("POST", "/apply/add/2", token=token)
+        after = await api("GET", "/jobs/", token=token, params={"saved": "true"},
+                          headers={"If-None-Match": before.headers["etag"]})
+        anonymous = await api("GET", "/jobs/", params={"saved": "true"})
+        return before, after, anonymous, legacy_id
+
+    before, after, anonymous, legacy_id = asyncio.run(scenario())
+
+    saved = {job.get("job_id") or job["_id"]: job["is_saved"] for job in before.json()}
+    assert saved == {"1": True, "2": False, legacy_id: True}
+    assert before.headers["cache-control"].startswith("private")
+    # The saved set is part of the tag
+    assert after.status_code == 200
+    assert all(job["is_saved"] for job in after.json())
+    assert anonymous.status_code == 401
+
+
+# -------------------------------------------------------------------
+# Writes
+# -------------------------------------------------------------------
+def test_batch_save_is_idempotent(db, api, add_user, posting):
+    async def scenario():
+        user_id, token = await add_user()
+        await ensure_indexes(db)
+        await write_jobs([posting(1), posting(2)])
+        job_2_oid = str((await db.jobs.find_one({"job_id": "2"}))["_id"])
+        body = {"job_ids": ["1", job_2_oid, "1", "nope"]}
+        first = (await api("POST", "/apply/batch", token=token, json=body)).json()
+        second = (await api("POST", "/apply/batch", token=token, json=body)).json()
+        single = (await api("POST", "/apply/add/1", token=token)).json()
+        saves = await db.apply_later.find({"user_id": user_id}, {"_id": 0, "job_id": 1}).sort("job_id", 1).to_list(None)
+        return job_2_oid, first, second, single, saves
+
+    job_2_oid, first, second, single, saves = asyncio.run(scenario())
+
+    assert first == {"saved": ["1", job_2_oid], "exists": [], "not_found": ["nope"]}
+    assert second == {"saved": [], "exists": ["1", job_2_oid], "not_found": ["nope"]}
+    assert single == {"status": "exists"}
+    # Stored under job_id whichever id the client used
+    assert saves == [{"job_id": "1"}, {"job_id": "2"}]
+
+
+def test_batch_delete_is_idempotent(db, api, add_user, posting):
+    async def scenario():
+        user_id, token = await add_user()
+        await write_jobs([posting(1), posting(2), posting(3)])
+        job_2_oid = str((await db.jobs.find_one({"job_id": "2"}))["_id"])
+        await api("POST", "/apply/batch", token=token, json={"job_ids": ["1", "2", "3"]})
+        body = {"job_ids": ["1", job_2_oid, "nope"]}
+        first = (await api("DELETE", "/apply/batch", token=token, json=body)).json()
+        second = (await api("DELETE", "/apply/batch", token=token, json=body)).json()
+        count = (await api("GET", "/apply/count", token=token)).json()
+        checked = (await api("POST", "/apply/check", token=token, json={"job_ids": ["1", "2", "3"]})).json()
+        return first, second, count, checked
+
+    first, second, count, checked = asyncio.run(scenario())
+
+    assert first == {"status": "removed", "removed": 2}
+    assert second == {"status": "removed", "removed": 0}
+    assert count == {"count": 1}
+    assert checked["saved"] == {"1": False, "2": False, "3": True}
+
+
+def test_legacy_saved_jobs_arrays_are_folded_into_apply_later(db, add_user):
+    async def scenario():
+        user_id, _ = await add_user(saved_jobs=["1", "2", "2"])
+        await db.apply_later.insert_one({"user_id": user_id, "job_id": "1", "status": "applied"})
+        stats = await reconcile_saved_jobs(db)
+        again = await reconcile_saved_jobs(db)
+        saves = await db.apply_later.find({}, {"_id": 0, "job_id": 1, "status": 1}).sort("job_id", 1).to_list(None)
+        return stats, again, saves, await db.users.find_one({"_id": ObjectId(user_id)})
+
+    stats, again, saves, user = asyncio.run(scenario())
+
+    assert (stats["users"], stats["added"], stats["already_saved"]) == (1, 1, 1)
+    assert (again["users"], again["added"]) == (0, 0)
+    assert saves == [{"job_id": "1", "status": "applied"}, {"job_id": "2", "status": "pending"}]
+    assert "saved_jobs" not in user
@@ -0,0 +1,135 @@
+"""Authentication: cached principals, token versions and password work."""
+import asyncio
+import threading
+import time
+
+from app import auth, utils
+from app.auth import get_current_principal, principal_cache
+from app.config import settings
+from benchmarks.common import CountingCollection
+
+
+def count_user_reads(monkeypatch):
+    reads = CountingCollection(auth.users_col)
+    monkeypatch.setattr(auth, "users_col", reads)
+    return reads
+
+
+# -------------------------------------------------------------------
+# Cached principals
+# -------------------------------------------------------------------
+def test_principal_is_read_once_then_served_from_cache(db, api, add_user, monkeypatch):
+    reads = count_user_reads(monkeypatch)
+
+    async def scenario():
+        _, token = await add_user(skills=["python"])
+        return [(await api("GET", "/auth/me", token=token)).status_code for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [200, 200, 200]
+    assert reads.calls == 1
+
+
+def test_trusted_claims_need_no_lookup(db, add_user, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    reads = count_user_reads(monkeypatch)
+
+    async def scenario():
+        user_id, token = await add_user()
+        return user_id, await get_current_principal(token)
+
+    user_id, principal = asyncio.run(scenario())
+
+    assert principal == {"id": user_id, "email": "ada@example.com", "name": "ada", "skills_version": 0}
+    assert reads.calls == 0
+
+
+# -------------------------------------------------------------------
+# Token skills version
+# -------------------------------------------------------------------
+def test_a_token_from_before_a_skills_edit_is_refused(db, api, add_user):
+    async def scenario():
+        _, old_token = await add_user(skills=["python"])
+        edited = await api("PUT", "/auth/skills", token=old_token, json=["rust"])
+        new_token = edited.json()["access_token"]
+        # Cached by the new token first, then straight from Mongo on a worker with no cache entry
+        fresh = await api("GET", "/auth/me", token=new_token)
+        stale_cached = await api("GET", "/auth/me", token=old_token)
+        principal_cache.clear()
+        stale_loaded = await api("GET", "/apply/count", token=old_token)
+        return edited, fresh, stale_cached, stale_loaded
+
+    edited, fresh, stale_cached, stale_loaded = asyncio.run(scenario())
+
+    assert edited.status_code == 200
+    assert fresh.json()["skills"] == ["rust"]
+    assert stale_cached.status_code == stale_loaded.status_code == 401
+
+
+def test_a_newer_token_skips_an_older_cached_principal(db, api, add_user):
+    async def scenario():
+        _, token = await add_user(skills=["python"])
+        await api("GET", "/auth/me", token=token)
+        # Skills changed through another worker, which handed out this token
+        await db.users.update_one({"email": "ada@example.com"},
+                                  {"$set": {"skills": ["go"]}, "$inc": {"skills_version": 1}})
+        newer = auth.issue_token(await db.users.find_one({"email": "ada@example.com"}))
+        return await api("GET", "/auth/me", token=newer)
+
+    me = asyncio.run(scenario())
+
+    assert me.status_code == 200
+    assert me.json()["skills"] == ["go"]
+
+
+# -------------------------------------------------------------------
+# Password work
+# -------------------------------------------------------------------
+def login(api, password="correct horse"):
+    return api("POST", "/auth/token", data={"username": "ada@example.com", "password": password})
+
+
+def test_hashing_runs_in_the_password_pool_not_on_the_loop(db, api, monkeypatch):
+    threads = []
+    hash_password = utils.hash_password
+
+    def recording_hash(password):
+        threads.append(threading.current_thread().name)
+        return hash_password(password)
+    monkeypatch.setattr(utils, "hash_password", recording_hash)
+
+    async def scenario():
+        registered = await api("POST", "/auth/register", json={
+            "email": "Ada@example.com", "password": "correct horse", "name": "Ada", "skills": ["python"]})
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.005)
+        ticking = asyncio.create_task(ticker())
+        good = await login(api)
+        ticking.cancel()
+        bad = await login(api, "wrong")
+        return registered, good, bad, ticks
+
+    registered, good, bad, ticks = asyncio.run(scenario())
+
+    assert registered.status_code == 200
+    assert good.status_code == 200 and good.json()["access_token"]
+    assert bad.status_code == 401
+    assert threads and all(name.startswith("password") for name in threads)
+    # bcrypt takes far longer than this; the loop kept serving meanwhile
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+
+
+def test_a_saturated_pool_answers_429(db, api, add_user, monkeypatch):
+    monkeypatch.setattr(utils, "_password_in_flight", settings.PASSWORD_WORKERS + settings.PASSWORD_QUEUE_LIMIT)
+
+    async def scenario():
+        await add_user(password=utils.hash_password("correct horse"))
+        return await login(api)
+
+    busy = asyncio.run(scenario())
+
+    assert busy.status_code == 429
+    assert busy.headers["Retry-After"] == "1"
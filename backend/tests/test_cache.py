@@ -0,0 +1,54 @@
+"""TTLCache: LRU eviction, expiry, stamps and counters."""
+from app import cache
+from app.cache import TTLCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru = TTLCache("test_lru", max_entries=2, ttl_seconds=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+
+    lru.set("c", 3)
+
+    assert (lru.get("a"), lru.get("b"), lru.get("c")) == (1, None, 3)
+    assert len(lru) == 2
+    assert lru.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl = TTLCache("test_ttl", max_entries=10, ttl_seconds=30)
+    ttl.set("a", 1)
+    ttl.set("b", 2, ttl_seconds=120)
+
+    now[0] += 31
+
+    assert (ttl.get("a"), ttl.get("b")) == (None, 2)
+    assert ttl.stats()["expirations"] == 1
+
+
+def test_a_different_stamp_is_a_miss_and_drops_the_entry():
+    stamped = TTLCache("test_stamp", max_entries=10, ttl_seconds=60)
+    stamped.set("u", ["ranking"], stamp=(1, ("python",)))
+
+    assert stamped.get("u", stamp=(1, ("python",))) == ["ranking"]
+    assert stamped.get("u", stamp=(2, ("python",))) is None
+    assert stamped.get("u", stamp=(1, ("python",))) is None
+
+    stats = stamped.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"], stats["hit_ratio"]) == (1, 2, 1, 0.3333)
+
+
+def test_invalidate_and_clear_are_counted():
+    entries = TTLCache("test_invalidate", max_entries=10, ttl_seconds=60)
+    for key in "abc":
+        entries.set(key, key)
+
+    entries.invalidate("a")
+    entries.invalidate("missing")
+    entries.clear()
+
+    assert len(entries) == 0
+    assert entries.stats()["invalidations"] == 3
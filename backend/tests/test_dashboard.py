@@ -0,0 +1,117 @@
+"""GET /dashboard/summary."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import dashboard
+from app.ingest import build_job_doc, write_jobs
+from app.matching import recommendation_cache
+
+
+class AggregateStub:
+    """users_col stand-in: records pipelines and answers with `facets` (mongomock has no lookup pipelines)."""
+
+    def __init__(self, facets):
+        self.facets = facets
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        stub = self
+
+        class Cursor:
+            async def to_list(self, length):
+                return [stub.facets]
+        return Cursor()
+
+
+def card(posting, i, **fields):
+    doc = build_job_doc(posting(i, **fields))
+    return {key: doc[key] for key in dashboard._JOB_CARD if key in doc}
+
+
+@pytest.fixture
+def summary(db, api, add_user, posting, monkeypatch):
+    """summary(facets) -> (GET /dashboard/summary JSON, the stub) for a user skilled in python."""
+    def run(facets):
+        stub = AggregateStub(facets)
+        monkeypatch.setattr(dashboard, "users_col", stub)
+
+        async def scenario():
+            _, token = await add_user(skills=["python"])
+            await write_jobs([posting(1, role="Python Engineer"), posting(2, role="Senior Python Engineer"),
+                              posting(3, role="Accountant")])
+            first = await api("GET", "/dashboard/summary", token=token)
+            second = await api("GET", "/dashboard/summary", token=token)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first.json() == second.json()
+        return first, stub
+    return run
+
+
+def test_the_summary_is_assembled_from_one_aggregation(summary, posting):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    facets = {
+        "saved": [{"count": 4}],
+        "applications": [{"_id": "applied", "count": 2}, {"_id": "interview", "count": 1}, {"_id": None, "count": 1}],
+        "deadlines": [{"job": [card(posting, 5, role="Later"), card(posting, 6, role="Sooner")]}],
+        "recommended_saved": [{"job_ids": ["2"]}],
+        "recommended": [{"job": [card(posting, 1, role="Python Engineer"),
+                                 card(posting, 2, role="Senior Python Engineer")]}],
+    }
+    facets["deadlines"][0]["job"][0]["last_date"] = today + timedelta(days=5)
+    facets["deadlines"][0]["job"][1]["last_date"] = today
+
+    response, stub = summary(facets)
+    body = response.json()
+
+    assert response.headers["cache-control"].startswith("private")
+    assert body["saved_count"] == 4
+    assert body["applications"] == {"total": 4, "by_status": {"applied": 2, "interview": 1, "unknown": 1}}
+    assert [job["title"] for job in body["deadlines"]["upcoming"]] == ["Sooner", "Later"]
+    assert (body["deadlines"]["upcoming_count"], body["deadlines"]["urgent_count"]) == (2, 1)
+    assert {job["job_id"]: job["is_saved"] for job in body["recommended"]} == {"1": False, "2": True}
+    assert all(job["matched_skills"] == ["python"] for job in body["recommended"])
+    # One aggregation per request, its ranked ids taken from the cached ranking
+    assert len(stub.pipelines) == 2
+    assert set(stub.pipelines[0][1]["$project"]["recommended_ids"]["$literal"]) == {"1", "2", "3"}
+    assert recommendation_cache.stats()["size"] == 1
+
+
+def test_without_a_ranking_the_newest_jobs_are_recommended(summary, monkeypatch):
+    monkeypatch.setattr(dashboard, "recommend_for_user", lambda *args: [])
+
+    response, _ = summary({"saved": [], "applications": [], "deadlines": [], "recommended_saved": []})
+    body = response.json()
+
+    assert body["saved_count"] == 0
+    assert body["applications"] == {"total": 0, "by_status": {}}
+    assert [job["match_reason"] for job in body["recommended"]] == ["Popular jobs for you"] * 3
+    assert [job["is_saved"] for job in body["recommended"]] == [False] * 3
+
+
+def test_summary_against_mongod_matches_the_fan_out(api, add_user, posting, live_db):
+    async def scenario():
+        await live_db()
+        _, token = await add_user(skills=["python"])
+        soon = datetime.utcnow() + timedelta(days=1)
+        await write_jobs([posting(1, role="Python Engineer", last_date=soon.isoformat()),
+                          posting(2, role="Senior Python Engineer"), posting(3, role="Accountant")])
+        await api("POST", "/apply/batch", token=token, json={"job_ids": ["1", "3"]})
+        for job_id in ("1", "3"):
+            await api("POST", "/applications/", token=token, params={"jobId": job_id})
+        summary = (await api("GET", "/dashboard/summary", token=token)).json()
+        count = (await api("GET", "/apply/count", token=token)).json()
+        applications = (await api("GET", "/applications/", token=token)).json()
+        recommended = (await api("GET", "/recommended-jobs", token=token)).json()
+        return summary, count, applications, recommended
+
+    summary, count, applications, recommended = asyncio.run(scenario())
+
+    assert summary["saved_count"] == count["count"] == 2
+    assert summary["applications"] == {"total": len(applications), "by_status": {"pending": 2}}
+    assert [job["job_id"] for job in summary["recommended"]] == [job["job_id"] for job in recommended]
+    assert [job["job_id"] for job in summary["deadlines"]["upcoming"]] == ["1"]
@@ -0,0 +1,85 @@
+"""Streaming catalog export as NDJSON or CSV."""
+import asyncio
+import csv
+import gzip
+import io
+
+import orjson
+
+from app.export import CSV_COLUMNS, export_chunks
+from app.ingest import write_jobs
+
+
+def export(api, posting, token, jobs=None, **params):
+    async def scenario():
+        await write_jobs(jobs or [posting(i) for i in range(1, 6)])
+        return await api("GET", "/jobs/export", token=token, params=params)
+
+    return asyncio.run(scenario())
+
+
+def ndjson_rows(content: bytes):
+    return [orjson.loads(line) for line in content.splitlines()]
+
+
+def test_ndjson_export_streams_every_card_in_id_order(db, api, add_user, posting):
+    _, token = asyncio.run(add_user())
+
+    response = export(api, posting, token)
+
+    rows = ndjson_rows(response.content)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [row["job_id"] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert rows == sorted(rows, key=lambda row: row["_id"])
+    assert "description" not in rows[0]
+
+
+def test_an_export_resumes_after_the_last_id_received(db, api, add_user, posting):
+    _, token = asyncio.run(add_user())
+    first = ndjson_rows(export(api, posting, token).content)
+
+    rest = ndjson_rows(export(api, posting, token, after=first[2]["_id"]).content)
+
+    assert rest == first[3:]
+    assert export(api, posting, token, after="nope").status_code == 400
+
+
+def test_csv_export_has_a_header_and_one_row_per_job(db, api, add_user, posting):
+    _, token = asyncio.run(add_user())
+
+    response = export(api, posting, token, format="csv", profile="detail")
+    empty = export(api, posting, token, format="csv", location="Atlantis")
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == CSV_COLUMNS + ["description"]
+    assert [row[1] for row in rows[1:]] == ["1", "2", "3", "4", "5"]
+    assert rows[1][CSV_COLUMNS.index("remote")] == "True"
+    assert list(csv.reader(io.StringIO(empty.text))) == [CSV_COLUMNS]
+
+
+def test_a_gzip_export_is_a_gz_file(db, api, add_user, posting):
+    _, token = asyncio.run(add_user())
+
+    response = export(api, posting, token, gzip="true", profile="full")
+
+    assert response.headers["content-type"] == "application/gzip"
+    assert 'filename="jobs.ndjson.gz"' in response.headers["content-disposition"]
+    rows = ndjson_rows(gzip.decompress(response.content))
+    assert len(rows) == 5 and "raw" in rows[0]
+
+
+def test_the_cursor_is_read_one_batch_per_chunk(db, posting):
+    async def scenario():
+        await write_jobs([posting(i) for i in range(1, 6)])
+        return [chunk async for chunk in export_chunks({}, batch_size=2, database=db)]
+
+    chunks = asyncio.run(scenario())
+
+    assert [len(chunk.splitlines()) for chunk in chunks] == [2, 2, 1]
+
+
+def test_export_requires_a_token(db, api):
+    async def scenario():
+        return await api("GET", "/jobs/export")
+
+    assert asyncio.run(scenario()).status_code == 401
@@ -0,0 +1,112 @@
+"""Liveness and readiness from the cached health probe."""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import health
+from app.health import HealthMonitor
+from app.ingest import LAST_INGEST_KEY
+
+
+class FakeClient:
+    """Stands in for the Motor client: counts pings, optionally failing them."""
+
+    def __init__(self):
+        self.pings = 0
+        self.down = False
+        self.admin = self
+
+    async def command(self, name):
+        self.pings += 1
+        if self.down:
+            raise ConnectionError("connection refused")
+        return {"ok": 1}
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(health, "client", fake)
+    return fake
+
+
+@pytest.fixture
+def monitor(db, mongo, monkeypatch):
+    """A fresh monitor behind the endpoints, with the scheduler reported running."""
+    fresh = HealthMonitor()
+    monkeypatch.setattr(health, "health_monitor", fresh)
+    monkeypatch.setattr(fresh, "_scheduler", lambda: {"ok": True, "next_runs": {}})
+    return fresh
+
+
+def ingested(db, minutes_ago: int):
+    finished_at = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    return db.ingest_state.insert_one({"_id": LAST_INGEST_KEY, "finished_at": finished_at, "stats": {}})
+
+
+def test_ready_only_after_the_first_probe(db, api, monitor):
+    async def scenario():
+        await ingested(db, minutes_ago=5)
+        before = await api("GET", "/health/ready")
+        await monitor.probe()
+        after = await api("GET", "/health/ready")
+        live = await api("GET", "/health/live")
+        return before, after, live
+
+    before, after, live = asyncio.run(scenario())
+
+    assert (before.status_code, before.json()["status"]) == (503, "starting")
+    assert (after.status_code, after.json()["status"]) == (200, "ok")
+    assert live.json() == {"status": "ok"}
+
+
+def test_polling_reads_the_snapshot_without_probing(db, api, monitor, mongo):
+    async def scenario():
+        await ingested(db, minutes_ago=5)
+        await monitor.probe()
+        return [(await api("GET", path)).status_code for path in ["/health/ready", "/health"] * 5]
+
+    assert asyncio.run(scenario()) == [200] * 10
+    assert mongo.pings == 1
+
+
+def test_mongo_down_takes_the_instance_out_of_rotation(db, api, monitor, mongo):
+    mongo.down = True
+
+    async def scenario():
+        await monitor.probe()
+        return await api("GET", "/health/ready")
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+    assert response.json()["checks"]["mongo"] == {"ok": False, "error": "connection refused"}
+
+
+def test_a_stale_ingest_is_degraded_but_still_ready(db, api, monitor):
+    async def scenario():
+        await ingested(db, minutes_ago=24 * 60)
+        await monitor.probe()
+        return await api("GET", "/health")
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
+    assert "ingest" in response.json()["message"]
+
+
+def test_a_probe_that_stopped_running_is_not_ready(db, api, monitor):
+    async def scenario():
+        await ingested(db, minutes_ago=5)
+        await monitor.probe()
+        monitor.checked_at = time.monotonic() - 3600
+        return await api("GET", "/health/ready")
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 503
+    assert response.json()["message"] == "Health probe is not running"
@@ -0,0 +1,103 @@
+"""Response compression and conditional GETs on catalog endpoints."""
+import asyncio
+import gzip
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from app import jobs
+from app.compression import CompressionMiddleware, choose_encoding
+from app.config import settings
+from app.http_cache import bump_catalog_version
+from app.ingest import write_jobs
+from benchmarks.common import CountingCollection
+
+
+def test_encoding_follows_accept_encoding():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+
+
+def test_large_bodies_are_compressed_and_tagged_per_encoding(api, posting):
+    async def scenario():
+        await write_jobs([posting(i) for i in range(1, 21)])
+        plain = await api("GET", "/jobs/", headers={"Accept-Encoding": "identity"})
+        gzipped = await api("GET", "/jobs/", headers={"Accept-Encoding": "gzip"})
+        brotli = await api("GET", "/jobs/", headers={"Accept-Encoding": "br"})
+        small = await api("GET", "/jobs/1", headers={"Accept-Encoding": "gzip"})
+        return plain, gzipped, brotli, small
+
+    plain, gzipped, brotli, small = asyncio.run(scenario())
+
+    assert len(plain.content) >= settings.COMPRESSION_MIN_SIZE
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert brotli.headers["content-encoding"] == "br"
+    assert gzipped.json() == brotli.json() == plain.json()
+    assert gzipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert brotli.headers["etag"] == plain.headers["etag"][:-1] + '-br"'
+    assert "accept-encoding" in gzipped.headers["vary"].lower()
+    assert "content-encoding" not in small.headers
+
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    async def rows(request):
+        async def generate():
+            for i in range(200):
+                yield f'{{"row": {i}}}\n'.encode()
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+    app = CompressionMiddleware(Starlette(routes=[Route("/", rows)]), minimum_size=1024)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            async with client.stream("GET", "/", headers={"Accept-Encoding": "gzip"}) as response:
+                return response.headers, b"".join([chunk async for chunk in response.aiter_raw()])
+
+    headers, raw = asyncio.run(scenario())
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert gzip.decompress(raw).decode().splitlines()[-1] == '{"row": 199}'
+
+
+def test_a_matching_etag_gets_304_without_a_job_query(db, api, posting, monkeypatch):
+    async def scenario():
+        await write_jobs([posting(i) for i in range(1, 21)])
+        first = await api("GET", "/jobs/", params={"limit": 5}, headers={"Accept-Encoding": "gzip"})
+        queries = CountingCollection(jobs.jobs_col)
+        monkeypatch.setattr(jobs, "jobs_col", queries)
+        revalidated = await api("GET", "/jobs/", params={"limit": 5},
+                                headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+        other_query = await api("GET", "/jobs/", params={"limit": 6},
+                                headers={"If-None-Match": first.headers["etag"]})
+        return first, revalidated, other_query, queries.calls
+
+    first, revalidated, other_query, calls = asyncio.run(scenario())
+
+    assert first.headers["cache-control"].startswith("public, max-age=")
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    assert other_query.status_code == 200
+    # Only the request with other parameters read jobs
+    assert calls == 1
+
+
+def test_an_ingest_changes_the_tag(db, api, posting, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_VERSION_TTL_SECONDS", 0)
+
+    async def scenario():
+        await write_jobs([posting(1)])
+        before = await api("GET", "/jobs/1")
+        await bump_catalog_version()
+        after = await api("GET", "/jobs/1", headers={"If-None-Match": before.headers["etag"]})
+        return before, after
+
+    before, after = asyncio.run(scenario())
+
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
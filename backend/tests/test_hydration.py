@@ -0,0 +1,70 @@
+"""Batched job hydration behind the Apply Later and applications lists."""
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app import hydration
+from app.hydration import fetch_jobs_by_ids
+from app.ingest import write_jobs
+from benchmarks.common import CountingCollection
+
+
+def test_ids_resolve_by_job_id_or_object_id_in_one_query(db, posting, monkeypatch):
+    async def scenario():
+        await write_jobs([posting(1), posting(2)])
+        legacy = await db.jobs.insert_one({"title": "Saved by _id"})
+        queries = CountingCollection(hydration.jobs_col)
+        monkeypatch.setattr(hydration, "jobs_col", queries)
+        found = await fetch_jobs_by_ids(["2", str(legacy.inserted_id), "1", "missing", str(ObjectId())])
+        return found, legacy.inserted_id, queries.calls
+
+    found, legacy_id, calls = asyncio.run(scenario())
+
+    assert calls == 1
+    assert list(found) == ["2", str(legacy_id), "1"]
+    assert found["1"]["job_id"] == "1"
+    assert found[str(legacy_id)]["title"] == "Saved by _id"
+
+
+def test_apply_later_list_keeps_save_order_and_skips_missing_jobs(db, api, add_user, posting):
+    async def scenario():
+        user_id, token = await add_user()
+        await write_jobs([posting(1), posting(2)])
+        # Saved before cards were pre-rendered: no card_json yet
+        legacy = await db.jobs.insert_one({"title": "Legacy Engineer", "company_name": "Initech"})
+        saved_at = datetime(2026, 10, 1)
+        await db.apply_later.insert_many([
+            {"user_id": user_id, "job_id": job_id, "saved_at": saved_at + timedelta(days=day)}
+            for day, job_id in enumerate(["2", "gone", str(legacy.inserted_id), "1"])
+        ])
+        listed = await api("GET", "/apply/list", token=token)
+        return listed.json(), legacy.inserted_id, await db.jobs.find_one({"_id": legacy.inserted_id})
+
+    listed, legacy_id, legacy = asyncio.run(scenario())
+
+    assert listed["count"] == 3
+    assert [job["id"] for job in listed["jobs"]][1] == str(legacy_id)
+    assert [job["title"] for job in listed["jobs"]] == ["Engineer 2", "Legacy Engineer", "Engineer 1"]
+    assert listed["jobs"][0]["saved_at"] == "2026-10-01T00:00:00"
+    assert all(job["isSaved"] for job in listed["jobs"])
+    # The rendered card was written back for the next read
+    assert legacy["card_json"]
+
+
+def test_applications_list_names_unknown_jobs(db, api, add_user, posting):
+    async def scenario():
+        user_id, token = await add_user()
+        await write_jobs([posting(1, role="Python Engineer", company_name="Acme")])
+        await db.applications.insert_many([
+            {"user_id": user_id, "job_id": job_id, "status": "applied", "applied_date": "2026-10-01"}
+            for job_id in ("1", "gone")
+        ])
+        return (await api("GET", "/applications/", token=token)).json()
+
+    applications = asyncio.run(scenario())
+
+    assert [app["job"] for app in applications] == [
+        {"id": "1", "title": "Python Engineer", "company": "Acme", "location": "Remote"},
+        {"id": "gone", "title": "Unknown", "company": "Unknown", "location": "Unknown"},
+    ]
@@ -0,0 +1,86 @@
+"""The index registry and the COLLSCAN check on hot queries."""
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.indexes import INDEXES, _stages, ensure_indexes, hot_queries, verify_query_plans
+
+
+def test_ensure_indexes_is_idempotent(db):
+    async def scenario():
+        first = await ensure_indexes(db)
+        second = await ensure_indexes(db)
+        return first, second, await db.apply_later.index_information()
+
+    first, second, apply_later = asyncio.run(scenario())
+
+    assert first == second
+    assert first["users"] == ["user_email_unique"]
+    assert apply_later["apply_later_user_job_unique"]["unique"]
+
+
+def test_unique_indexes_refuse_duplicates(db):
+    async def scenario():
+        await ensure_indexes(db)
+        await db.apply_later.insert_one({"user_id": "u", "job_id": "1"})
+        await db.apply_later.insert_one({"user_id": "u", "job_id": "1"})
+
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(scenario())
+
+
+class ExplainedCursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def sort(self, *args):
+        return self
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+
+class ExplainedDatabase:
+    """Answers explain() with an IXSCAN plan, or COLLSCAN for `scanned` filters."""
+
+    def __init__(self, scanned):
+        self.scanned = scanned
+
+    def __getitem__(self, collection):
+        database = self
+
+        class Collection:
+            def find(self, query):
+                stage = "COLLSCAN" if query in database.scanned else "IXSCAN"
+                return ExplainedCursor({"stage": "FETCH", "inputStage": {"stage": stage}})
+        return Collection()
+
+
+def test_stages_are_collected_from_nested_plans():
+    plan = {"stage": "SORT", "inputStage": {"stage": "OR", "inputStages": [
+        {"stage": "IXSCAN"}, {"stage": "FETCH", "inputStage": {"stage": "COLLSCAN"}}]}}
+
+    assert _stages(plan) == ["SORT", "OR", "IXSCAN", "FETCH", "COLLSCAN"]
+
+
+def test_a_collscan_on_a_hot_query_fails_the_check():
+    by_email = next(q for q in hot_queries() if q["name"] == "user by email")
+    database = ExplainedDatabase(scanned=[by_email["filter"]])
+
+    with pytest.raises(RuntimeError, match="user by email"):
+        asyncio.run(verify_query_plans(database))
+    report = asyncio.run(verify_query_plans(database, raise_on_scan=False))
+
+    assert [r["name"] for r in report if r["collscan"]] == ["user by email"]
+    assert len(report) == len(hot_queries())
+
+
+def test_every_hot_query_uses_an_index(live_db):
+    async def scenario():
+        return await verify_query_plans(await live_db())
+
+    report = asyncio.run(scenario())
+
+    assert not [r["name"] for r in report if r["collscan"]]
+    assert set(INDEXES) >= {q["collection"] for q in hot_queries()}
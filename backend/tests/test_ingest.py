@@ -0,0 +1,129 @@
+"""FindWork ingestion: paging, concurrency and incremental writes."""
+import asyncio
+import time
+
+import pytest
+
+from app import ingest
+from app.config import settings
+from app.ingest import FINDWORK, get_high_water_mark, ingest_findwork, state_key, write_jobs
+
+
+def run_ingest(**options):
+    return asyncio.run(ingest_findwork(full=True, **options))
+
+
+# -------------------------------------------------------------------
+# Paging and concurrency
+# -------------------------------------------------------------------
+def test_every_page_is_fetched_and_written(db, serve_findwork, posting):
+    serve_findwork([posting(i) for i in range(1, 12)], page_size=3)
+
+    stats = run_ingest()
+
+    assert stats["pages"] == 4
+    assert stats["inserted"] == 11
+    assert asyncio.run(db.jobs.count_documents({})) == 11
+    assert asyncio.run(get_high_water_mark(state_key(None, None))) is not None
+
+
+def test_pages_after_the_first_are_fetched_concurrently(db, serve_findwork, posting):
+    upstream = serve_findwork([posting(i) for i in range(1, 10)], page_size=2)
+    upstream.delay = 0.2
+
+    started = time.perf_counter()
+    stats = run_ingest(concurrency=4)
+    elapsed = time.perf_counter() - started
+
+    assert stats["pages"] == 5
+    # Page 1, then pages 2-5 together: two round trips rather than five
+    assert elapsed < 0.8
+
+
+def test_max_pages_caps_the_run(db, serve_findwork, posting):
+    upstream = serve_findwork([posting(i) for i in range(1, 12)], page_size=2)
+
+    stats = run_ingest(max_pages=3)
+
+    assert stats["pages"] == 3
+    assert sorted(int(r["params"]["page"]) for r in upstream.requests) == [1, 2, 3]
+
+
+def test_a_failed_page_is_counted_and_the_rest_are_written(db, serve_findwork, posting, monkeypatch):
+    monkeypatch.setattr(settings, "FINDWORK_MAX_RETRIES", 0)
+    upstream = serve_findwork([posting(i) for i in range(1, 7)], page_size=2)
+    responder = upstream.responder
+
+    def page_2_fails(params):
+        if params.get("page") == "2":
+            upstream.script.append({"status": 503, "body": {"detail": "unavailable"}, "headers": {}, "delay": 0})
+        return responder(params)
+    upstream.responder = page_2_fails
+
+    stats = run_ingest(concurrency=1)
+
+    assert stats["failed_pages"] == 1
+    assert stats["inserted"] == 4
+    # The high-water mark stays put so the next run fetches page 2 again
+    assert asyncio.run(get_high_water_mark(state_key(None, None))) is None
+
+
+@pytest.fixture
+def bulk_writes(monkeypatch):
+    """Sizes of the bulk_write calls write_jobs() sends to the jobs collection."""
+    calls = []
+    jobs_col = ingest.jobs_col
+
+    class RecordingJobs:
+        def __getattr__(self, name):
+            return getattr(jobs_col, name)
+
+        async def bulk_write(self, ops, **kwargs):
+            calls.append(len(ops))
+            return await jobs_col.bulk_write(ops, **kwargs)
+    monkeypatch.setattr(ingest, "jobs_col", RecordingJobs())
+    return calls
+
+
+def test_bulk_writes_are_chunked(db, posting, bulk_writes, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_BULK_SIZE", 2)
+
+    asyncio.run(write_jobs([posting(i) for i in range(1, 6)]))
+
+    assert bulk_writes == [2, 2, 1]
+
+
+# -------------------------------------------------------------------
+# Content hashing and change detection
+# -------------------------------------------------------------------
+def test_write_jobs_counts_inserted_updated_and_unchanged(db, posting, bulk_writes):
+    async def scenario():
+        first = await write_jobs([posting(1), posting(2)])
+        second = await write_jobs([posting(1), posting(2, role="Staff Engineer 2"), posting(3)])
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first[FINDWORK] == {"inserted": 2, "updated": 0, "unchanged": 0, "duplicates": 0}
+    assert second[FINDWORK] == {"inserted": 1, "updated": 1, "unchanged": 1, "duplicates": 0}
+    # The unchanged posting is left out of the second write
+    assert bulk_writes == [2, 2]
+    job = asyncio.run(db.jobs.find_one({"job_id": "2"}))
+    assert job["title"] == "Staff Engineer 2"
+    assert job["content_hash"]
+
+
+def test_a_second_run_over_the_same_postings_writes_nothing(db, serve_findwork, posting, bulk_writes):
+    serve_findwork([posting(i, created_at=f"2026-0{i}-01T00:00:00Z") for i in range(1, 6)])
+
+    async def scenario():
+        first = await ingest_findwork(full=True)
+        writes = len(bulk_writes)
+        return first, writes, await ingest_findwork(full=True)
+
+    first, writes, second = asyncio.run(scenario())
+
+    assert first["inserted"] == 5
+    assert (second["inserted"], second["updated"], second["unchanged"]) == (0, 0, 5)
+    assert len(bulk_writes) == writes
+    assert asyncio.run(get_high_water_mark(state_key(None, None))) == "2026-05-01T00:00:00Z"
@@ -0,0 +1,93 @@
+"""Mongo-backed leases for scheduled jobs."""
+import asyncio
+from datetime import datetime, timedelta
+
+from app.leases import run_exclusive, try_acquire
+
+
+def test_one_of_many_workers_runs_the_job(db):
+    runs = []
+
+    async def job(owner):
+        runs.append(owner)
+        await asyncio.sleep(0.05)
+        return {"owner": owner}
+
+    async def scenario():
+        return await asyncio.gather(*(
+            run_exclusive("fetch_jobs", lambda owner=owner: job(owner), interval_seconds=60, owner=owner)
+            for owner in ("w1", "w2", "w3", "w4")
+        ))
+
+    results = asyncio.run(scenario())
+
+    assert len(runs) == 1
+    assert [r for r in results if r is not None] == [{"owner": runs[0]}]
+
+
+def test_a_finished_job_is_not_due_again_before_its_interval(db):
+    runs = []
+
+    async def job():
+        runs.append(1)
+
+    async def scenario():
+        await run_exclusive("sweep", job, interval_seconds=60, owner="w1")
+        await run_exclusive("sweep", job, interval_seconds=60, owner="w2")
+        # Interval 0 (migrations): always due once the lease is free. Mongo keeps
+        # milliseconds, so within the release's millisecond it still looks held
+        await asyncio.sleep(0.01)
+        await run_exclusive("sweep", job, interval_seconds=0, owner="w2")
+
+    asyncio.run(scenario())
+
+    assert len(runs) == 2
+
+
+def test_release_records_the_run(db):
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        await run_exclusive("ok_job", lambda: asyncio.sleep(0, {"inserted": 3}), interval_seconds=60, owner="w1")
+        await run_exclusive("bad_job", failing, interval_seconds=60, owner="w1")
+        return await db.scheduler_jobs.find_one({"_id": "ok_job"}), await db.scheduler_jobs.find_one({"_id": "bad_job"})
+
+    ok, bad = asyncio.run(scenario())
+
+    assert (ok["last_outcome"], ok["last_result"], ok["runs"], ok["owner"]) == ("ok", {"inserted": 3}, 1, None)
+    assert ok["last_owner"] == "w1" and ok["last_duration_seconds"] >= 0
+    assert ok["lease_until"] <= datetime.utcnow()
+    assert (bad["last_outcome"], bad["last_error"]) == ("error", "RuntimeError: upstream down")
+
+
+def test_a_held_lease_is_not_taken_until_it_expires(db):
+    async def scenario():
+        now = datetime.utcnow()
+        stale = now - timedelta(hours=1)
+        await db.scheduler_jobs.insert_many([
+            {"_id": "held", "owner": "w1", "lease_until": now + timedelta(minutes=5), "last_started": stale},
+            # w1 crashed mid-run: its lease ran out
+            {"_id": "orphaned", "owner": "w1", "lease_until": stale, "last_started": stale},
+        ])
+        return await try_acquire("held", 60, owner="w2"), await try_acquire("orphaned", 60, owner="w2")
+
+    held, orphaned = asyncio.run(scenario())
+
+    assert held is None
+    assert orphaned["owner"] == "w2"
+
+
+def test_a_long_run_keeps_its_lease(db):
+    async def scenario():
+        async def slow():
+            await asyncio.sleep(0.5)
+
+        running = asyncio.create_task(run_exclusive("slow", slow, interval_seconds=0, owner="w1", lease_seconds=0.3))
+        await asyncio.sleep(0.4)
+        # Past the first lease_until; the heartbeat has renewed it
+        contender = await try_acquire("slow", 0, owner="w2", lease_seconds=0.3)
+        await running
+        return contender
+
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,116 @@
+"""The load harness: scenario mixes, the recording window, a small in-process run and baseline comparison."""
+import asyncio
+import random
+from argparse import Namespace
+
+import httpx
+import pytest
+
+from app.config import settings
+from benchmarks.bench_load import DEFAULT_MIX, SCENARIOS, Recorder, compare, drive, parse_mix, seed
+from benchmarks.common import MockFindWork
+
+
+# -------------------------------------------------------------------
+# Mix and recording window
+# -------------------------------------------------------------------
+def test_default_mix_names_every_scenario():
+    assert set(parse_mix(DEFAULT_MIX)) == set(SCENARIOS)
+    assert parse_mix("jobs=3, login") == {"jobs": 3.0, "login": 1.0}
+
+
+@pytest.mark.parametrize("mix", ["jobs=1,nope=2", "jobs=0", ""])
+def test_bad_mix_is_refused(mix):
+    with pytest.raises(SystemExit):
+        parse_mix(mix)
+
+
+def test_recorder_skips_the_warmup_and_stops_at_the_request_limit():
+    recorder = Recorder(start=10.0, end=20.0, limit=2)
+
+    assert not recorder.claim(9.9)
+    assert recorder.claim(10.0) and recorder.claim(11.0)
+    assert recorder.done(11.0)
+    assert Recorder(start=10.0, end=20.0).done(20.0)
+
+    recorder.add("jobs", 10.0, 10.25, "200", True)
+    recorder.add("jobs", 11.0, 11.5, "500", False)
+    assert recorder.samples["jobs"] == [250.0, 500.0]
+    assert recorder.statuses["jobs"] == {"200": 1, "500": 1}
+    assert (recorder.errors["jobs"], recorder.last_finished) == (1, 11.5)
+
+
+# -------------------------------------------------------------------
+# A run
+# -------------------------------------------------------------------
+def load_args(**overrides):
+    args = {"users": 3, "jobs": 12, "saved_per_user": 2, "applications_per_user": 1, "concurrency": 4,
+            "duration": 30.0, "warmup": 0.0, "requests": 40, "seed": 17}
+    args.update(overrides)
+    return Namespace(**args)
+
+
+def test_seeded_run_reports_every_scenario_it_drove(db, monkeypatch):
+    from app.main import app
+
+    # seed() points FindWork at the stand-in; put it back afterwards
+    monkeypatch.setattr(settings, "FINDWORK_API_URL", settings.FINDWORK_API_URL)
+    monkeypatch.setattr(settings, "FINDWORK_RATE_PER_SECOND", settings.FINDWORK_RATE_PER_SECOND)
+    args = load_args()
+    mix = parse_mix("jobs=3,search=2,job_detail=2,apply_list=1,apply_check=1,apply_add=1,applications=1")
+
+    async def scenario():
+        with MockFindWork(args.jobs, page_size=5, seed=args.seed) as findwork:
+            seeded = await seed(db, args, findwork, random.Random(args.seed))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            results = await drive(client, seeded, mix, args, "regex")
+        return seeded["report"], results
+
+    seeded, results = asyncio.run(scenario())
+
+    assert (seeded["jobs"], seeded["users"], seeded["saved"], seeded["applications"]) == (12, 3, 6, 3)
+    overall = results["overall"]
+    assert overall["requests"] == 40
+    assert overall["errors"] == 0
+    assert set(results["scenarios"]) <= set(mix)
+    assert sum(s["requests"] for s in results["scenarios"].values()) == 40
+    assert overall["latency_ms"]["p50"] <= overall["latency_ms"]["p95"] <= overall["latency_ms"]["p99"]
+
+
+# -------------------------------------------------------------------
+# Baseline comparison
+# -------------------------------------------------------------------
+def report(rps, p95, errors=0, requests=100, **scenarios):
+    def row(p95, errors=0, requests=requests):
+        return {"requests": requests, "errors": errors, "throughput_rps": rps,
+                "latency_ms": {"p50": p95 / 2, "p95": p95, "p99": p95 * 2}}
+    return {"commit": "abc", "overall": row(p95, errors),
+            "scenarios": {name: row(*values) for name, values in scenarios.items()}}
+
+
+def test_a_run_within_tolerance_has_no_regressions():
+    comparison = compare(report(95, 11, jobs=(11,)), report(100, 10, jobs=(10,)), tolerance=0.2)
+
+    assert comparison["regressions"] == []
+    assert comparison["baseline_commit"] == "abc"
+    assert comparison["scenarios"]["jobs"]["p95_ratio"] == 1.1
+    assert comparison["scenarios"]["overall"]["throughput_ratio"] == 0.95
+
+
+def test_slower_p95_lower_throughput_and_new_errors_are_regressions():
+    current = report(70, 10, jobs=(15,), login=(10, 2))
+    baseline = report(100, 10, jobs=(10,), login=(10,))
+
+    assert compare(current, baseline, tolerance=0.2)["regressions"] == [
+        "jobs: p95 x1.50", "login: 2 errors (was 0)", "overall: throughput x0.70"]
+
+
+def test_p95_of_a_scenario_with_few_samples_is_not_held_to_the_tolerance():
+    current = report(100, 10, rare=(50, 0, 5))
+    baseline = report(100, 10, rare=(10, 0, 5))
+
+    comparison = compare(current, baseline, tolerance=0.2)
+
+    assert comparison["regressions"] == []
+    assert comparison["scenarios"]["rare"]["p95_ratio"] == 5.0
@@ -0,0 +1,121 @@
+"""The in-process job matrix: ranking, incremental upserts and syncing from Mongo."""
+import asyncio
+
+from app.ingest import build_job_doc
+from app.matching import JobMatrix
+
+
+def jobs(posting, *roles):
+    return [build_job_doc(posting(i, role=role, description=f"<p>{role}</p>"))
+            for i, role in enumerate(roles, start=1)]
+
+
+def recording_to_thread(calls):
+    real = asyncio.to_thread
+
+    async def to_thread(func, *args, **kwargs):
+        calls.append(getattr(func, "__name__", repr(func)))
+        return await real(func, *args, **kwargs)
+    return to_thread
+
+
+def test_upsert_async_rebuilds_the_column_copy_off_the_loop(posting, monkeypatch):
+    matrix = JobMatrix(n_features=2 ** 12)
+    converted = []
+    monkeypatch.setattr(asyncio, "to_thread", recording_to_thread(converted))
+
+    asyncio.run(matrix.upsert_async(jobs(posting, "Python Engineer", "Rust Engineer")))
+
+    assert matrix._csc is not None
+    assert "tocsc" in converted
+
+
+def test_top_k_does_not_convert_on_the_request_path(posting):
+    matrix = JobMatrix(n_features=2 ** 12)
+    matrix.upsert(jobs(posting, "Python Engineer", "Rust Engineer", "Python Data Engineer"))
+    assert matrix._csc is None
+
+    from_rows = matrix.top_k(["python"], 3)
+    assert matrix._csc is None
+    asyncio.run(matrix.reindex())
+    from_columns = matrix.top_k(["python"], 3)
+
+    assert [r["job_id"] for r in from_rows] == [r["job_id"] for r in from_columns]
+    assert [round(r["similarity"], 5) for r in from_rows] == [round(r["similarity"], 5) for r in from_columns]
+    assert {r["job_id"] for r in from_rows[:2]} == {"1", "3"}
+
+
+def ranking(matrix, skills, k=10):
+    return [(r["job_id"], round(r["similarity"], 5), r["matched_skills"]) for r in matrix.top_k(skills, k)]
+
+
+def test_top_k_ranks_the_whole_catalog_deterministically(posting):
+    matrix = JobMatrix(n_features=2 ** 12)
+    matrix.upsert(jobs(posting, "Machine Learning Engineer", "Python Engineer", "Learning Designer",
+                       "Python Machine Learning Engineer", "Accountant"))
+
+    results = matrix.top_k(["python", "machine learning"], 10)
+
+    assert results == matrix.top_k(["python", "machine learning"], 10)
+    assert results[0]["job_id"] == "4"
+    assert results[0]["matched_skills"] == ["python", "machine learning"]
+    # "machine learning" needs the bigram; job 3 only has "learning"
+    assert {r["job_id"]: r["matched_skills"] for r in results}["3"] == []
+    assert [r["job_id"] for r in matrix.top_k(["python"], 2)] == ["2", "4"]
+
+
+def test_replaced_jobs_rank_like_a_fresh_build(posting):
+    matrix = JobMatrix(n_features=2 ** 12)
+    matrix.upsert(jobs(posting, "Python Engineer", "Rust Engineer", "Go Engineer"))
+    matrix.upsert(jobs(posting, "Python Engineer", "Python Rust Engineer")[1:2])
+    fresh = JobMatrix(n_features=2 ** 12)
+    fresh.upsert(jobs(posting, "Python Engineer", "Python Rust Engineer", "Go Engineer"))
+
+    assert len(matrix) == 3
+    assert (matrix._df == fresh._df).all()
+    assert ranking(matrix, ["python", "rust"]) == ranking(fresh, ["python", "rust"])
+
+
+def test_unchanged_jobs_are_not_appended_again(posting):
+    matrix = JobMatrix(n_features=2 ** 12)
+    batch = jobs(posting, "Python Engineer", "Rust Engineer")
+    matrix.upsert(batch)
+    version = matrix.version
+
+    matrix.upsert(batch)
+
+    assert matrix._rows.shape[0] == 2
+    assert matrix.version == version
+
+
+def test_replaced_rows_are_compacted(posting):
+    matrix = JobMatrix(n_features=2 ** 12)
+    matrix.upsert(jobs(posting, *[f"Engineer {i}" for i in range(10)]))
+    for generation in range(3):
+        matrix.upsert(jobs(posting, *[f"Python Engineer {generation} {i}" for i in range(10)])[:1])
+
+    # Three dead rows out of thirteen would be over a fifth
+    assert matrix._rows.shape[0] == len(matrix) == 10
+    assert matrix._alive.all()
+    assert [r["job_id"] for r in matrix.top_k(["python"], 1)] == ["1"]
+
+
+def test_sync_picks_up_jobs_written_since_the_last_sync(db, posting):
+    from app.ingest import write_jobs
+    from app.matching import job_matrix
+
+    async def scenario():
+        await write_jobs([posting(1, role="Python Engineer"), posting(2, role="Rust Engineer")])
+        await job_matrix.sync(force=True)
+        synced = len(job_matrix)
+        # Another worker's ingest: straight to Mongo, not through this process's matrix
+        job_matrix.ready = False
+        await write_jobs([posting(3, role="Python Data Engineer")])
+        job_matrix.ready = True
+        await job_matrix.sync(force=True)
+        return synced, job_matrix.top_k(["python"], 5)
+
+    synced, results = asyncio.run(scenario())
+
+    assert synced == 2
+    assert {r["job_id"] for r in results[:2]} == {"1", "3"}
@@ -0,0 +1,106 @@
+"""GET /metrics and structured logging."""
+import asyncio
+import io
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.ingest import write_jobs
+from app.logs import ROOT_LOGGER, configure_logging, get_logger
+from app.metrics import MongoCommandMetrics, timed_job
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_counted_per_route_template(api, posting):
+    labels = {"method": "GET", "route": "/jobs/{job_id}"}
+    before = (sample("workscope_http_requests_total", status="200", **labels),
+              sample("workscope_http_requests_total", status="404", **labels),
+              sample("workscope_http_request_duration_seconds_count", **labels))
+
+    async def scenario():
+        await write_jobs([posting(1), posting(2)])
+        for job_id in ("1", "2", "missing"):
+            await api("GET", f"/jobs/{job_id}")
+        return await api("GET", "/metrics")
+
+    scraped = asyncio.run(scenario())
+
+    after = (sample("workscope_http_requests_total", status="200", **labels),
+             sample("workscope_http_requests_total", status="404", **labels),
+             sample("workscope_http_request_duration_seconds_count", **labels))
+    assert [b - a for a, b in zip(before, after)] == [2, 1, 3]
+    assert scraped.status_code == 200
+    assert 'workscope_cache_hits_total{cache="principals"}' in scraped.text
+
+
+def test_scheduled_jobs_record_duration_and_outcome():
+    @timed_job("test_job")
+    async def job(fail):
+        if fail:
+            raise RuntimeError("boom")
+        return "done"
+
+    ok, error = sample("workscope_scheduler_job_runs_total", job="test_job", outcome="ok"), \
+        sample("workscope_scheduler_job_runs_total", job="test_job", outcome="error")
+
+    assert asyncio.run(job(False)) == "done"
+    with pytest.raises(RuntimeError):
+        asyncio.run(job(True))
+
+    assert sample("workscope_scheduler_job_runs_total", job="test_job", outcome="ok") == ok + 1
+    assert sample("workscope_scheduler_job_runs_total", job="test_job", outcome="error") == error + 1
+    assert sample("workscope_scheduler_job_duration_seconds_count", job="test_job") >= 2
+
+
+def test_mongo_commands_are_timed_per_collection():
+    listener = MongoCommandMetrics()
+    labels = {"collection": "test_jobs", "command": "find"}
+    before = sample("workscope_mongo_command_duration_seconds_count", **labels)
+    failures = sample("workscope_mongo_command_failures_total", **labels)
+
+    for request_id, outcome in ((1, listener.succeeded), (2, listener.failed)):
+        listener.started(SimpleNamespace(command_name="find", command={"find": "test_jobs"},
+                                         connection_id=("localhost", 27017), request_id=request_id))
+        outcome(SimpleNamespace(command_name="find", connection_id=("localhost", 27017),
+                                request_id=request_id, duration_micros=1500))
+
+    assert sample("workscope_mongo_command_duration_seconds_count", **labels) == before + 2
+    assert sample("workscope_mongo_command_failures_total", **labels) == failures + 1
+
+
+@pytest.fixture
+def log_output():
+    """Application log lines as configured by configure_logging(); restored afterwards."""
+    root = logging.getLogger(ROOT_LOGGER)
+    saved = (root.handlers[:], root.level, root.propagate)
+    stream = io.StringIO()
+    yield stream
+    root.handlers[:], root.level, root.propagate = saved
+
+
+def test_json_logs_carry_extra_fields_and_skip_disabled_levels(log_output):
+    configure_logging(level="INFO", fmt="json", stream=log_output)
+    logger = get_logger("app.tests")
+    formatted = []
+
+    class Expensive:
+        def __str__(self):
+            formatted.append(True)
+            return "expensive"
+
+    logger.debug("not formatted: %s", Expensive())
+    logger.info("Ingest finished in %.1fs", 1.5, extra={"inserted": 3})
+
+    lines = [json.loads(line) for line in log_output.getvalue().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["level"] == "info"
+    assert lines[0]["logger"] == "workscope.app.tests"
+    assert lines[0]["msg"] == "Ingest finished in 1.5s"
+    assert lines[0]["inserted"] == 3
+    assert formatted == []
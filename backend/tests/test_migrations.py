@@ -0,0 +1,76 @@
+"""One-time migrations and the unique indexes they clear the way for."""
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from app.indexes import ensure_indexes
+from app.migrations import run_migrations
+
+
+def oid(n: int) -> ObjectId:
+    # Ascending ids: lower n is the older document
+    return ObjectId(f"{n:024x}")
+
+
+async def seed_duplicates(db):
+    await db.users.insert_many([
+        {"_id": oid(1), "email": "ada@example.com", "name": "first"},
+        {"_id": oid(2), "email": "ada@example.com", "name": "second"},
+    ])
+    await db.jobs.insert_many([
+        {"_id": oid(10), "job_id": "1", "title": "older"},
+        {"_id": oid(11), "job_id": "1", "title": "newer"},
+        {"_id": oid(12), "title": "no job_id"},
+        {"_id": oid(13), "title": "no job_id either"},
+    ])
+    await db.apply_later.insert_many([
+        {"_id": oid(20), "user_id": str(oid(1)), "job_id": "1", "status": "pending"},
+        {"_id": oid(21), "user_id": str(oid(1)), "job_id": "1", "status": "applied"},
+        # The duplicate user's save moves to the kept user and then collides with oid(20)
+        {"_id": oid(22), "user_id": str(oid(2)), "job_id": "1"},
+        {"_id": oid(23), "user_id": str(oid(2)), "job_id": "2"},
+    ])
+
+
+def test_unique_indexes_fail_startup_while_duplicates_remain(db):
+    async def scenario():
+        await seed_duplicates(db)
+        await ensure_indexes(db)
+
+    with pytest.raises(RuntimeError, match="apply_later_user_job_unique"):
+        asyncio.run(scenario())
+
+
+def test_dedupe_keeps_the_oldest_document_per_unique_key(db):
+    async def scenario():
+        await seed_duplicates(db)
+        results = await run_migrations(db)
+        await ensure_indexes(db)
+        users = await db.users.find().to_list(None)
+        jobs = await db.jobs.find({}, {"job_id": 1, "title": 1}).sort("_id", 1).to_list(None)
+        saves = await db.apply_later.find({}, {"user_id": 1, "job_id": 1}).sort("_id", 1).to_list(None)
+        return results, users, jobs, saves
+
+    results, users, jobs, saves = asyncio.run(scenario())
+
+    # The reconcile migration runs first and collapses oid(21); oid(22) collides once its user is merged
+    assert results["2026_10_reconcile_saved_jobs"]["duplicates_removed"] == 1
+    assert results["2026_10_dedupe_unique_keys"] == {
+        "jobs_backfilled": 2, "jobs_removed": 1, "users_removed": 1, "apply_later_removed": 1}
+    assert [user["name"] for user in users] == ["first"]
+    assert [(job["job_id"], job["title"]) for job in jobs] == [
+        ("1", "older"), (str(oid(12)), "no job_id"), (str(oid(13)), "no job_id either")]
+    assert [(save["_id"], save["job_id"]) for save in saves] == [(oid(20), "1"), (oid(23), "2")]
+    assert {save["user_id"] for save in saves} == {str(oid(1))}
+
+
+def test_dedupe_is_idempotent(db):
+    async def scenario():
+        await seed_duplicates(db)
+        await run_migrations(db)
+        return await run_migrations(db, force=True)
+
+    again = asyncio.run(scenario())["2026_10_dedupe_unique_keys"]
+
+    assert again == {"jobs_backfilled": 0, "jobs_removed": 0, "users_removed": 0, "apply_later_removed": 0}
@@ -0,0 +1,202 @@
+"""New-job match fan-out, the notification inbox and stream, and stream authentication."""
+import asyncio
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.config import settings
+from app.ingest import build_job_doc, ingest_sources
+from app.matching import SkillIndex
+from app.notifications import (
+    STREAM_TICKET_AUDIENCE, JobMatchFanout, insert_notifications, match_notification, notification_events,
+    stream_user_id,
+)
+from app.sources import FileSource
+from app.utils import create_access_token
+
+
+# -------------------------------------------------------------------
+# Fan-out
+# -------------------------------------------------------------------
+def board_file(tmp_path, *titles):
+    path = tmp_path / "board.jsonl"
+    path.write_bytes(b"\n".join(orjson.dumps({"id": f"j{i}", "title": title, "company_name": "Acme"})
+                                for i, title in enumerate(titles, start=1)))
+    return str(path)
+
+
+def test_ingest_sends_one_digest_per_matched_user(db, add_user, tmp_path):
+    path = board_file(tmp_path, "Python SQL Analyst", "Python Machine Learning SQL Engineer",
+                      "Rust Engineer", "Python Engineer")
+
+    async def scenario():
+        ada, _ = await add_user("ada@example.com", skills=["Python", "machine learning", "SQL"])
+        bob, _ = await add_user("bob@example.com", skills=["rust"])
+        await add_user("carol@example.com", skills=["cobol", "fortran"])
+        first = await ingest_sources([FileSource(path, "board")])
+        again = await ingest_sources([FileSource(path, "board")])
+        docs = {doc["user_id"]: doc async for doc in db.notifications.find()}
+        return ada, bob, first, again, docs
+
+    ada, bob, first, again, docs = asyncio.run(scenario())
+
+    assert (first["notifications"]["users"], first["notifications"]["notifications"]) == (2, 2)
+    assert set(docs) == {ada, bob}
+    # Two of ada's skills are needed; "Python Engineer" alone doesn't count
+    assert docs[ada]["match_count"] == 2
+    assert docs[ada]["title"] == "2 new jobs match your skills"
+    assert docs[ada]["job_ids"] == ["board:j2", "board:j1"]
+    assert docs[ada]["matched_skills"] == ["machine learning", "python", "sql"]
+    # bob lists one skill, so one is enough
+    assert (docs[bob]["match_count"], docs[bob]["job_ids"]) == (1, ["board:j3"])
+    assert docs[bob]["title"] == "New job matches your skills"
+    # Nothing new the second time, so nobody is notified again
+    assert again["inserted"] == 0
+    assert again["notifications"]["notifications"] == 0
+
+
+def test_fanout_keeps_the_best_jobs_earliest_first_on_ties(monkeypatch, posting):
+    monkeypatch.setattr(settings, "NOTIFY_MATCH_MAX_JOBS", 2)
+    index = SkillIndex()
+    index.set_user("u1", ["python", "rust"])
+    index.set_user("u2", ["go"])
+    fanout = JobMatchFanout(index)
+
+    fanout.add([build_job_doc(posting(1, role="Python Rust Engineer", description="<p>x</p>"))])
+    fanout.add([build_job_doc(posting(i, role=role, description="<p>x</p>"))
+                for i, role in [(2, "Python Engineer"), (3, "Rust Python Engineer"), (4, "Python Rust Lead")]])
+    digests = {doc["user_id"]: doc for doc in fanout.digests(datetime.utcnow())}
+
+    assert set(digests) == {"u1"}
+    assert digests["u1"]["match_count"] == 3
+    assert digests["u1"]["job_ids"] == ["1", "3"]
+    assert digests["u1"]["message"].endswith(" and 1 more.")
+
+
+def test_fanout_is_off_when_disabled(db, add_user, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_NEW_JOB_MATCHES", False)
+    path = board_file(tmp_path, "Rust Engineer")
+
+    async def scenario():
+        await add_user(skills=["rust"])
+        stats = await ingest_sources([FileSource(path, "board")])
+        return stats, await db.notifications.count_documents({})
+
+    stats, stored = asyncio.run(scenario())
+
+    assert stats["inserted"] == 1
+    assert stats["notifications"] is None
+    assert stored == 0
+
+
+# -------------------------------------------------------------------
+# Inbox and stream
+# -------------------------------------------------------------------
+def digest_for(user_id, job_id):
+    return match_notification(user_id, 1, [(job_id, f"Job {job_id}")], ["python"], datetime.utcnow())
+
+
+def test_inbox_lists_newest_first_and_marks_read(db, api, add_user):
+    async def scenario():
+        user_id, token = await add_user()
+        other_id, other_token = await add_user("bob@example.com")
+        await insert_notifications([digest_for(user_id, "1"), digest_for(user_id, "2"), digest_for(other_id, "3")])
+        listed = (await api("GET", "/notifications", token=token)).json()
+        marked = await api("PUT", f"/notifications/{listed[0]['id']}/read", token=token)
+        not_theirs = await api("PUT", f"/notifications/{listed[1]['id']}/read", token=other_token)
+        unread = (await api("GET", "/notifications?unread=true", token=token)).json()
+        older = (await api("GET", f"/notifications?before={listed[0]['id']}", token=token)).json()
+        return listed, marked, not_theirs, unread, older
+
+    listed, marked, not_theirs, unread, older = asyncio.run(scenario())
+
+    assert [n["job_ids"] for n in listed] == [["2"], ["1"]]
+    assert marked.status_code == 200
+    assert not_theirs.status_code == 404
+    assert [n["job_ids"] for n in unread] == [["1"]]
+    assert [n["job_ids"] for n in older] == [["1"]]
+
+
+class OpenRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_new_notification_wakes_an_open_stream(db, monkeypatch):
+    # Long enough that only the hub's wake-up can deliver in time
+    monkeypatch.setattr(settings, "NOTIFY_STREAM_POLL_SECONDS", 30.0)
+
+    async def scenario():
+        events = notification_events(OpenRequest(), "u1", ObjectId())
+        retry = await events.__anext__()
+        pending = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0.05)
+        await insert_notifications([digest_for("u2", "9"), digest_for("u1", "7")])
+        event = await asyncio.wait_for(pending, 2)
+        await events.aclose()
+        return retry, event
+
+    retry, event = asyncio.run(scenario())
+
+    assert retry == b"retry: 30000\n\n"
+    assert b"event: notification" in event
+    data = orjson.loads(event.split(b"data: ", 1)[1])
+    assert data["job_ids"] == ["7"]
+
+
+# -------------------------------------------------------------------
+# Stream authentication
+# -------------------------------------------------------------------
+
+
+def test_stream_ticket_opens_the_stream_for_its_user(db, api, add_user):
+    async def scenario():
+        user_id, token = await add_user()
+        issued = await api("POST", "/notifications/stream/ticket", token=token)
+        return user_id, issued, await stream_user_id(None, issued.json()["ticket"])
+
+    user_id, issued, streaming = asyncio.run(scenario())
+
+    assert issued.status_code == 200
+    assert streaming == user_id
+
+
+def test_stream_refuses_the_access_token_in_the_query_string(db, api, add_user):
+    async def scenario():
+        _, token = await add_user()
+        as_access_token = await api("GET", f"/notifications/stream?access_token={token}")
+        as_ticket = await api("GET", f"/notifications/stream?ticket={token}")
+        return as_access_token, as_ticket
+
+    as_access_token, as_ticket = asyncio.run(scenario())
+
+    assert as_access_token.status_code == 401
+    assert as_ticket.status_code == 401
+
+
+def test_ticket_is_not_an_access_token(db, api, add_user):
+    async def scenario():
+        _, token = await add_user()
+        ticket = (await api("POST", "/notifications/stream/ticket", token=token)).json()["ticket"]
+        return await api("GET", "/notifications", token=ticket)
+
+    assert asyncio.run(scenario()).status_code == 401
+
+
+def test_expired_ticket_is_refused(db, add_user):
+    async def scenario():
+        user_id, _ = await add_user()
+        expired = create_access_token(user_id, expires_delta=timedelta(seconds=-1),
+                                      claims={"aud": STREAM_TICKET_AUDIENCE})
+        await stream_user_id(None, expired)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 401
+
+
+def test_ticket_needs_a_signed_in_user(db, api):
+    assert asyncio.run(api("POST", "/notifications/stream/ticket")).status_code == 401
@@ -0,0 +1,59 @@
+"""Keyset pagination of GET /jobs."""
+import asyncio
+
+from app.ingest import write_jobs
+
+DATES = ["2026-03-01T00:00:00Z", "2026-02-01T00:00:00Z", "2026-02-01T00:00:00Z", None,
+         "2026-01-01T00:00:00Z", "2026-02-01T00:00:00Z", None]
+
+
+def seed(posting):
+    return write_jobs([posting(i, created_at=date) for i, date in enumerate(DATES, start=1)])
+
+
+def ids(response):
+    return [job["_id"] for job in response.json()]
+
+
+def test_keyset_pages_match_offset_pages(api, posting):
+    async def scenario():
+        await seed(posting)
+        keyset, offset, cursor = [], [], None
+        for page in range(4):
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = await api("GET", "/jobs/", params=params)
+            keyset.append(ids(response))
+            cursor = response.headers.get("X-Next-Cursor")
+            offset.append(ids(await api("GET", "/jobs/", params={"limit": 2, "offset": page * 2})))
+        return keyset, offset, cursor
+
+    keyset, offset, cursor = asyncio.run(scenario())
+
+    assert keyset == offset
+    assert sum(len(page) for page in keyset) == len(DATES)
+    assert len(set(sum(keyset, []))) == len(DATES)
+    # The last page is short, so it hands out no cursor
+    assert cursor is None
+
+
+def test_jobs_without_a_date_sort_last(api, posting):
+    async def scenario():
+        await seed(posting)
+        first = await api("GET", "/jobs/", params={"limit": 5})
+        rest = await api("GET", "/jobs/", params={"limit": 5, "cursor": first.headers["X-Next-Cursor"]})
+        return first.json() + rest.json()
+
+    jobs = asyncio.run(scenario())
+
+    # Cards render a missing date as ""
+    dates = [job["date_posted"] for job in jobs]
+    assert dates[-2:] == ["", ""]
+    assert dates[:-2] == sorted(dates[:-2], reverse=True)
+
+
+def test_a_malformed_cursor_is_a_bad_request(api):
+    async def scenario():
+        return [(await api("GET", "/jobs/", params={"cursor": cursor})).status_code
+                for cursor in ("not-base64!", "W10", "eyJpIjoibm9wZSJ9")]
+
+    assert asyncio.run(scenario()) == [400, 400, 400]
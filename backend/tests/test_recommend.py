@@ -0,0 +1,98 @@
+"""GET /recommended-jobs ranking and conditional requests."""
+import asyncio
+from datetime import datetime
+
+from app.http_cache import bump_catalog_version
+from app.ingest import build_job_doc, write_jobs
+from app.matching import job_matrix
+
+
+def test_etag_is_the_same_on_every_worker(db, api, add_user, posting):
+    async def scenario():
+        _, token = await add_user(skills=["python"])
+        await write_jobs([posting(1, role="Python Engineer")])
+        first = await api("GET", "/recommended-jobs", token=token)
+        # A second worker: same catalog, its own matrix built from scratch
+        job_matrix.__init__(job_matrix.n_features)
+        job_matrix.version = 41
+        second = await api("GET", "/recommended-jobs", token=token)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.json() == second.json()
+
+
+def test_first_response_after_another_workers_ingest_has_the_new_tag_and_body(db, api, add_user, posting):
+    async def scenario():
+        _, token = await add_user(skills=["python"])
+        await write_jobs([posting(1, role="Python Engineer")])
+        before = await api("GET", "/recommended-jobs", token=token)
+
+        # Written by another worker: this worker's matrix only learns of it through the catalog version
+        doc = build_job_doc(posting(2, role="Senior Python Engineer"))
+        await db.jobs.insert_one({**doc, "updated_at": datetime.utcnow()})
+        await bump_catalog_version()
+
+        after = await api("GET", "/recommended-jobs", token=token,
+                          headers={"If-None-Match": before.headers["etag"]})
+        again = await api("GET", "/recommended-jobs", token=token,
+                          headers={"If-None-Match": after.headers["etag"]})
+        return before, after, again
+
+    before, after, again = asyncio.run(scenario())
+
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert "2" in {job["job_id"] for job in after.json()}
+    assert again.status_code == 304
+
+
+def test_a_skills_edit_changes_the_tag(db, api, add_user, posting):
+    async def scenario():
+        _, token = await add_user(skills=["python"])
+        await write_jobs([posting(1, role="Python Engineer"), posting(2, role="Rust Engineer")])
+        before = await api("GET", "/recommended-jobs", token=token)
+        edited = await api("PUT", "/auth/skills", token=token, json=["rust"])
+        after = await api("GET", "/recommended-jobs", token=edited.json()["access_token"],
+                          headers={"If-None-Match": before.headers["etag"]})
+        return before, after
+
+    before, after = asyncio.run(scenario())
+
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json()[0]["job_id"] == "2"
+
+
+def cache_stats(response):
+    stats = response.json()["cache"]
+    return stats["hits"], stats["misses"]
+
+
+def test_rankings_are_cached_until_skills_or_the_catalog_change(db, api, add_user, posting):
+    async def scenario():
+        _, token = await add_user(skills=["python"])
+        await write_jobs([posting(1, role="Python Engineer")])
+        seen = [cache_stats(await api("GET", "/recommended-jobs/cache-stats"))]
+        await api("GET", "/recommended-jobs", token=token)
+        await api("GET", "/recommended-jobs", token=token)
+        seen.append(cache_stats(await api("GET", "/recommended-jobs/cache-stats")))
+
+        token = (await api("PUT", "/auth/skills", token=token, json=["python", "rust"])).json()["access_token"]
+        await api("GET", "/recommended-jobs", token=token)
+        seen.append(cache_stats(await api("GET", "/recommended-jobs/cache-stats")))
+
+        await write_jobs([posting(2, role="Rust Engineer")])
+        ranked = await api("GET", "/recommended-jobs", token=token)
+        seen.append(cache_stats(await api("GET", "/recommended-jobs/cache-stats")))
+        return seen, ranked
+
+    seen, ranked = asyncio.run(scenario())
+
+    # (hits, misses) since the start: a hit on the second read, then a miss after each change
+    hits, misses = seen[0]
+    assert [(h - hits, m - misses) for h, m in seen[1:]] == [(1, 1), (1, 2), (1, 3)]
+    assert {job["job_id"] for job in ranked.json()} == {"1", "2"}
@@ -0,0 +1,56 @@
+"""orjson responses and pre-rendered card JSON."""
+import asyncio
+from datetime import datetime
+
+import orjson
+from bson import ObjectId
+
+from app.ingest import build_job_doc, write_jobs
+from app.responses import FastJSONResponse, dumps, json_array
+from app.serializers import project_doc, serialize_job, splice_card
+
+
+def test_dumps_handles_object_ids_and_datetimes():
+    oid = ObjectId()
+
+    encoded = dumps({"_id": oid, "at": datetime(2026, 10, 1, 12), 1: b"bytes"})
+
+    assert orjson.loads(encoded) == {"_id": str(oid), "at": "2026-10-01T12:00:00", "1": "bytes"}
+    assert FastJSONResponse({"_id": oid}).body == dumps({"_id": oid})
+
+
+def test_spliced_card_equals_the_serialized_card(posting):
+    doc = build_job_doc(posting(1, salary="100k"))
+    doc["_id"] = ObjectId()
+    extra = {"_id": str(doc["_id"]), "id": str(doc["_id"]), "score": 1.5}
+
+    spliced = orjson.loads(splice_card(doc["card_json"], extra))
+
+    assert spliced == {**extra, **serialize_job(project_doc(doc, "card"), "card")}
+    assert list(spliced)[:3] == ["_id", "id", "score"]
+
+
+def test_splicing_handles_empty_objects():
+    assert splice_card(b'{"a":1}', {}) == b'{"a":1}'
+    assert splice_card(b"{}", {"a": 1}) == b'{"a":1}'
+    assert json_array([b"1", b"2"]) == b"[1,2]"
+
+
+def test_list_endpoints_serve_the_stored_card_bytes(db, api, add_user, posting):
+    async def scenario():
+        user_id, token = await add_user()
+        await write_jobs([posting(1), posting(2)])
+        await db.apply_later.insert_one({"user_id": user_id, "job_id": "1", "saved_at": datetime(2026, 10, 1)})
+        stored = await db.jobs.find_one({"job_id": "1"})
+        listed = await api("GET", "/jobs/")
+        saved = await api("GET", "/apply/list", token=token)
+        return stored, listed, saved
+
+    stored, listed, saved = asyncio.run(scenario())
+
+    card = orjson.loads(stored["card_json"])
+    page = {job["job_id"]: job for job in listed.json()}
+    assert listed.headers["content-type"] == "application/json"
+    assert page["1"] == {"_id": str(stored["_id"]), "id": str(stored["_id"]), **card}
+    assert saved.json()["jobs"] == [{"_id": str(stored["_id"]), "id": str(stored["_id"]), "isSaved": True,
+                                     "saved_at": "2026-10-01T00:00:00", **card}]
@@ -0,0 +1,99 @@
+"""The deadline reminder sweep."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app import scheduler
+from app.config import settings
+from app.scheduler import check_deadlines_and_notify
+
+
+@pytest.fixture
+def pushes(monkeypatch):
+    """(token, title, body) of every push sent; tokens starting with "fail" raise."""
+    sent = []
+
+    async def send_push_notification(token, title, body):
+        await asyncio.sleep(0.01)
+        if token.startswith("fail"):
+            raise RuntimeError("push service unavailable")
+        sent.append((token, title, body))
+        return True
+    monkeypatch.setattr(scheduler, "send_push_notification", send_push_notification)
+    return sent
+
+
+async def seed(db, users):
+    """Jobs due today (datetime), tomorrow (ISO string) and next week; `users` maps fcm_token -> saved job ids."""
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    await db.jobs.insert_many([
+        {"job_id": "today", "title": "Python Engineer", "company_name": "Acme", "last_date": today},
+        {"job_id": "tomorrow", "title": "Rust Engineer", "company_name": "Initech",
+         "last_date": (today + timedelta(days=1)).date().isoformat()},
+        {"job_id": "later", "title": "Go Engineer", "company_name": "Globex", "last_date": today + timedelta(days=7)},
+    ])
+    for fcm_token, job_ids in users.items():
+        user_id = ObjectId()
+        await db.users.insert_one({"_id": user_id, "email": f"{user_id}@example.com", "fcm_token": fcm_token})
+        await db.apply_later.insert_many([{"user_id": str(user_id), "job_id": job_id} for job_id in job_ids])
+
+
+def test_one_reminder_per_user_for_jobs_due_today_or_tomorrow(db, pushes):
+    async def scenario():
+        await seed(db, {"ada": ["today", "tomorrow", "later"], "bob": ["tomorrow"], None: ["today"],
+                        "carol": ["later"]})
+        return await check_deadlines_and_notify()
+
+    stats = asyncio.run(scenario())
+
+    assert {key: stats[key] for key in ("window_jobs", "saved_rows", "users", "sent", "no_token", "failed")} == {
+        "window_jobs": 2, "saved_rows": 4, "users": 3, "sent": 2, "no_token": 1, "failed": 0}
+    by_token = {token: (title, body) for token, title, body in pushes}
+    assert set(by_token) == {"ada", "bob"}
+    assert by_token["ada"][0] == "Apply Reminders"
+    assert by_token["ada"][1].startswith("2 saved jobs have deadlines approaching")
+    assert by_token["bob"] == ("Apply Reminder", "Deadline for Rust Engineer at Initech is approaching.")
+
+
+def test_users_are_notified_in_batches_under_the_concurrency_limit(db, pushes, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "NOTIFY_CONCURRENCY", 2)
+    batches, in_flight, peak = [], [0], [0]
+    notify_users, send = scheduler._notify_users, scheduler.send_push_notification
+
+    async def recording_notify(pending, stats, semaphore):
+        batches.append(len(pending))
+        await notify_users(pending, stats, semaphore)
+
+    async def counting_send(*args):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        try:
+            return await send(*args)
+        finally:
+            in_flight[0] -= 1
+    monkeypatch.setattr(scheduler, "_notify_users", recording_notify)
+    monkeypatch.setattr(scheduler, "send_push_notification", counting_send)
+
+    async def scenario():
+        await seed(db, {f"user{i}": ["today"] for i in range(5)})
+        return await check_deadlines_and_notify()
+
+    stats = asyncio.run(scenario())
+
+    assert sorted(batches, reverse=True) == [2, 2, 1]
+    assert stats["sent"] == 5
+    assert peak[0] == 2
+
+
+def test_a_failed_push_is_counted_and_the_rest_still_go_out(db, pushes):
+    async def scenario():
+        await seed(db, {"fail-1": ["today"], "ada": ["today"]})
+        return await check_deadlines_and_notify()
+
+    stats = asyncio.run(scenario())
+
+    assert (stats["sent"], stats["failed"]) == (1, 1)
+    assert [token for token, _, _ in pushes] == ["ada"]
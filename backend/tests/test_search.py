@@ -0,0 +1,98 @@
+"""Job search: the default title regex, prefix search and ranked text search."""
+import asyncio
+import re
+
+import pytest
+from fastapi import HTTPException
+
+from app.ingest import write_jobs
+from app.search import build_text_query, parse_fields, search_tokens, tokenize
+
+
+def titles(response):
+    return [job["title"] for job in response.json()]
+
+
+def search(api, posting, params, jobs=None):
+    async def scenario():
+        await write_jobs(jobs or [
+            posting(1, role="Senior Python Developer", company_name="Acme"),
+            posting(2, role="Go Engineer", company_name="Pythonic Labs", text="python", description="python"),
+            posting(3, role="Data Engineer", company_name="Initech", text="spark", description="spark"),
+        ])
+        return await api("GET", "/jobs/", params=params)
+
+    return asyncio.run(scenario())
+
+
+# -------------------------------------------------------------------
+# Query building
+# -------------------------------------------------------------------
+def test_tokenize_keeps_language_names_whole():
+    assert tokenize("C++ / C# and Node.js, Python3") == ["c++", "c#", "and", "node.js", "python3"]
+    assert search_tokens("Python Dev", "Acme") == ["company:acme", "title:dev", "title:python"]
+
+
+def test_text_query_is_ranked_by_text_score():
+    query, projection, sort = build_text_query("python developer", parse_fields(None))
+
+    assert query == {"$text": {"$search": "python developer"}}
+    assert projection == {"score": {"$meta": "textScore"}}
+    assert sort == [("score", {"$meta": "textScore"})]
+
+
+def test_narrow_fields_require_each_term_in_a_selected_field():
+    query, _, _ = build_text_query("python", parse_fields("title,company"))
+
+    assert query["$and"] == [{"$or": [
+        {"title": {"$regex": r"\bpython", "$options": "i"}},
+        {"company_name": {"$regex": r"\bpython", "$options": "i"}},
+    ]}]
+
+
+def test_prefix_matches_the_last_term_on_indexed_tokens():
+    query, projection, sort = build_text_query("senior pyth", parse_fields("title"), prefix=True)
+
+    assert query["$text"] == {"$search": "senior"}
+    patterns = query["$and"][-1]["search_tokens"]["$in"]
+    assert [p.pattern for p in patterns] == [f"^title:{re.escape('pyth')}"]
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as raised:
+        parse_fields("title,salary")
+    assert raised.value.status_code == 400
+
+
+# -------------------------------------------------------------------
+# GET /jobs
+# -------------------------------------------------------------------
+def test_default_mode_is_a_title_substring_match(api, posting):
+    response = search(api, posting, {"q": "pyth"})
+
+    assert response.status_code == 200
+    assert titles(response) == ["Senior Python Developer"]
+
+
+def test_prefix_search_covers_titles_and_companies(api, posting):
+    response = search(api, posting, {"q": "pyth", "mode": "text", "prefix": "true"})
+    assert sorted(titles(response)) == ["Go Engineer", "Senior Python Developer"]
+
+    response = search(api, posting, {"q": "pyth", "mode": "text", "prefix": "true", "fields": "company"})
+    assert titles(response) == ["Go Engineer"]
+
+
+def test_text_search_ranks_title_matches_first(api, posting, live_db):
+    async def scenario():
+        await live_db()
+        await write_jobs([
+            posting(1, role="Go Engineer", text="python", description="python scripting"),
+            posting(2, role="Python Developer", text="django", description="django"),
+            posting(3, role="Data Engineer", text="spark", description="spark"),
+        ])
+        return await api("GET", "/jobs/", params={"q": "python", "mode": "text"})
+
+    response = asyncio.run(scenario())
+
+    assert titles(response) == ["Python Developer", "Go Engineer"]
+    assert response.json()[0]["score"] > response.json()[1]["score"]
@@ -0,0 +1,54 @@
+"""Job field profiles and their Mongo projections."""
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.ingest import build_job_doc, write_jobs
+from app.serializers import job_projection, project_doc, serialize_job
+
+
+def test_serialize_job_stringifies_ids_and_fills_defaults():
+    job_id, logo_id = ObjectId(), ObjectId()
+
+    out = serialize_job({"_id": job_id, "job_id": "1", "title": None, "raw": {"logo": logo_id},
+                         "card_json": b"{}", "last_date": datetime(2026, 10, 1)})
+
+    assert out["_id"] == out["id"] == str(job_id)
+    assert out["raw"] == {"logo": str(logo_id)}
+    assert out["title"] == "No Title"
+    assert out["company_name"] == "Unknown Company"
+    assert out["last_date"] == datetime(2026, 10, 1)
+    assert "card_json" not in out
+
+
+def test_projecting_in_python_matches_the_mongo_projection(db, posting):
+    raw = posting(1, employment_type="full time", salary="100k", logo="https://example.com/logo.png")
+
+    async def scenario():
+        await write_jobs([raw])
+        return {profile: await db.jobs.find_one({"job_id": "1"}, job_projection(profile))
+                for profile in ("card", "detail")}
+
+    loaded = asyncio.run(scenario())
+    doc = build_job_doc(raw)
+
+    for profile, job in loaded.items():
+        job.pop("_id")
+        assert job == project_doc(doc, profile)
+
+
+def test_list_pages_load_neither_description_nor_raw_payload(api, posting):
+    async def scenario():
+        await write_jobs([posting(1, description="<p>" + "long description " * 50 + "</p>")])
+        listed = await api("GET", "/jobs/")
+        detail = await api("GET", "/jobs/1")
+        return listed.json()[0], detail.json()
+
+    card, detail = asyncio.run(scenario())
+
+    assert "description" not in card
+    assert set(card["raw"]) <= {"employment_type", "salary", "last_date", "deadline", "keywords", "logo"}
+    assert card["summary"]
+    assert detail["description"].startswith("<p>long description")
+    assert "text" not in detail["raw"]
@@ -0,0 +1,154 @@
+"""Ingest sources: FindWork paging against a local stand-in, feeds and files."""
+import asyncio
+
+import orjson
+
+from app.config import settings
+from app.ingest import ingest_findwork, ingest_sources, set_high_water_mark, state_key
+from app.sources import FeedSource, FileSource, configured_sources, generic_job, parse_feed
+
+
+def run_ingest(db, high_water_mark: str, concurrency: int = 4):
+    async def scenario():
+        await set_high_water_mark(state_key(None, None), high_water_mark, {})
+        stats = await ingest_findwork(concurrency=concurrency)
+        ids = sorted([job["job_id"] async for job in db.jobs.find({}, {"job_id": 1})])
+        return stats, ids
+
+    return asyncio.run(scenario())
+
+
+def test_new_postings_behind_an_already_seen_page_are_ingested(db, serve_findwork, posting):
+    # By relevance the first page holds only postings older than the high-water mark
+    upstream = serve_findwork([
+        posting(1, created_at="2026-01-02T00:00:00Z"), posting(2, created_at="2026-01-01T00:00:00Z"),
+        posting(3, created_at="2026-03-02T00:00:00Z"), posting(4, created_at="2026-03-01T00:00:00Z"),
+    ])
+
+    stats, ids = run_ingest(db, "2026-02-01T00:00:00Z")
+
+    assert all(request["params"]["sort_by"] == "date" for request in upstream.requests)
+    assert {"3", "4"} <= set(ids)
+    # Newest first: page 2 holds only old postings and ends the run
+    assert stats["pages"] == 2
+
+
+def test_results_out_of_date_order_turn_off_the_early_stop(db, serve_findwork, posting):
+    # sort_by ignored: page 2 is all old but newer than the end of page 1, so order is not to be trusted
+    serve_findwork([
+        posting(1, created_at="2026-05-01T00:00:00Z"), posting(2, created_at="2026-01-01T00:00:00Z"),
+        posting(3, created_at="2026-01-20T00:00:00Z"), posting(4, created_at="2026-01-10T00:00:00Z"),
+        posting(5, created_at="2026-06-01T00:00:00Z"),
+    ], honour_sort=False)
+
+    stats, ids = run_ingest(db, "2026-02-01T00:00:00Z", concurrency=1)
+
+    assert "5" in ids
+    assert stats["pages"] == 3
+
+
+def test_paging_stops_at_the_first_already_seen_page(db, serve_findwork, posting):
+    upstream = serve_findwork([posting(i, created_at=f"2026-0{i}-01T00:00:00Z") for i in range(1, 7)])
+
+    stats, ids = run_ingest(db, "2026-04-15T00:00:00Z", concurrency=1)
+
+    # Page 2 (April, March) is all at or below the mark; page 3 is never fetched
+    assert ids == ["3", "4", "5", "6"]
+    assert stats["pages"] == 2
+    assert len(upstream.requests) == 2
+
+
+# -------------------------------------------------------------------
+# Feeds and files
+# -------------------------------------------------------------------
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Remote Board</title>
+  <item><title>Python Engineer at Acme</title><link>https://board.example/1</link>
+        <guid>rss-1</guid><pubDate>Wed, 01 Oct 2026 09:00:00 GMT</pubDate>
+        <description>Build APIs</description></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Jobs</title>
+  <entry><title>Data Engineer</title><link href="https://atom.example/2"/><id>atom-2</id>
+         <author><name>Initech</name></author><updated>2026-10-02T00:00:00Z</updated></entry>
+</feed>"""
+
+
+def test_rss_atom_and_json_feeds_normalize_alike():
+    rss, atom = parse_feed(RSS), parse_feed(ATOM)
+    listed = parse_feed(b'{"jobs": [{"position": "Go Engineer", "company": {"name": "Globex"}, '
+                        b'"location": "Remote, EU", "apply_url": "https://json.example/3"}]}')
+
+    jobs = [generic_job(item, "board") for item in rss + atom + listed]
+
+    assert [(job.role, job.company_name) for job in jobs] == [
+        ("Python Engineer", "Acme"), ("Data Engineer", "Initech"), ("Go Engineer", "Globex")]
+    assert [job.url for job in jobs] == ["https://board.example/1", "https://atom.example/2", "https://json.example/3"]
+    assert jobs[0].id == "rss-1" and jobs[0].date_posted.day == 1
+    assert jobs[2].remote is True
+    # No id in the item: derived from the URL, so it is stable across runs
+    assert jobs[2].id == generic_job(listed[0], "board").id
+
+
+def write_file(tmp_path, name, rows):
+    path = tmp_path / name
+    if name.endswith(".csv"):
+        lines = [",".join(rows[0])] + [",".join(str(row[key]) for key in rows[0]) for row in rows]
+        path.write_text("\n".join(lines) + "\n")
+    else:
+        path.write_bytes(b"\n".join(orjson.dumps(row) for row in rows))
+    return str(path)
+
+
+def test_sources_run_together_and_cross_source_duplicates_are_dropped(db, tmp_path):
+    csv_path = write_file(tmp_path, "board.csv", [
+        {"id": "a1", "title": "Python Engineer", "company": "Acme", "location": "Berlin"},
+        {"id": "a2", "title": "Rust Engineer", "company": "Acme", "location": "Berlin"},
+    ])
+    jsonl_path = write_file(tmp_path, "partner.jsonl", [
+        # The same Acme posting as on the other board, spelled differently
+        {"id": "p1", "role": "python  engineer", "company_name": "ACME", "location": "berlin"},
+        {"id": "p2", "role": "Go Engineer", "company_name": "Globex", "location": "Remote"},
+        {"id": "p3", "company_name": "No Title Inc"},
+    ])
+
+    async def scenario():
+        stats = await ingest_sources([FileSource(csv_path, "board"), FileSource(jsonl_path, "partner"),
+                                      FileSource(str(tmp_path / "missing.csv"), "broken")])
+        ids = sorted([job["job_id"] async for job in db.jobs.find({}, {"job_id": 1})])
+        return stats, ids, await db.ingest_state.find_one({"_id": "source:partner"})
+
+    stats, ids, recorded = asyncio.run(scenario())
+
+    assert ids == ["board:a1", "board:a2", "partner:p2"]
+    assert (stats["inserted"], stats["duplicates"], stats["invalid"], stats["failed_sources"]) == (3, 1, 1, 1)
+    partner = stats["sources"]["partner"]
+    assert (partner["fetched"], partner["inserted"], partner["duplicates"], partner["invalid"]) == (2, 1, 1, 1)
+    assert stats["sources"]["broken"]["error"].startswith("FileNotFoundError")
+    assert recorded["last_run"]["inserted"] == 1
+
+
+def test_feed_source_fetches_over_http(db, upstream):
+    upstream.responder = lambda params: {"items": [
+        {"id": "f1", "title": "Platform Engineer at Umbrella", "url": "https://feed.example/f1"}]}
+
+    async def scenario():
+        stats = await ingest_sources([FeedSource(upstream.url, "feed")])
+        return stats, await db.jobs.find_one({"job_id": "feed:f1"})
+
+    stats, job = asyncio.run(scenario())
+
+    assert stats["sources"]["feed"]["inserted"] == 1
+    assert (job["title"], job["company_name"], job["source"]) == ("Platform Engineer", "Umbrella", "feed")
+
+
+def test_configured_sources_are_named_once(monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_FINDWORK", False)
+    monkeypatch.setattr(settings, "INGEST_FEED_URLS", "board=https://a.example/feed, https://b.example/rss?x=1")
+    monkeypatch.setattr(settings, "INGEST_FILE_PATHS", "board=/tmp/jobs.csv, /tmp/more.jsonl")
+
+    sources = configured_sources()
+
+    assert [(type(s).__name__, s.name) for s in sources] == [
+        ("FeedSource", "board"), ("FeedSource", "feed:b.example"), ("FileSource", "file:more")]
@@ -0,0 +1,255 @@
+"""UpstreamClient against a local fake server that injects 429s, 5xx and 304s."""
+import asyncio
+import time
+
+import pytest
+
+from app import upstream as upstream_module
+from app.upstream import CircuitBreaker, CircuitOpenError, UpstreamClient, UpstreamError
+
+_names = iter(range(10 ** 6))
+
+
+def make_client(**overrides) -> UpstreamClient:
+    options = {"rate": 1000.0, "burst": 100, "max_retries": 3, "backoff_base": 0.001, "backoff_max": 5.0,
+               "failure_threshold": 5, "reset_seconds": 60.0, "http2": False}
+    options.update(overrides)
+    # Each client gets its own name: breakers and validator caches register per name
+    return UpstreamClient(f"test-{next(_names)}", **options)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def fetch(client: UpstreamClient, url: str):
+    try:
+        return await client.get_json(url)
+    finally:
+        await client.aclose()
+
+
+def open_breaker(client: UpstreamClient):
+    """Put the client's breaker in the state it is in once reset_seconds have passed while open."""
+    client.breaker.failures = client.breaker.failure_threshold
+    client.breaker.opened_at = time.monotonic() - client.breaker.reset_seconds - 1
+    client.breaker._set(CircuitBreaker.OPEN)
+
+
+# -------------------------------------------------------------------
+# Retries
+# -------------------------------------------------------------------
+def test_429_waits_for_retry_after(upstream):
+    upstream.reply(429, headers={"Retry-After": "0.3"})
+    upstream.reply(200, body={"page": 1})
+
+    data, fresh = run(fetch(make_client(), upstream.url))
+
+    assert (data, fresh) == ({"page": 1}, True)
+    assert len(upstream.requests) == 2
+    assert upstream.gaps()[0] >= 0.3
+
+
+def test_429_does_not_count_towards_the_breaker(upstream):
+    for _ in range(3):
+        upstream.reply(429, headers={"Retry-After": "0"})
+    client = make_client(failure_threshold=2)
+
+    run(fetch(client, upstream.url))
+
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    assert client.breaker.failures == 0
+
+
+def test_5xx_backs_off_exponentially(upstream, monkeypatch):
+    # Full jitter draws from [0, cap]; take the cap so the delays are known
+    monkeypatch.setattr(upstream_module.random, "uniform", lambda low, high: high)
+    upstream.reply(503)
+    upstream.reply(502)
+    upstream.reply(200, body={"page": 1})
+
+    data, _ = run(fetch(make_client(backoff_base=0.1), upstream.url))
+
+    assert data == {"page": 1}
+    first, second = upstream.gaps()
+    assert first >= 0.1
+    assert second >= 0.2
+
+
+def test_5xx_gives_up_after_max_retries(upstream):
+    for _ in range(3):
+        upstream.reply(500)
+
+    with pytest.raises(UpstreamError) as error:
+        run(fetch(make_client(max_retries=2), upstream.url))
+
+    assert error.value.status == 500
+    assert len(upstream.requests) == 3
+
+
+def test_other_4xx_fails_without_retrying(upstream):
+    upstream.reply(404)
+
+    with pytest.raises(UpstreamError) as error:
+        run(fetch(make_client(), upstream.url))
+
+    assert error.value.status == 404
+    assert len(upstream.requests) == 1
+
+
+# -------------------------------------------------------------------
+# Circuit breaker
+# -------------------------------------------------------------------
+def test_breaker_opens_half_opens_and_closes(upstream):
+    client = make_client(max_retries=0, failure_threshold=2, reset_seconds=0.2)
+    upstream.reply(503)
+    upstream.reply(503)
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(UpstreamError):
+                await client.get_json(upstream.url)
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+        # Open: fails fast without reaching the server
+        with pytest.raises(CircuitOpenError):
+            await client.get_json(upstream.url)
+        assert len(upstream.requests) == 2
+
+        await asyncio.sleep(0.25)
+        # The trial succeeds and closes the circuit
+        data, _ = await client.get_json(upstream.url)
+        assert data == upstream.DEFAULT_BODY
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        await client.aclose()
+
+    run(scenario())
+
+
+def test_failed_trial_reopens_the_breaker(upstream):
+    client = make_client(max_retries=0)
+    open_breaker(client)
+    upstream.reply(503)
+
+    with pytest.raises(UpstreamError):
+        run(fetch(client, upstream.url))
+
+    assert client.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        run(fetch(client, upstream.url))
+
+
+def test_only_one_trial_at_a_time(upstream):
+    client = make_client(max_retries=0)
+    open_breaker(client)
+    upstream.reply(200, delay=0.2)
+
+    async def scenario():
+        trial = asyncio.create_task(client.get_json(upstream.url))
+        await asyncio.sleep(0.05)
+        with pytest.raises(CircuitOpenError):
+            await client.get_json(upstream.url)
+        await trial
+        await client.aclose()
+
+    run(scenario())
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_throttled_trial_does_not_leave_the_breaker_half_open(upstream):
+    client = make_client(max_retries=1)
+    open_breaker(client)
+    upstream.reply(429, headers={"Retry-After": "0.05"})
+    upstream.reply(200, body={"page": 1})
+
+    # The retry after the 429 becomes the new trial instead of failing fast
+    data, _ = run(fetch(client, upstream.url))
+
+    assert data == {"page": 1}
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_throttled_trial_out_of_retries_releases_the_trial(upstream):
+    client = make_client(max_retries=0)
+    open_breaker(client)
+    upstream.reply(429, headers={"Retry-After": "0"})
+
+    with pytest.raises(UpstreamError):
+        run(fetch(client, upstream.url))
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+
+    data, _ = run(fetch(client, upstream.url))
+    assert data == upstream.DEFAULT_BODY
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_does_not_leave_the_breaker_half_open(upstream):
+    client = make_client(max_retries=0)
+    open_breaker(client)
+    upstream.reply(200, delay=1.0)
+
+    async def scenario():
+        trial = asyncio.create_task(client.get_json(upstream.url))
+        await asyncio.sleep(0.1)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert client.breaker.state == CircuitBreaker.HALF_OPEN
+
+        data, _ = await client.get_json(upstream.url)
+        assert data == upstream.DEFAULT_BODY
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        await client.aclose()
+
+    run(scenario())
+
+
+def test_release_ignores_a_settled_trial():
+    breaker = CircuitBreaker(f"test-{next(_names)}", failure_threshold=1, reset_seconds=0)
+    breaker.failure()
+    assert breaker.allow()
+    first = breaker.trial()
+    breaker.failure()
+    assert breaker.allow()  # reset_seconds=0: straight back to half-open
+    second = breaker.trial()
+
+    breaker.release(first)
+
+    assert second != first
+    assert not breaker.allow()  # the second trial is still running
+
+
+# -------------------------------------------------------------------
+# Conditional requests
+# -------------------------------------------------------------------
+def test_304_returns_the_stored_body(upstream):
+    client = make_client()
+    upstream.reply(200, body={"page": 1, "results": [1, 2, 3]}, headers={"ETag": '"v1"'})
+    upstream.reply(304, headers={"ETag": '"v1"'})
+
+    async def scenario():
+        first = await client.get_json(upstream.url, {"page": 1})
+        second = await client.get_json(upstream.url, {"page": 1})
+        await client.aclose()
+        return first, second
+
+    (data, fresh), (cached, cached_fresh) = run(scenario())
+
+    assert fresh is True and cached_fresh is False
+    assert cached == data == {"page": 1, "results": [1, 2, 3]}
+    assert "if-none-match" not in upstream.requests[0]["headers"]
+    assert upstream.requests[1]["headers"]["if-none-match"] == '"v1"'
+
+
+def test_validators_are_kept_per_params(upstream):
+    client = make_client()
+    upstream.reply(200, body={"page": 1}, headers={"ETag": '"p1"'})
+    upstream.reply(200, body={"page": 2})
+
+    async def scenario():
+        await client.get_json(upstream.url, {"page": 1})
+        await client.get_json(upstream.url, {"page": 2})
+        await client.aclose()
+
+    run(scenario())
+    assert "if-none-match" not in upstream.requests[1]["headers"]
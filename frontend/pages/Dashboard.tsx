@@ -63,19 +63,18 @@ export const Dashboard: React.FC = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [savingJobId, setSavingJobId] = useState<string | null>(null);
 
+  const [savedLoaded, setSavedLoaded] = useState(false);
+
   const loadDashboardData = async () => {
     try {
       setLoading(true);
-      const [userData, statsData, recJobs, savedJobsData] = await Promise.all([
+      const [userData, summary] = await Promise.all([
         api.auth.getProfile(),
-        api.dashboard.getStats(),
-        api.jobs.getRecommended(),
-        api.jobs.getSaved()
+        api.dashboard.getSummary()
       ]);
       setUser(userData);
-      setStats(statsData);
-      setRecommendedJobs(recJobs);
-      setSavedJobs(savedJobsData);
+      setStats(summary.stats);
+      setRecommendedJobs(summary.recommended);
     } catch (error) {
       console.error("Failed to load dashboard data", error);
     } finally {
@@ -83,10 +82,30 @@ export const Dashboard: React.FC = () => {
     }
   };
 
+  // The full saved list is only fetched once its tab is opened
+  const loadSavedJobs = async () => {
+    setSavedJobs(await api.jobs.getSaved());
+    setSavedLoaded(true);
+  };
+
+  const refreshAfterSaveChange = async () => {
+    const [summary] = await Promise.all([
+      api.dashboard.getSummary(),
+      savedLoaded ? loadSavedJobs() : Promise.resolve()
+    ]);
+    setStats(summary.stats);
+  };
+
   useEffect(() => {
     loadDashboardData();
   }, []);
 
+  useEffect(() => {
+    if (activeTab === 'saved' && !savedLoaded) {
+      loadSavedJobs().catch(error => console.error("Failed to load saved jobs", error));
+    }
+  }, [activeTab]);
+
   // Filter jobs based on search term
   const filteredRecommendedJobs = recommendedJobs.filter(job =>
     job.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -106,16 +125,12 @@ export const Dashboard: React.FC = () => {
     try {
       setSavingJobId(id);
       await api.jobs.save(id);
-      // Reload saved jobs to reflect changes
-      const updatedSavedJobs = await api.jobs.getSaved();
-      setSavedJobs(updatedSavedJobs);
       // Update the recommended job to show as saved
       setRecommendedJobs(prev => prev.map(job => 
         job.id === id ? { ...job, isSaved: true } : job
       ));
-      // Update stats
-      const newStats = await api.dashboard.getStats();
-      setStats(newStats);
+      // Refresh counts (and the saved list, if it has been opened)
+      await refreshAfterSaveChange();
     } catch (e) {
       console.error("Failed to save job", e);
       alert("Failed to save job. Please try again.");
@@ -128,16 +143,12 @@ export const Dashboard: React.FC = () => {
     try {
       setSavingJobId(id);
       await api.jobs.unsave(id);
-      // Reload saved jobs to reflect changes
-      const updatedSavedJobs = await api.jobs.getSaved();
-      setSavedJobs(updatedSavedJobs);
       // Update the recommended job to show as unsaved
       setRecommendedJobs(prev => prev.map(job => 
         job.id === id ? { ...job, isSaved: false } : job
       ));
-      // Update stats
-      const newStats = await api.dashboard.getStats();
-      setStats(newStats);
+      // Refresh counts (and the saved list, if it has been opened)
+      await refreshAfterSaveChange();
     } catch (e) {
       console.error("Failed to unsave job", e);
       alert("Failed to remove job. Please try again.");
@@ -342,7 +353,7 @@ export const Dashboard: React.FC = () => {
                   <BookmarkCheck size={18} />
                   Apply Later
                   <span className="bg-green-100 text-green-600 px-2 py-1 rounded-full text-xs font-medium">
-                    {filteredSavedJobs.length}
+                    {savedLoaded ? filteredSavedJobs.length : stats?.applyLater || 0}
                   </span>
                 </button>
               </div>
@@ -12,6 +12,8 @@ export const Jobs: React.FC = () => {
   const [filterOpen, setFilterOpen] = useState(false);
   const [user, setUser] = useState<User | null>(null);
   const [savingJobId, setSavingJobId] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Safe API call for user profile - CORRECTED: using auth.getProfile()
   const safeGetUserProfile = async (): Promise<User | null> => {
@@ -27,10 +29,11 @@ export const Jobs: React.FC = () => {
   const fetchJobs = async (query = '') => {
     setLoading(true);
     try {
-      const [jobsData, userData] = await Promise.all([
-        api.jobs.getAll(query),
+      const [page, userData] = await Promise.all([
+        api.jobs.getPage(query),
         safeGetUserProfile() // Use the safe function
       ]);
+      const jobsData = page.jobs;
       
       // Calculate skills match for each job
       const jobsWithMatch = jobsData.map(job => ({
@@ -41,6 +44,7 @@ export const Jobs: React.FC = () => {
       setJobs(jobsWithMatch);
       setFilteredJobs(jobsWithMatch);
       setUser(userData || null);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error("Failed to fetch jobs", error);
     } finally {
@@ -48,6 +52,25 @@ export const Jobs: React.FC = () => {
     }
   };
 
+  // Append the next page using the cursor from the previous response
+  const loadMoreJobs = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await api.jobs.getPage('', {}, nextCursor);
+      const moreJobs = page.jobs.map(job => ({
+        ...job,
+        matchScore: calculateSkillsMatch(job, user?.skills || [])
+      }));
+      setJobs(prev => [...prev, ...moreJobs]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Failed to load more jobs", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Calculate skills match percentage
   const calculateSkillsMatch = (job: Job, userSkills: string[]): number => {
     if (userSkills.length === 0 || !job.tags || job.tags.length === 0) return 0;
@@ -298,6 +321,18 @@ export const Jobs: React.FC = () => {
           ))
         )}
         
+        {!loading && nextCursor && !searchTerm && (
+          <div className="col-span-full flex justify-center">
+            <button
+              onClick={loadMoreJobs}
+              disabled={loadingMore}
+              className="px-6 py-2 border border-slate-200 rounded-lg text-slate-700 hover:bg-slate-50 font-medium transition-colors disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more jobs'}
+            </button>
+          </div>
+        )}
+
         {!loading && filteredJobs.length === 0 && (
           <div className="col-span-full text-center py-20 bg-white rounded-xl border border-slate-200 border-dashed">
             <div className="bg-slate-50 w-16 h-16 rounded-full flex items-center justify-center mx-auto mb-4">
@@ -3,6 +3,7 @@ import {
   Application, 
   User, 
   DashboardStats, 
+  DashboardSummary,
   Notification, 
   JobType, 
   ApplicationStatus,
@@ -76,6 +77,16 @@ const handleResponse = async <T>(response: Response): Promise<T> => {
 };
 
 // Enhanced job transformation that matches your database structure
+const transformNotification = (notif: any): Notification => ({
+  id: notif.id || notif._id,
+  title: notif.title,
+  message: notif.message,
+  date: notif.created_at || notif.date,
+  read: notif.read || false,
+  type: (notif.type as 'info' | 'success' | 'warning' | 'error') || 'info',
+  jobIds: notif.job_ids || []
+});
+
 const transformBackendJob = (backendJob: any, isSaved: boolean = false): Job => {
   // Determine job type from your database fields
   let jobType = JobType.FULL_TIME;
@@ -103,6 +114,7 @@ const transformBackendJob = (backendJob: any, isSaved: boolean = false): Job =>
 
   // Create description from available fields
   const description = backendJob.description || 
+                     backendJob.summary || 
                      rawData.description || 
                      rawData.summary || 
                      "No description available";
@@ -219,7 +231,12 @@ export const api = {
 
           if (response.ok) {
             console.log('✅ Skills update successful with body:', body);
-            return handleResponse<User>(response);
+            const { access_token, token_type, ...updated } = await handleResponse<User & Partial<LoginResponse>>(response);
+            // The skills version is part of the token; keep the re-issued one
+            if (access_token) {
+              localStorage.setItem('access_token', access_token);
+            }
+            return updated;
           }
 
           // If not successful, continue to next format
@@ -253,13 +270,35 @@ export const api = {
       const searchParams = new URLSearchParams();
       if (query) searchParams.append('q', query);
       if (filters.location) searchParams.append('location', filters.location);
+      // Signed-in users get is_saved on every card in the same response
+      if (getValidToken()) searchParams.append('saved', 'true');
       
       const response = await fetch(`${API_BASE_URL}/jobs?${searchParams.toString()}`, {
         headers: getHeaders(),
       });
       const backendJobs = await handleResponse<any[]>(response);
       
-      return backendJobs.map((job: any) => transformBackendJob(job, false));
+      return backendJobs.map((job: any) => transformBackendJob(job, !!job.is_saved));
+    },
+
+    // Keyset-paginated listing: pass the returned nextCursor to fetch the following page
+    getPage: async (query: string = '', filters: any = {}, cursor: string | null = null, limit: number = 20): Promise<{ jobs: Job[]; nextCursor: string | null }> => {
+      const searchParams = new URLSearchParams();
+      if (query) searchParams.append('q', query);
+      if (filters.location) searchParams.append('location', filters.location);
+      if (cursor) searchParams.append('cursor', cursor);
+      searchParams.append('limit', String(limit));
+      if (getValidToken()) searchParams.append('saved', 'true');
+      
+      const response = await fetch(`${API_BASE_URL}/jobs?${searchParams.toString()}`, {
+        headers: getHeaders(),
+      });
+      const backendJobs = await handleResponse<any[]>(response);
+      
+      return {
+        jobs: backendJobs.map((job: any) => transformBackendJob(job, !!job.is_saved)),
+        nextCursor: response.headers.get('X-Next-Cursor')
+      };
     },
 
     getRecommended: async (): Promise<Job[]> => {
@@ -374,6 +413,25 @@ export const api = {
       }
     },
 
+    // Multi-select: save or remove many jobs with one request each
+    saveMany: async (ids: string[]): Promise<{ saved: string[]; exists: string[]; not_found: string[] }> => {
+      const response = await fetch(`${API_BASE_URL}/apply/batch`, {
+        method: 'POST',
+        headers: getHeaders(),
+        body: JSON.stringify({ job_ids: ids }),
+      });
+      return handleResponse<{ saved: string[]; exists: string[]; not_found: string[] }>(response);
+    },
+
+    unsaveMany: async (ids: string[]): Promise<{ status: string; removed: number }> => {
+      const response = await fetch(`${API_BASE_URL}/apply/batch`, {
+        method: 'DELETE',
+        headers: getHeaders(),
+        body: JSON.stringify({ job_ids: ids }),
+      });
+      return handleResponse<{ status: string; removed: number }>(response);
+    },
+
     getSaved: async (): Promise<Job[]> => {
       try {
         const response = await fetch(`${API_BASE_URL}/apply/list`, {
@@ -417,6 +475,23 @@ export const api = {
       }
     },
 
+    // Saved state of many jobs in one request (keyed by the ids passed in)
+    checkSavedStatuses: async (jobIds: string[]): Promise<Record<string, boolean>> => {
+      if (jobIds.length === 0) return {};
+      try {
+        const response = await fetch(`${API_BASE_URL}/apply/check`, {
+          method: 'POST',
+          headers: getHeaders(),
+          body: JSON.stringify({ job_ids: jobIds }),
+        });
+        const data = await handleResponse<any>(response);
+        return data.saved || {};
+      } catch (error) {
+        console.error('Error checking saved statuses:', error);
+        return {};
+      }
+    },
+
     getSavedCount: async (): Promise<number> => {
       try {
         const response = await fetch(`${API_BASE_URL}/apply/count`, {
@@ -529,35 +604,33 @@ export const api = {
   },
 
   dashboard: {
+    // One request for the whole dashboard: counts, deadlines and recommendations
+    getSummary: async (): Promise<DashboardSummary> => {
+      const response = await fetch(`${API_BASE_URL}/dashboard/summary`, {
+        headers: getHeaders(),
+      });
+      const data = await handleResponse<any>(response);
+      const byStatus: Record<string, number> = data.applications?.by_status || {};
+
+      return {
+        stats: {
+          newMatches: data.recommended?.length || 0,
+          applyLater: data.saved_count || 0,
+          urgentDeadlineCount: data.deadlines?.urgent_count || 0,
+          totalApplications: data.applications?.total || 0,
+          pendingApplications: byStatus.pending || 0,
+          interviewsScheduled: byStatus.interview || 0,
+          applicationsByStatus: byStatus,
+          profileMatch: 85
+        },
+        recommended: (data.recommended || []).map((job: any) => transformBackendJob(job, !!job.is_saved)),
+        upcomingDeadlines: (data.deadlines?.upcoming || []).map((job: any) => transformBackendJob(job, true))
+      };
+    },
+
     getStats: async (): Promise<DashboardStats> => {
       try {
-        const [savedJobs, recommendedJobs, savedCount, applications] = await Promise.all([
-          api.jobs.getSaved(),
-          api.jobs.getRecommended(),
-          api.jobs.getSavedCount(),
-          api.applications.getAll()
-        ]);
-
-        const urgentDeadlineCount = savedJobs.filter(job => {
-          try {
-            if (!job.deadline) return false;
-            const deadline = new Date(job.deadline);
-            const now = new Date();
-            const diffTime = deadline.getTime() - now.getTime();
-            const diffHours = diffTime / (1000 * 60 * 60);
-            return diffHours <= 48 && diffHours > 0;
-          } catch {
-            return false;
-          }
-        }).length;
-
-        return {
-          newMatches: recommendedJobs.length,
-          applyLater: savedCount,
-          urgentDeadlineCount,
-          totalApplications: applications.length,
-          profileMatch: 85
-        };
+        return (await api.dashboard.getSummary()).stats;
       } catch (error) {
         console.error('Error calculating dashboard stats:', error);
         return {
@@ -577,20 +650,78 @@ export const api = {
         });
         const data = await handleResponse<any[]>(response);
         
-        return data.map((notif: any) => ({
-          id: notif.id || notif._id,
-          title: notif.title,
-          message: notif.message,
-          date: notif.created_at || notif.date,
-          read: notif.read || false,
-          type: (notif.type as 'info' | 'success' | 'warning' | 'error') || 'info'
-        }));
+        return data.map(transformNotification);
       } catch (error) {
         console.error('Error fetching notifications:', error);
         return [];
       }
     },
 
+    // Pushed as they are created; returns a function that closes the stream.
+    // EventSource can't send headers, so each connection opens with a
+    // short-lived stream ticket in the query string, never the access token.
+    // A dropped stream is reopened with a new ticket, resuming after the
+    // last notification received.
+    streamNotifications: (onNotification: (notification: Notification) => void): (() => void) => {
+      let source: EventSource | null = null;
+      let lastId = '';
+      let closed = false;
+      let retry: ReturnType<typeof setTimeout> | undefined;
+
+      const reconnect = (delay: number) => {
+        if (!closed) {
+          retry = setTimeout(connect, delay);
+        }
+      };
+
+      const connect = async () => {
+        if (!getValidToken()) {
+          return;
+        }
+        let ticket: string;
+        try {
+          const response = await fetch(`${API_BASE_URL}/notifications/stream/ticket`, {
+            method: 'POST',
+            headers: getHeaders(),
+          });
+          ticket = (await handleResponse<{ ticket: string }>(response)).ticket;
+        } catch (error) {
+          console.error('Error opening notification stream:', error);
+          reconnect(15000);
+          return;
+        }
+        if (closed) {
+          return;
+        }
+        const since = lastId ? `&since=${encodeURIComponent(lastId)}` : '';
+        const stream = new EventSource(
+          `${API_BASE_URL}/notifications/stream?ticket=${encodeURIComponent(ticket)}${since}`
+        );
+        source = stream;
+        stream.addEventListener('notification', (event) => {
+          const message = event as MessageEvent;
+          lastId = message.lastEventId || lastId;
+          try {
+            onNotification(transformNotification(JSON.parse(message.data)));
+          } catch (error) {
+            console.error('Error reading notification event:', error);
+          }
+        });
+        // The browser would retry with the same URL, whose ticket may have expired
+        stream.onerror = () => {
+          stream.close();
+          reconnect(5000);
+        };
+      };
+
+      connect();
+      return () => {
+        closed = true;
+        clearTimeout(retry);
+        source?.close();
+      };
+    },
+
     markNotificationAsRead: async (notificationId: string): Promise<void> => {
       try {
         await fetch(`${API_BASE_URL}/notifications/${notificationId}/read`, {
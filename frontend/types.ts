@@ -56,6 +56,13 @@ export interface DashboardStats {
   urgentDeadlineCount?: number;
   pendingApplications?: number;
   interviewsScheduled?: number;
+  applicationsByStatus?: Record<string, number>;
+}
+
+export interface DashboardSummary {
+  stats: DashboardStats;
+  recommended: Job[];
+  upcomingDeadlines: Job[];
 }
 
 export interface Application {
@@ -90,6 +97,7 @@ export interface Notification {
   date: string;
   read: boolean;
   type: 'info' | 'success' | 'warning' | 'error';
+  jobIds?: string[];
 }
 
 export interface ApiResponse<T> {
@@ -186,9 +194,12 @@ export interface JobsService {
   getById: (id: string) => Promise<Job>;
   save: (id: string) => Promise<SaveJobResponse>;
   unsave: (id: string) => Promise<UnsaveJobResponse>;
+  saveMany: (ids: string[]) => Promise<{ saved: string[]; exists: string[]; not_found: string[] }>;
+  unsaveMany: (ids: string[]) => Promise<{ status: string; removed: number }>;
   getSaved: () => Promise<Job[]>;
   getApplyLater: () => Promise<Job[]>;
   checkSavedStatus: (jobId: string) => Promise<boolean>;
+  checkSavedStatuses: (jobIds: string[]) => Promise<Record<string, boolean>>;
   getSavedCount: () => Promise<number>;
   fetchJobs: () => Promise<{status: string; message: string}>;
 }
@@ -201,8 +212,10 @@ export interface ApplicationsService {
 }
 
 export interface DashboardService {
+  getSummary: () => Promise<DashboardSummary>;
   getStats: () => Promise<DashboardStats>;
   getNotifications: () => Promise<Notification[]>;
+  streamNotifications: (onNotification: (notification: Notification) => void) => () => void;
   markNotificationAsRead: (notificationId: string) => Promise<void>;
 }
 